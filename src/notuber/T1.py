@@ -0,0 +1,153 @@
+import sys
+import heapq
+import random
+import time
+
+from . import classes
+from . import fleet
+from . import loader
+from . import simulation
+from . import trips
+from .profiling import PROFILER
+
+
+### Data Objects
+NODES = {} # <node_id: Node_Object>
+DRIVERS = []
+PASSENGERS = [] # trips.TripTable once initialized
+
+### Preprocessed information about network
+AVG_MPH = 0
+SPEED_PROFILES = None # Distinct edge speed profiles, shared by all edges
+
+### Based on sampling two points in NYC and calculating lat/lon mile distance
+LON2MI = 45.5
+LAT2MI = 60.0
+
+### Simulation state
+FLEET = None # Driver state by row
+DRIVER_QUEUE = [] # Priority queue of (free_at, row) by available time
+
+def initialize(data_dir: str = None, drivers: list = None, passengers: list = None):
+    '''
+    Load network and people
+        - data_dir: directory with node_data.json, edges.csv, drivers.csv, passengers.csv (defaults to bundled data)
+        - drivers/passengers: use these instead of reading drivers.csv/passengers.csv
+    '''
+
+    lap = PROFILER.lap()
+
+    NODES.clear()
+    NODES.update(loader.load_nodes(data_dir))
+    global SPEED_PROFILES
+    SPEED_PROFILES = classes.SpeedProfiles()
+    edges = loader.load_edges(NODES, data_dir, SPEED_PROFILES)
+
+    load_people(data_dir, drivers, passengers)
+
+    ### Average MPH on network
+    global AVG_MPH
+    AVG_MPH = loader.avg_mph(edges)
+    print(f'Average MPH: {AVG_MPH}')
+
+    lap('init')
+
+def load_people(data_dir: str = None, drivers: list = None, passengers = None):
+    '''
+    Load drivers and passengers for the loaded network (initialize() does this; call again to simulate another workload)
+        - drivers/passengers: use these instead of reading data_dir's drivers.csv/passengers.csv (passengers may be a trips.TripTable)
+    '''
+
+    DRIVERS[:] = drivers if drivers is not None else loader.load_drivers(data_dir)
+    global PASSENGERS
+    PASSENGERS = trips.table(passengers, data_dir)
+
+def manhattan_est_time(start_coords, end_coords):
+    '''
+    Estimate of time needed to travel path (based on Manhattan distance and average speed limit across network)
+    '''
+
+    lat_dist = abs(start_coords[0] - end_coords[0])
+    lon_dist = abs(start_coords[1] - end_coords[1])
+
+    mi_dist = lat_dist * LAT2MI + lon_dist * LON2MI
+    approx_drive_time = mi_dist / AVG_MPH * 60
+
+    return approx_drive_time
+
+def setup():
+    global FLEET
+    FLEET = fleet.Fleet(DRIVERS)
+    DRIVER_QUEUE[:] = FLEET.queue()
+
+def add_driver(driver: classes.Driver):
+    '''
+    Put a new or returning driver into the fleet (available from driver.time)
+    '''
+
+    row = FLEET.add(driver)
+    heapq.heappush(DRIVER_QUEUE, (float(FLEET.free_at[row]), row))
+
+def remove_driver(driver: classes.Driver) -> bool:
+    '''
+    Take a driver out of the fleet (e.g. going offline)
+        - Returns False if the driver was not waiting for a ride
+    '''
+
+    row = FLEET.row_of(driver)
+    return simulation.remove_from_queue(DRIVER_QUEUE, row) and FLEET.remove(row)
+
+def active_drivers() -> list:
+    '''
+    Drivers still in the fleet, as new Driver objects at their current position and available from when they free up
+    '''
+
+    return FLEET.active_drivers()
+
+def dispatch(passenger: classes.Passenger, metrics: simulation.Metrics):
+    '''
+    Match passenger with the driver that has been waiting longest (FIFO on driver availability)
+        - Returns (driver, approx_arrival_time, approx_drive_time), or None if no drivers are left
+    '''
+
+    # Match passenger and driver
+    lap = PROFILER.lap()
+    if not DRIVER_QUEUE:
+        return None
+    free_at, row = heapq.heappop(DRIVER_QUEUE)
+
+    # Check wait times (in minutes)
+    driver_idle_time, passenger_wait_time = simulation.wait_times(free_at, fleet.seconds(passenger.time))
+    lap('match')
+
+    # Approximate wait and driving time
+    approx_arrival_time = manhattan_est_time(FLEET.coords[row].tolist(), passenger.coords) # Time for driver to pick up
+    lap('route_pickup')
+    approx_drive_time = manhattan_est_time(passenger.coords, passenger.end_coords) # Time for driver to drop off
+    lap('route_dropoff')
+    passenger_wait_time += approx_arrival_time + approx_drive_time # Passenger wait time (time for match + time for pickup)
+    metrics.record(passenger_wait_time, driver_idle_time, approx_drive_time - approx_arrival_time)
+
+    FLEET.finish_ride(row, free_at + (approx_arrival_time + approx_drive_time) * 60, passenger.end_coords)
+    p = random.randint(1, 15)
+    if p > 1: # Geometric random variable, expect every driver to do 15 rides per night
+        heapq.heappush(DRIVER_QUEUE, (float(FLEET.free_at[row]), row))
+    else:
+        FLEET.remove(row)
+    lap('driver_update')
+    return (FLEET.drivers[row], approx_arrival_time, approx_drive_time)
+
+def main(data_dir: str = None):
+
+    metrics = simulation.Metrics()
+    initialize(data_dir)
+    simulation.run(sys.modules[__name__], PASSENGERS, metrics)
+    metrics.print_summary(len(DRIVERS))
+    PROFILER.report()
+    return metrics
+
+if __name__ == '__main__':
+    START = time.time() # Timing simulation
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
+    END = time.time() # Timing simulation
+    print(f'Simulation Runtime: {END - START} seconds')
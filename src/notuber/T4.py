@@ -0,0 +1,237 @@
+import sys
+import heapq
+import datetime as dt
+import random
+import time
+
+from . import classes
+from . import components
+from . import contraction
+from . import dropoffs
+from . import engine
+from . import fleet
+from . import loader
+from . import scoring
+from . import simulation
+from . import trips
+from .profiling import PROFILER
+
+
+### Data Objects
+NODES = {} # <node_id: Node_Object>
+NODE_LIST = [] # <node.index: Node_Object>
+DRIVERS = []
+PASSENGERS = [] # trips.TripTable once initialized
+
+### Preprocessed information about network
+AVG_MPH = 0
+SPEED_PROFILES = None # Distinct edge speed profiles, shared by all edges
+
+### Grid Params
+PARTITIONS = 900
+GRID = []
+GRID_PARAMS = []
+
+### Candidate scoring (forked worker pool when scoring.WORKERS > 1)
+SCORER = None
+ENGINE = None # engine.Engine every search runs on, with engine.ENABLED
+DROPOFFS = None # dropoffs.DropoffPrefetcher routing the workload's dropoff legs, with dropoffs.WORKERS > 0
+
+### Simulation state
+FLEET = None # Driver state by row
+DRIVER_QUEUE = [] # Priority queue of (free_at, row) by available time
+
+def initialize(data_dir: str = None, drivers: list = None, passengers: list = None):
+    '''
+    Load network and people and snap people to their nearest nodes
+        - data_dir: directory with node_data.json, edges.csv, drivers.csv, passengers.csv (defaults to bundled data)
+        - drivers/passengers: use these instead of reading drivers.csv/passengers.csv
+    '''
+
+    lap = PROFILER.lap()
+
+    NODES.clear()
+    NODES.update(loader.load_nodes(data_dir))
+    NODE_LIST[:] = sorted(NODES.values(), key = lambda node: node.index)
+    global SPEED_PROFILES
+    SPEED_PROFILES = classes.SpeedProfiles()
+    edges = loader.load_edges(NODES, data_dir, SPEED_PROFILES)
+    print(f'Road graph components: {components.index_graph(NODES).summary()}') # Before contraction hides chain nodes
+    if contraction.ENABLED:
+        print(f'Contracted road graph: {contraction.contract(NODES, edges)}')
+
+    # Grid of nodes for snapping
+    grid, grid_params = loader.snapping_grid(components.snapping_nodes(NODES), PARTITIONS)
+    GRID[:] = grid
+    GRID_PARAMS[:] = grid_params
+
+    ### Average MPH on network
+    global AVG_MPH
+    AVG_MPH = loader.avg_mph(edges)
+    print(f'Average MPH: {AVG_MPH}')
+
+    # Fork scoring workers once the graph is complete, so they share it
+    global SCORER, ENGINE
+    ENGINE = engine.Engine(NODE_LIST) if engine.ENABLED else None
+    if SCORER is not None:
+        SCORER.close()
+    SCORER = scoring.CandidateScorer(NODES, 'shortest_path_a_star', engine = ENGINE)
+
+    lap('init')
+    load_people(data_dir, drivers, passengers)
+
+def load_people(data_dir: str = None, drivers: list = None, passengers = None):
+    '''
+    Load drivers and passengers and snap them to the loaded network (initialize() does this; call again to simulate
+    another workload on the same graph)
+        - drivers/passengers: use these instead of reading data_dir's drivers.csv/passengers.csv (passengers may be a trips.TripTable)
+    '''
+
+    lap = PROFILER.lap()
+
+    DRIVERS[:] = drivers if drivers is not None else loader.load_drivers(data_dir)
+    global PASSENGERS
+    PASSENGERS = trips.table(passengers, data_dir)
+
+    # Assign drivers and passengers to nearest nodes (cached per workload and graph)
+    params = ('grid', PARTITIONS, components.SNAP_MAIN)
+    trips.snap_drivers(DRIVERS, lambda driver: driver.assign_node(driver.coords, GRID, GRID_PARAMS), NODE_LIST, data_dir, *params)
+    PASSENGERS.attach(NODE_LIST)
+    PASSENGERS.snap(snap_passenger, data_dir, *params)
+
+    lap('snap')
+
+    # Fork dropoff routing workers once the trips are snapped
+    global DROPOFFS
+    if DROPOFFS is not None:
+        DROPOFFS.close()
+    DROPOFFS = dropoffs.DropoffPrefetcher(NODE_LIST, PASSENGERS, 'shortest_path_a_star', (AVG_MPH,), engine = ENGINE) if dropoffs.WORKERS > 0 else None
+
+def setup():
+    global FLEET
+    FLEET = fleet.Fleet(DRIVERS)
+    DRIVER_QUEUE[:] = FLEET.queue()
+
+def snap_passenger(passenger: classes.Passenger):
+    '''
+    Assign a passenger's pickup and dropoff to their nearest nodes
+    '''
+
+    passenger.node = passenger.assign_node(passenger.coords, GRID, GRID_PARAMS)
+    passenger.end_node = passenger.assign_node(passenger.end_coords, GRID, GRID_PARAMS)
+
+def add_driver(driver: classes.Driver):
+    '''
+    Put a new or returning driver into the fleet (available from driver.time)
+    '''
+
+    driver.node = driver.assign_node(driver.coords, GRID, GRID_PARAMS) # Assign driver to nearest node
+    row = FLEET.add(driver)
+    heapq.heappush(DRIVER_QUEUE, (float(FLEET.free_at[row]), row))
+
+def remove_driver(driver: classes.Driver) -> bool:
+    '''
+    Take a driver out of the fleet (e.g. going offline)
+        - Returns False if the driver was not waiting for a ride
+    '''
+
+    row = FLEET.row_of(driver)
+    return simulation.remove_from_queue(DRIVER_QUEUE, row) and FLEET.remove(row)
+
+def active_drivers() -> list:
+    '''
+    Drivers still in the fleet, as new Driver objects at their current position and available from when they free up
+    '''
+
+    return FLEET.active_drivers()
+
+def dispatch(passenger: classes.Passenger, metrics: simulation.Metrics):
+    '''
+    Match passenger with the available driver closest by network travel time (A* with heuristic based on euclidian distance divided by avg speed)
+        - Returns (driver, approx_arrival_time, approx_drive_time), or None if no drivers are left
+    '''
+
+    # Match passenger and driver
+    lap = PROFILER.lap()
+    if not DRIVER_QUEUE:
+        return None
+    if not components.reachable(passenger.node, passenger.end_node): # Dropoff can't be routed to
+        metrics.unreachable += 1
+        lap('match')
+        return simulation.UNREACHABLE
+    request_time = fleet.seconds(passenger.time)
+    available_rows = simulation.pop_available(DRIVER_QUEUE, request_time) # Available drivers when passenger makes request
+    candidates = [row for row, node in zip(available_rows, FLEET.node[available_rows].tolist()) if components.reachable(NODE_LIST[node], passenger.node)]
+    while not candidates and DRIVER_QUEUE: # Nobody here can get to the passenger, wait for the next driver to free up
+        _, row = heapq.heappop(DRIVER_QUEUE)
+        available_rows.append(row)
+        if components.reachable(NODE_LIST[FLEET.node[row]], passenger.node):
+            candidates.append(row)
+
+    # Get closest driver
+    min_dist = float('inf')
+    assigned_row = -1
+    times = SCORER.travel_times([NODE_LIST[node] for node in FLEET.node[candidates].tolist()], passenger.node, passenger.time, AVG_MPH) # Closest point along network (using A* with heuristic based on euclidian distance divided by avg speed)
+    for row, dist in zip(candidates, times):
+        if 0 <= dist < min_dist: # -1 means no route
+            assigned_row = row
+            min_dist = dist
+    if assigned_row < 0: # Only without the component index (or a fleet that can't reach them at all)
+        for entry in zip(FLEET.free_at[available_rows].tolist(), available_rows):
+            heapq.heappush(DRIVER_QUEUE, entry)
+        metrics.unreachable += 1
+        lap('match')
+        return simulation.UNREACHABLE
+
+    # Wait times for driver assignment (in minutes)
+    driver_idle_time, passenger_wait_time = simulation.wait_times(FLEET.free_at[assigned_row], request_time)
+    lap('match')
+
+    # Wait time for driver to arrive (already found while scoring candidates)
+    approx_arrival_time = min_dist # Time taken for driver to arrive to passenger
+    passenger.time += dt.timedelta(minutes = approx_arrival_time) # Time at driver's arrival
+    lap('route_pickup')
+
+    # Driving time
+    approx_drive_time = DROPOFFS.travel_time(passenger, passenger.time) if DROPOFFS is not None else None
+    if approx_drive_time is None:
+        approx_drive_time = engine.search(ENGINE, 'shortest_path_a_star', passenger.node, passenger.end_node, passenger.time, AVG_MPH)  # Time taken for driver to drop off passenger (using A* with heuristic based on euclidian distance divided by avg speed)
+    lap('route_dropoff')
+
+    # Metrics
+    passenger_wait_time += approx_arrival_time + approx_drive_time
+    metrics.record(passenger_wait_time, driver_idle_time, approx_drive_time - approx_arrival_time)
+
+    # Driver drops passenger off
+    FLEET.finish_ride(assigned_row, FLEET.free_at[assigned_row] + (approx_arrival_time + approx_drive_time) * 60, passenger.end_coords, passenger.end_node.index)
+
+    # Add drivers back to queue, simulating potential driver drop out
+    p = random.randint(1, 15)
+    if p == 1: # Geometric random variable, expect every driver to do 15 rides per night
+        FLEET.remove(assigned_row)
+        available_rows.remove(assigned_row)
+    for entry in zip(FLEET.free_at[available_rows].tolist(), available_rows):
+        heapq.heappush(DRIVER_QUEUE, entry)
+    lap('driver_update')
+    return (FLEET.drivers[assigned_row], approx_arrival_time, approx_drive_time)
+
+def main(data_dir: str = None):
+
+    metrics = simulation.Metrics()
+    init_start = time.time()
+    initialize(data_dir)
+    init_end = time.time()
+    print(f'Finished initialization, total time {init_end - init_start} seconds')
+
+    simulation.run(sys.modules[__name__], PASSENGERS, metrics)
+    metrics.print_summary(len(DRIVERS))
+    if DROPOFFS is not None:
+        print(DROPOFFS.summary())
+    PROFILER.report()
+    return metrics
+
+if __name__ == '__main__':
+    START = time.time() # Timing simulation
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
+    END = time.time() # Timing simulation
+    print(f'Simulation Runtime: {END - START} seconds')
@@ -0,0 +1,266 @@
+import sys
+from collections import deque
+import datetime as dt
+import random
+import time
+
+from . import cache
+from . import classes
+from . import components
+from . import contraction
+from . import dropoffs
+from . import loader
+from . import simulation
+from . import trips
+from .profiling import PROFILER
+
+from . import datastructures
+from .datastructures import Grid
+from .datastructures import KDTree
+
+
+### Data Objects
+NODES = {} # <node_id: Node_Object>
+NODE_LIST = [] # <node.index: Node_Object>
+DRIVERS = []
+PASSENGERS = [] # trips.TripTable once initialized
+
+### Preprocessed information about network
+AVG_MPH = 0
+SPEED_PROFILES = None # Distinct edge speed profiles, shared by all edges
+
+### Based on sampling two points in NYC and calculating lat/lon mile distance
+LON2MI = 45.5
+LAT2MI = 60.0
+
+
+KDTREE = None
+PARTITION = None
+DROPOFFS = None # dropoffs.DropoffPrefetcher routing the workload's dropoff legs, with dropoffs.WORKERS > 0
+
+### Simulation state
+DRIVER_QUEUE = deque() # Drivers not yet on the grid, by available time
+
+def initialize(data_dir: str = None, drivers: list = None, passengers: list = None):
+    '''
+    Load network and people, build the grid partition and k-d tree and snap people to their nearest nodes
+        - data_dir: directory with node_data.json, edges.csv, drivers.csv, passengers.csv (defaults to bundled data)
+        - drivers/passengers: use these instead of reading drivers.csv/passengers.csv
+    '''
+
+    lap = PROFILER.lap()
+
+    global PARTITION
+    PARTITION = Grid()
+
+    NODES.clear()
+    NODES.update(loader.load_nodes(data_dir))
+    NODE_LIST[:] = sorted(NODES.values(), key = lambda node: node.index)
+    for node in NODES.values():
+        PARTITION.add_node(node)
+
+    global SPEED_PROFILES
+    SPEED_PROFILES = classes.SpeedProfiles()
+    edges = loader.load_edges(NODES, data_dir, SPEED_PROFILES)
+    print(f'Road graph components: {components.index_graph(NODES).summary()}') # Before contraction hides chain nodes
+    if contraction.ENABLED:
+        print(f'Contracted road graph: {contraction.contract(NODES, edges)}')
+
+    global KDTREE
+    KDTREE = KDTree(components.snapping_nodes(NODES).values(), 0, 100)
+    key = cache.graph_digest(data_dir, datastructures.GRID_SPEC)
+    PARTITION.set_statistics(cache.cached_arrays('grid_stats', key, lambda: datastructures.grid_statistics(edges, SPEED_PROFILES), data_dir))
+
+    ### Average MPH on network
+    global AVG_MPH
+    AVG_MPH = loader.avg_mph(edges)
+    print(f'Average MPH: {AVG_MPH}')
+
+    lap('init')
+    load_people(data_dir, drivers, passengers)
+
+def load_people(data_dir: str = None, drivers: list = None, passengers = None):
+    '''
+    Load drivers and passengers and snap them to the loaded network (initialize() does this; call again to simulate
+    another workload on the same graph)
+        - drivers/passengers: use these instead of reading data_dir's drivers.csv/passengers.csv (passengers may be a trips.TripTable)
+    '''
+
+    lap = PROFILER.lap()
+
+    DRIVERS[:] = drivers if drivers is not None else loader.load_drivers(data_dir)
+    global PASSENGERS
+    PASSENGERS = trips.table(passengers, data_dir)
+
+    # Assign drivers and passengers to nearest nodes (cached per workload and graph; drivers joining later snap when matched)
+    params = ('kdtree', components.SNAP_MAIN)
+    trips.snap_drivers(DRIVERS, lambda driver: nearest_node(driver.coords), NODE_LIST, data_dir, *params)
+    PASSENGERS.attach(NODE_LIST)
+    PASSENGERS.snap(snap_passenger, data_dir, *params)
+
+    lap('snap')
+
+    # Fork dropoff routing workers once the trips are snapped
+    global DROPOFFS
+    if DROPOFFS is not None:
+        DROPOFFS.close()
+    DROPOFFS = dropoffs.DropoffPrefetcher(NODE_LIST, PASSENGERS, 'shortest_path_a_star', (AVG_MPH,)) if dropoffs.WORKERS > 0 else None
+
+def nearest_node(coords: tuple) -> classes.Node:
+    dist, node = KDTREE.get_kNN(1, coords)[0]
+    return node
+
+def snap_passenger(passenger: classes.Passenger):
+    '''
+    Assign a passenger's pickup and dropoff to their nearest nodes
+    '''
+
+    passenger.node = nearest_node(passenger.coords)
+    passenger.end_node = nearest_node(passenger.end_coords)
+
+def setup():
+    DRIVER_QUEUE.clear()
+    DRIVER_QUEUE.extend(DRIVERS)
+
+def add_driver(driver: classes.Driver):
+    '''
+    Put a new or returning driver onto the grid (available from driver.time)
+    '''
+
+    driver.node = None # Snapped lazily when matched
+    PARTITION.add_driver(driver)
+
+def remove_driver(driver: classes.Driver) -> bool:
+    '''
+    Take a driver out of the fleet (e.g. going offline)
+        - Returns False if the driver was neither queued nor on the grid
+    '''
+
+    if driver in DRIVER_QUEUE:
+        DRIVER_QUEUE.remove(driver)
+        return True
+    if driver in PARTITION.drivers:
+        PARTITION.remove_driver(driver)
+        return True
+    return False
+
+def active_drivers() -> list:
+    '''
+    Drivers still in the fleet (queued or on the grid), as new Driver objects at their current position and available
+    from when they free up
+    '''
+
+    drivers = list(DRIVER_QUEUE) + list(PARTITION.drivers.leaf_of)
+    return sorted((classes.Driver(id = driver.id, timestamp = driver.time, lat = driver.coords[0], lon = driver.coords[1]) for driver in drivers), key = lambda driver: driver.time)
+
+def dispatch(passenger: classes.Passenger, metrics: simulation.Metrics):
+    '''
+    Match passenger with the driver with the lowest estimated pickup time on the grid partition
+        - Returns (driver, time_to_passenger, time_to_destination), None if no drivers are left, or
+          simulation.UNREACHABLE if no driver can be routed to the passenger
+    '''
+
+    lap = PROFILER.lap()
+
+    # add all drivers that became available between now and when passenger arrived
+    while len(DRIVER_QUEUE) > 0 and DRIVER_QUEUE[0].time < passenger.time:
+        PARTITION.add_driver(DRIVER_QUEUE.popleft())
+
+    # check if there are drivers currently on grid
+    # if no drivers, add next few drivers to grid
+    if PARTITION.driver_count == 0:
+        metrics.empty_grid += 1
+        for i in range(10): # arbitrarily choose amount, we can tune for different results
+            # Higher number means more likely we notice if a driver will appear close to passenger
+            # But too high means we may need to do a lot more processing for future rides
+            if len(DRIVER_QUEUE) <= 0: break
+            PARTITION.add_driver(DRIVER_QUEUE.popleft())
+
+    # if there are no drivers left and no drivers to add, we quit
+    if PARTITION.driver_count == 0:
+        return None
+
+    # match passenger with driver
+    eta, driver = PARTITION.get_closest_driver(passenger.coords, passenger.time)
+    lap('match')
+    if driver == None: # No estimate for anyone on the grid
+        metrics.unreachable += 1 # Drivers stay on the grid for the next passenger
+        return simulation.UNREACHABLE
+
+    # check if driver and passenger have assigned nodes
+    if driver.node == None:
+        driver.node = nearest_node(driver.coords)
+    if passenger.node == None:
+        passenger.node = nearest_node(passenger.coords)
+    if passenger.end_node == None:
+        passenger.end_node = nearest_node(passenger.end_coords)
+    lap('snap')
+
+    if not components.reachable(passenger.node, passenger.end_node):
+        metrics.unreachable += 1 # Driver stays on the grid for the next passenger
+        return simulation.UNREACHABLE
+
+    if not components.reachable(driver.node, passenger.node): # Closest driver can't get here, take the closest who can
+        def can_reach(driver: classes.Driver) -> bool:
+            if driver.node == None:
+                driver.node = nearest_node(driver.coords)
+            return components.reachable(driver.node, passenger.node)
+
+        eta, driver = PARTITION.get_closest_driver(passenger.coords, passenger.time, eligible=can_reach)
+        while driver == None and len(DRIVER_QUEUE) > 0: # Nobody on the grid can, wait for the next driver to come online
+            queued = DRIVER_QUEUE.popleft()
+            PARTITION.add_driver(queued)
+            if can_reach(queued):
+                driver = queued
+        lap('match')
+        if driver == None:
+            metrics.unreachable += 1 # Drivers stay on the grid for the next passenger
+            return simulation.UNREACHABLE
+
+    # calculate actual time to reach passenger and to arrive at destination
+    driver_idle_time, _ = simulation.wait_times(driver.time, passenger.time)
+    time_to_available = max(0, (passenger.time - driver.time).total_seconds() / 60) # T5's own rule: minutes since the driver became available
+    time_to_passenger = driver.node.shortest_path_a_star(passenger.node, passenger.time, AVG_MPH)
+    lap('route_pickup')
+    pickup_time = passenger.time + dt.timedelta(minutes=time_to_passenger)
+    time_to_destination = DROPOFFS.travel_time(passenger, pickup_time) if DROPOFFS is not None else None
+    if time_to_destination is None:
+        time_to_destination = passenger.node.shortest_path_a_star(passenger.end_node, pickup_time, AVG_MPH)
+    lap('route_dropoff')
+
+    passenger_wait_time = time_to_available + time_to_passenger + time_to_destination
+    metrics.record(passenger_wait_time, driver_idle_time, time_to_destination - time_to_passenger)
+
+    p = random.randint(1, 15)
+    if p > 1: # Geometric random variable, expect every driver to do 15 rides per night
+        # Update driver data
+        PARTITION.move_driver_to(driver, passenger.end_node.coords)
+
+        driver.node = passenger.end_node
+        driver.time = passenger.time + dt.timedelta(minutes=passenger_wait_time)
+    else:
+        PARTITION.remove_driver(driver)
+    lap('driver_update')
+    return (driver, time_to_passenger, time_to_destination)
+
+def main():
+
+    metrics = simulation.Metrics()
+    simulation.run(sys.modules[__name__], PASSENGERS, metrics, progress = 100)
+    metrics.print_summary(len(DRIVERS))
+    if DROPOFFS is not None:
+        print(DROPOFFS.summary())
+    PROFILER.report()
+    return metrics
+
+if __name__ == '__main__':
+    START = time.time()
+    print('Initializing...')
+    initialize(sys.argv[1] if len(sys.argv) > 1 else None)
+    print(f'Finished initializing in {time.time() - START} seconds.')
+
+    print('Simulating rides')
+    START = time.time() # Timing simulation
+    main()
+    END = time.time() # Timing simulation
+    print(f'Simulation Runtime: {END - START} seconds')
@@ -0,0 +1,35 @@
+'''
+NotUber: ride matching simulations on the NYC road network
+
+Importing the package is cheap: nothing below it (nor numpy) is loaded until used, so short-lived tools and the
+`notuber` command start fast. Matchers are modules exposing initialize(), setup() and dispatch(); see simulation.run.
+'''
+
+import importlib
+
+### Matcher modules by name or alias (aliases are what the `notuber` command offers)
+MATCHERS = {
+    'T1': 'T1', 'fifo': 'T1', # Driver waiting longest
+    'T2': 'T2', 'euclidean': 'T2', # Closest by straight-line distance
+    'T3': 'T3', 'dijkstra': 'T3', # Closest by network travel time
+    'T4': 'T4', 'astar': 'T4', # Same with A* searches
+    'T5': 'T5', 'grid': 'T5', # Grid/quadtree ETA estimates, k-d tree snapping
+}
+
+
+def matcher_module(name: str) -> str:
+    '''
+    Module name (T1 ... T5) of a matcher name or alias
+    '''
+
+    module = MATCHERS.get(name, MATCHERS.get(name.upper()))
+    if module is None:
+        raise ValueError(f'unknown matcher {name!r} (choose from {", ".join(MATCHERS)})')
+    return module
+
+def load_matcher(name: str):
+    '''
+    Import a matcher module by name (T1 ... T5) or alias, e.g. load_matcher('astar') is notuber.T4
+    '''
+
+    return importlib.import_module(f'{__name__}.{matcher_module(name)}')
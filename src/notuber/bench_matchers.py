@@ -0,0 +1,162 @@
+'''
+End-to-end throughput and scaling benchmark for the T1 - T5 matchers
+
+Every matcher runs on the same workload, scaled by replicating each driver and passenger with seeded jitter in
+position and request time. Each (matcher, scale) run happens in its own process so runs cannot share state, and
+reports init, snapping, matching, routing and driver-update time (from the profiler phases) next to mean/p95
+passenger wait.
+
+    notuber bench-matchers --scales 1,10,100 --timeout 600 --out report.json
+'''
+
+import argparse
+import contextlib
+import datetime as dt
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+from . import load_matcher
+from . import classes
+from . import loader
+from . import simulation
+from .profiling import PROFILER
+
+### Defaults
+MATCHERS = ('T1', 'T2', 'T3', 'T4', 'T5')
+SCALES = (1, 10, 100)
+SEED = 330
+JITTER_DEG = 0.002 # Roughly 0.1 mi of position jitter per replica
+JITTER_SEC = 120 # Request/availability time jitter per replica
+
+
+def scale_workload(drivers: list, passengers: list, factor: int, seed: int = SEED) -> tuple:
+    '''
+    Replicate every driver and passenger factor times (the originals plus factor - 1 jittered copies)
+        - Returns (drivers, passengers) sorted by time with IDs reassigned in time order
+    '''
+
+    rng = random.Random(seed)
+
+    def jitter(coords):
+        return (coords[0] + rng.uniform(-JITTER_DEG, JITTER_DEG), coords[1] + rng.uniform(-JITTER_DEG, JITTER_DEG))
+
+    def shift(timestamp):
+        return timestamp + dt.timedelta(seconds = rng.randint(0, JITTER_SEC))
+
+    scaled_drivers = [(driver.time, driver.coords) for driver in drivers]
+    scaled_passengers = [(passenger.time, passenger.coords, passenger.end_coords) for passenger in passengers]
+    for _ in range(factor - 1):
+        scaled_drivers.extend((shift(driver.time), jitter(driver.coords)) for driver in drivers)
+        scaled_passengers.extend((shift(passenger.time), jitter(passenger.coords), jitter(passenger.end_coords)) for passenger in passengers)
+
+    scaled_drivers.sort(key = lambda row: row[0])
+    scaled_passengers.sort(key = lambda row: row[0])
+
+    return ([classes.Driver(id, timestamp, *coords) for id, (timestamp, coords) in enumerate(scaled_drivers, 1)],
+            [classes.Passenger(id, timestamp, *start, *end) for id, (timestamp, start, end) in enumerate(scaled_passengers, 1)])
+
+def run_matcher(matcher_name: str, data_dir: str, scale: int, seed: int = SEED, limit: int = None) -> dict:
+    '''
+    Initialize and simulate one matcher on the scaled workload
+        - limit: only simulate the first `limit` passengers (all of them are still loaded and snapped)
+    '''
+
+    random.seed(seed) # Driver drop-out is random
+    drivers, passengers = scale_workload(loader.load_drivers(data_dir), loader.load_passengers(data_dir), scale, seed)
+
+    matcher = load_matcher(matcher_name)
+    metrics = simulation.Metrics()
+    PROFILER.enable()
+    PROFILER.reset()
+
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        matcher.initialize(data_dir, drivers, passengers)
+        simulation.run(matcher, matcher.PASSENGERS[:limit] if limit else matcher.PASSENGERS, metrics)
+    total = time.perf_counter() - start
+
+    phases = PROFILER.times
+    summary = metrics.summary(len(drivers))
+    summary.update({
+        'init_time': phases.get('init', 0.0),
+        'snap_time': phases.get('snap', 0.0),
+        'match_time': phases.get('match', 0.0),
+        'route_time': phases.get('route_pickup', 0.0) + phases.get('route_dropoff', 0.0),
+        'update_time': phases.get('driver_update', 0.0),
+        'counters': dict(PROFILER.counters),
+        'matcher': matcher_name,
+        'scale': scale,
+        'drivers': len(drivers),
+        'passengers': min(len(passengers), limit) if limit else len(passengers),
+        'total_time': total,
+        'throughput': summary['served'] / total if total else float('nan'),
+    })
+    return summary
+
+def _child(queue, *args):
+    try:
+        queue.put(run_matcher(*args))
+    except Exception as e:
+        queue.put({'error': f'{type(e).__name__}: {e}'})
+
+def run_isolated(matcher_name: str, data_dir: str, scale: int, seed: int = SEED, limit: int = None, timeout: float = None) -> dict:
+    '''
+    run_matcher in a fresh process, so module globals and mutated Person objects never leak between runs
+        - A run exceeding timeout seconds is killed and reported as timed out
+    '''
+
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target = _child, args = (queue, matcher_name, data_dir, scale, seed, limit))
+    process.start()
+    try:
+        result = queue.get(timeout = timeout)
+    except Exception:
+        result = {'error': f'timed out after {timeout} seconds'}
+    process.join(1)
+    if process.is_alive():
+        process.terminate()
+        process.join()
+
+    result.setdefault('matcher', matcher_name)
+    result.setdefault('scale', scale)
+    return result
+
+def print_report(results: list) -> None:
+    print(f'{"matcher":<8}{"scale":>6}{"drivers":>9}{"pass.":>9}{"init s":>9}{"snap s":>9}{"match s":>9}{"route s":>9}{"upd s":>9}{"total s":>9}{"req/s":>9}{"mean wait":>11}{"p95 wait":>10}')
+    for r in results:
+        if 'error' in r:
+            print(f'{r["matcher"]:<8}{r["scale"]:>6}  {r["error"]}')
+            continue
+        print(f'{r["matcher"]:<8}{r["scale"]:>6}{r["drivers"]:>9}{r["passengers"]:>9}{r["init_time"]:>9.2f}{r["snap_time"]:>9.2f}{r["match_time"]:>9.2f}{r["route_time"]:>9.2f}{r["update_time"]:>9.2f}{r["total_time"]:>9.2f}{r["throughput"]:>9.1f}{r["mean_wait"]:>11.2f}{r["p95_wait"]:>10.2f}')
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description = 'Throughput and scaling benchmark for the NotUber matchers')
+    parser.add_argument('--data', default = None, help = 'data directory (defaults to the bundled data)')
+    parser.add_argument('--matchers', default = ','.join(MATCHERS))
+    parser.add_argument('--scales', default = ','.join(map(str, SCALES)), help = 'comma separated workload multipliers')
+    parser.add_argument('--seed', type = int, default = SEED)
+    parser.add_argument('--limit', type = int, default = None, help = 'simulate only the first N passengers of each run')
+    parser.add_argument('--timeout', type = float, default = None, help = 'seconds before a run is abandoned')
+    parser.add_argument('--out', default = None, help = 'write results as JSON')
+    args = parser.parse_args(argv)
+
+    results = []
+    for scale in map(int, args.scales.split(',')):
+        for matcher_name in args.matchers.split(','):
+            results.append(run_isolated(matcher_name, args.data, scale, args.seed, args.limit, args.timeout))
+            print_report(results[-1:])
+
+    print()
+    print_report(results)
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent = 2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,333 @@
+'''
+Micro-benchmarks for the routing, snapping and driver-search hot paths
+
+Each benchmark runs a fixed query set drawn from a seeded RNG, so two runs with the same data, seed and query count
+time exactly the same calls. Results (latency distribution, settled nodes, peak memory per call) can be stored as a
+baseline and compared against later runs.
+
+    notuber benchmark                                 # bundled data
+    notuber benchmark --synthetic 150                 # 150 x 150 synthetic city, no data files needed
+    notuber benchmark --save baseline.json            # store results as a baseline
+    notuber benchmark --compare baseline.json         # report speedups/regressions against a baseline
+'''
+
+import argparse
+import datetime as dt
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from . import classes
+from . import contraction
+from . import engine
+from . import loader
+from . import generator
+from . import trees
+from .datastructures import Grid
+from .datastructures import KDTree
+
+### Defaults
+SEED = 330
+QUERIES = 100
+MEMORY_QUERIES = 20 # Memory is measured in a separate pass (tracemalloc slows every allocation)
+REGRESSION_THRESHOLD = 0.10
+BASELINE_PATH = os.path.join(loader.REPO_DIR, 'testing', 'benchmarks', 'hotpaths_baseline.json')
+
+### Snapping grid used by T3/T4 (Person.assign_node)
+PARTITIONS = 900
+
+
+def synthetic_network(size: int, seed: int = SEED) -> tuple:
+    '''
+    Build a size x size synthetic city (see generator.py) in memory
+        - Returns (nodes, edges) in the same form as loader.load_nodes/loader.load_edges
+    '''
+
+    node_rows, edge_rows = generator.generate_network(size, size, seed)
+    nodes = {node_id: classes.Node(id = node_id, lat = lat, lon = lon) for node_id, lat, lon in node_rows}
+    for index, node in enumerate(nodes.values()):
+        node.index = index
+    classes.reserve_workspaces(len(nodes))
+
+    profiles = classes.SpeedProfiles() # Interned like the matchers load edges.csv
+    edges = []
+    for start_id, end_id, length, weekday, weekend in edge_rows:
+        profile = profiles.intern(weekday, weekend)
+        edge = classes.Edge(nodes[start_id], nodes[end_id], length, *profiles.profiles[profile], profile)
+        nodes[start_id].neighbors.append(edge)
+        nodes[end_id].incoming.append(edge)
+        edges.append(edge)
+
+    return nodes, edges
+
+def synthetic_people(count: int, seed: int = SEED) -> tuple:
+    '''
+    count passengers and count / 10 drivers over one weekday and one weekend day (see generator.py)
+        - Returns (drivers, passengers)
+    '''
+
+    driver_rows, passenger_rows = generator.generate_people(count // 10 + 1, count, days = 2, start = dt.datetime(2014, 4, 25), seed = seed)
+    drivers = [classes.Driver(id, *row) for id, row in enumerate(driver_rows, 1)]
+    passengers = [classes.Passenger(id, *row) for id, row in enumerate(passenger_rows, 1)]
+
+    return drivers, passengers
+
+def percentile(values: list, q: float) -> float:
+    '''
+    Nearest-rank percentile (q in [0, 100]) of a list of numbers
+    '''
+
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+def measure(call, queries: list, memory_queries: int = MEMORY_QUERIES) -> dict:
+    '''
+    Time call(query, stats) over every query and measure peak allocation per call over the first memory_queries queries
+        - call may record 'settled' in the stats dict it is given
+    '''
+
+    latencies, settled = [], []
+    for query in queries:
+        stats = {}
+        start = time.perf_counter()
+        call(query, stats)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if 'settled' in stats:
+            settled.append(stats['settled'])
+
+    peaks = []
+    tracemalloc.start()
+    for query in queries[:memory_queries]:
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        call(query, {})
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append((peak - current) / 1024)
+    tracemalloc.stop()
+
+    result = {
+        'calls': len(latencies),
+        'mean_ms': statistics.fmean(latencies),
+        'p50_ms': percentile(latencies, 50),
+        'p90_ms': percentile(latencies, 90),
+        'p99_ms': percentile(latencies, 99),
+        'max_ms': max(latencies),
+        'peak_kb': statistics.fmean(peaks) if peaks else None,
+    }
+    if settled:
+        result['settled_mean'] = statistics.fmean(settled)
+        result['settled_max'] = max(settled)
+
+    return result
+
+def build_queries(nodes: dict, edges: list, drivers: list, passengers: list, count: int, seed: int) -> dict:
+    '''
+    Fixed, seeded query sets for every benchmark
+    '''
+
+    rng = random.Random(seed)
+    node_ids = sorted(nodes)
+    times = sorted(passenger.time for passenger in passengers)
+    people = sorted(passengers, key = lambda passenger: passenger.id)
+
+    queries = {}
+    queries['routes'] = [(nodes[rng.choice(node_ids)], nodes[rng.choice(node_ids)], rng.choice(times)) for _ in range(count)]
+    queries['coords'] = [rng.choice(people).coords for _ in range(count)]
+    queries['requests'] = [(passenger.coords, passenger.time) for passenger in rng.sample(people, min(count, len(people)))]
+
+    # Only edges that leave their start grid space need clipping
+    crossing = [edge for edge in edges if Grid.coord2idx(edge.start_node.coords) != Grid.coord2idx(edge.end_node.coords)]
+    queries['crossing_edges'] = rng.sample(crossing, min(count, len(crossing)))
+
+    return queries
+
+def run(nodes: dict, edges: list, drivers: list, passengers: list, count: int = QUERIES, seed: int = SEED, only: list = None) -> dict:
+    '''
+    Run every hot-path benchmark and return <benchmark_name: result>
+    '''
+
+    queries = build_queries(nodes, edges, drivers, passengers, count, seed)
+    mph = loader.avg_mph(edges)
+    results = {}
+
+    def wanted(name):
+        return not only or name in only
+
+    if wanted('shortest_path'):
+        results['shortest_path'] = measure(lambda q, stats: q[0].shortest_path(q[1], q[2], stats = stats), queries['routes'])
+
+    if wanted('shortest_path_a_star'):
+        results['shortest_path_a_star'] = measure(lambda q, stats: q[0].shortest_path_a_star(q[1], q[2], mph, stats = stats), queries['routes'])
+
+    if wanted('engine_shortest_path'):
+        csr = engine.Engine(sorted(nodes.values(), key = lambda node: node.index))
+        for q in queries['routes']: # Build every hour's weights up front, so only searches are timed
+            csr.weights(q[2])
+        results['engine_shortest_path'] = measure(lambda q, stats: csr.shortest_path(q[0], q[1], q[2], stats = stats), queries['routes'])
+
+    if wanted('engine_shortest_path_a_star'):
+        csr = engine.Engine(sorted(nodes.values(), key = lambda node: node.index))
+        for q in queries['routes']:
+            csr.weights(q[2])
+        results['engine_shortest_path_a_star'] = measure(lambda q, stats: csr.shortest_path_a_star(q[0], q[1], q[2], mph, stats = stats), queries['routes'])
+
+    if wanted('assign_node'):
+        grid, grid_params = loader.snapping_grid(nodes, PARTITIONS) # Same snapping grid as T3/T4 initialize()
+        person = classes.Person(id = 0, timestamp = '01/01/2014 00:00:00')
+
+        def assign(coords, stats):
+            person.coords = coords
+            person.assign_node(coords, grid, grid_params)
+
+        results['assign_node'] = measure(assign, queries['coords'])
+
+    if wanted('get_kNN'):
+        kdtree = KDTree(nodes.values(), 0, 100)
+        results['get_kNN'] = measure(lambda coords, stats: kdtree.get_kNN(1, coords), queries['coords'])
+
+    if wanted('get_closest_driver') or wanted('get_edge_intersecting_length'):
+        partition = Grid()
+        for node in nodes.values():
+            partition.add_node(node)
+        partition.add_edges(edges)
+
+        if wanted('get_closest_driver'):
+            for driver in drivers:
+                partition.add_driver(driver)
+            results['get_closest_driver'] = measure(lambda q, stats: partition.get_closest_driver(*q), queries['requests'])
+
+        if wanted('get_edge_intersecting_length') and queries['crossing_edges']:
+            results['get_edge_intersecting_length'] = measure(lambda edge, stats: partition.get_grid_space(edge.start_node.coords).get_edge_intersecting_length(edge), queries['crossing_edges'])
+
+    return results
+
+def check_trees(nodes: dict, queries: dict, tolerance: float = 1e-9) -> list:
+    '''
+    Compare trees.ShortestPathTree minutes with Node.shortest_path's over the benchmark routes, plus routes to contracted
+    nodes from their chain neighbours (run after contraction to cover node.via)
+        - Returns [(source, target, tree minutes, shortest_path minutes)] where they differ
+    '''
+
+    node_list = sorted(nodes.values(), key = lambda node: node.index)
+    routes = list(queries['routes'])
+    start_times = [route[2] for route in queries['routes']]
+    contracted = [node for node in node_list if node.via is not None]
+    rng = random.Random(SEED)
+    for target in rng.sample(contracted, min(len(start_times), len(contracted))):
+        start_time = rng.choice(start_times)
+        routes += [(source, target, start_time) for source in list(target.via) + [edge.start_node for edge in target.incoming]]
+
+    mismatches = []
+    for source, target, start_time in routes:
+        tree = trees.ShortestPathTree(node_list, source, start_time, radius = math.inf)
+        expected, got = source.shortest_path(target, start_time), tree.travel_time(target)
+        if abs(got - expected) > tolerance:
+            mismatches.append((source, target, got, expected))
+    return mismatches
+
+def print_results(results: dict, baseline: dict = None, threshold: float = REGRESSION_THRESHOLD) -> list:
+    '''
+    Print one row per benchmark (and the ratio to the baseline mean if given)
+        - Returns names of benchmarks whose mean latency regressed by more than threshold
+    '''
+
+    regressions = []
+    print(f'{"benchmark":<30}{"calls":>7}{"mean ms":>11}{"p50 ms":>10}{"p90 ms":>10}{"p99 ms":>10}{"max ms":>10}{"settled":>10}{"peak KB":>10}{"vs base":>10}')
+    for name, result in results.items():
+        settled = f'{result["settled_mean"]:.0f}' if 'settled_mean' in result else '-'
+        peak = f'{result["peak_kb"]:.1f}' if result['peak_kb'] is not None else '-'
+        versus = '-'
+        if baseline and name in baseline:
+            ratio = result['mean_ms'] / baseline[name]['mean_ms']
+            versus = f'{ratio:.2f}x'
+            if ratio > 1 + threshold:
+                versus += ' !'
+                regressions.append(name)
+        print(f'{name:<30}{result["calls"]:>7}{result["mean_ms"]:>11.3f}{result["p50_ms"]:>10.3f}{result["p90_ms"]:>10.3f}{result["p99_ms"]:>10.3f}{result["max_ms"]:>10.3f}{settled:>10}{peak:>10}{versus:>10}')
+
+    return regressions
+
+def save_baseline(results: dict, path: str, meta: dict) -> None:
+    '''
+    Store results together with the parameters needed to reproduce them
+    '''
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok = True)
+    with open(path, 'w') as f:
+        json.dump({'meta': meta, 'results': results}, f, indent = 2)
+
+def load_baseline(path: str) -> dict:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description = 'Micro-benchmarks for NotUber routing, snapping and driver-search hot paths')
+    parser.add_argument('--data', default = None, help = 'data directory (defaults to the bundled data)')
+    parser.add_argument('--synthetic', type = int, default = None, metavar = 'SIZE', help = 'benchmark a SIZE x SIZE synthetic lattice city instead of data files')
+    parser.add_argument('--queries', type = int, default = QUERIES)
+    parser.add_argument('--seed', type = int, default = SEED)
+    parser.add_argument('--only', default = None, help = 'comma separated benchmark names')
+    parser.add_argument('--contract', action = 'store_true', help = 'contract degree-2 chains before benchmarking')
+    parser.add_argument('--check-trees', action = 'store_true', help = 'check shortest-path tree minutes against Node.shortest_path (with --contract: also through contracted chains)')
+    parser.add_argument('--save', nargs = '?', const = BASELINE_PATH, default = None, help = 'store results as baseline')
+    parser.add_argument('--compare', nargs = '?', const = BASELINE_PATH, default = None, help = 'compare against stored baseline')
+    parser.add_argument('--threshold', type = float, default = REGRESSION_THRESHOLD, help = 'relative mean slowdown reported as a regression')
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        nodes, edges = synthetic_network(args.synthetic, args.seed)
+        drivers, passengers = synthetic_people(max(args.queries, 1000), args.seed)
+        source = f'synthetic:{args.synthetic}'
+    else:
+        nodes = loader.load_nodes(args.data)
+        edges = loader.load_edges(nodes, args.data, classes.SpeedProfiles())
+        drivers = loader.load_drivers(args.data)
+        passengers = loader.load_passengers(args.data)
+        source = os.path.abspath(args.data or loader.DATA_DIR)
+    print(f'{source}: {len(nodes)} nodes, {len(edges)} edges, {len(drivers)} drivers, {len(passengers)} passengers')
+    if args.contract:
+        print(f'Contracted road graph: {contraction.contract(nodes, edges)}')
+        source += ':contracted'
+
+    if args.check_trees:
+        mismatches = check_trees(nodes, build_queries(nodes, edges, drivers, passengers, args.queries, args.seed))
+        for start, target, got, expected in mismatches[:10]:
+            print(f'Tree minutes differ: {start.id} -> {target.id}: {got} (shortest_path {expected})')
+        print(f'Shortest-path trees: {len(mismatches)} mismatches')
+        if mismatches:
+            return 1
+
+    results = run(nodes, edges, drivers, passengers, args.queries, args.seed, args.only.split(',') if args.only else None)
+
+    baseline = None
+    if args.compare:
+        stored = load_baseline(args.compare)
+        if stored['meta'].get('source') != source or stored['meta'].get('seed') != args.seed or stored['meta'].get('queries') != args.queries:
+            print(f'Warning: baseline was recorded with {stored["meta"]}')
+        baseline = stored['results']
+    regressions = print_results(results, baseline, args.threshold)
+
+    if args.save:
+        save_baseline(results, args.save, {
+            'source': source,
+            'seed': args.seed,
+            'queries': args.queries,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'recorded': dt.datetime.now().isoformat(timespec = 'seconds'),
+        })
+        print(f'Baseline saved to {args.save}')
+
+    if regressions:
+        print(f'Regressions over {args.threshold:.0%}: {", ".join(regressions)}')
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
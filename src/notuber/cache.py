@@ -0,0 +1,115 @@
+'''
+On-disk cache for arrays derived from the data files, stored as .npz (or .npy for memory-mapped tables) next to the
+data in <data_dir>/cache/
+
+Entries are keyed by a digest of the files they were built from (plus any parameters), so editing node_data.json,
+edges.csv or passengers.csv invalidates them. Set NOTUBER_CACHE=0 to always rebuild.
+'''
+
+import hashlib
+import os
+
+import numpy as np
+
+from . import loader
+
+ENABLED = os.environ.get('NOTUBER_CACHE', '1') != '0'
+
+_DIGESTS = {} # <(path, size, mtime): digest>, so each file is hashed once per process
+
+
+def file_digest(path: str) -> str:
+    '''
+    SHA-1 of a file's contents
+    '''
+
+    info = os.stat(path)
+    key = (os.path.abspath(path), info.st_size, info.st_mtime_ns)
+    if key not in _DIGESTS:
+        sha = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha.update(chunk)
+        _DIGESTS[key] = sha.hexdigest()
+    return _DIGESTS[key]
+
+def graph_digest(data_dir: str = None, *params) -> str:
+    '''
+    Digest of node_data.json and edges.csv, combined with any parameters the cached result depends on
+    '''
+
+    sha = hashlib.sha1()
+    for filename in ('node_data.json', 'edges.csv'):
+        sha.update(file_digest(loader.data_path(filename, data_dir)).encode())
+    sha.update(repr(params).encode())
+    return sha.hexdigest()
+
+def cached_nodes(name: str, workload: np.ndarray, snap, data_dir: str = None, *params) -> dict:
+    '''
+    Snapped node indices for a workload, from the cache or computed by snap()
+        - workload: array describing the people being snapped (e.g. trip records); its bytes are part of the key
+        - snap: function returning <column: node.index array>
+        - params: anything else the snapping depends on (method, grid size, ...)
+    '''
+
+    sha = hashlib.sha1(graph_digest(data_dir, *params).encode())
+    sha.update(np.ascontiguousarray(workload).tobytes())
+    return cached_arrays(f'snap_{name}', sha.hexdigest(), snap, data_dir)
+
+def cache_dir(data_dir: str = None) -> str:
+    return loader.data_path('cache', data_dir)
+
+def cached_arrays(name: str, key: str, build, data_dir: str = None) -> dict:
+    '''
+    Load <name: array> from the cache, or call build() and store its result
+        - key: digest identifying the inputs (e.g. graph_digest(data_dir, ...))
+        - A data directory that cannot be written to simply goes uncached
+    '''
+
+    path = os.path.join(cache_dir(data_dir), f'{name}-{key[:20]}.npz')
+    if ENABLED and os.path.exists(path):
+        try:
+            with np.load(path) as cached:
+                return {array: cached[array] for array in cached.files}
+        except (OSError, ValueError): # Truncated or corrupt entry, rebuild it
+            pass
+
+    arrays = build()
+    if ENABLED:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok = True)
+            temp = f'{path}.{os.getpid()}.tmp'
+            with open(temp, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(temp, path) # Readers never see a half-written file
+        except OSError:
+            pass
+
+    return arrays
+
+def cached_table(name: str, key: str, build, data_dir: str = None) -> np.ndarray:
+    '''
+    Memory-map a single array from the cache (.npy), or call build() and store its result
+        - Returns a read-only memory map when cached, otherwise the array build() returned
+    '''
+
+    path = os.path.join(cache_dir(data_dir), f'{name}-{key[:20]}.npy')
+    if ENABLED and os.path.exists(path):
+        try:
+            return np.load(path, mmap_mode = 'r')
+        except (OSError, ValueError):
+            pass
+
+    array = build()
+    if ENABLED:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok = True)
+            temp = f'{path}.{os.getpid()}.tmp'
+            with open(temp, 'wb') as f:
+                np.save(f, array)
+            os.replace(temp, path)
+            return np.load(path, mmap_mode = 'r')
+        except OSError:
+            pass
+
+    return array
@@ -0,0 +1,619 @@
+import datetime as dt
+import heapq
+import math
+import threading
+
+from .profiling import PROFILER
+
+### Based on sampling two points in NYC and calculating lat/lon mile distance
+LON2MI = 45.5
+LAT2MI = 60.0
+
+### Search workspaces (see SearchWorkspace): one per thread, with room for WORKSPACE_SIZE node indices
+WORKSPACE_SIZE = 0
+_WORKSPACES = threading.local()
+
+
+def record_search(name: str, stats: dict, settled: int, relaxed: int, pushes: int) -> None:
+    '''
+    Report counters of one graph search to the caller's stats dict and the profiler (if enabled)
+    '''
+
+    if stats is not None:
+        stats['settled'] = settled
+        stats['relaxed'] = relaxed
+        stats['pushes'] = pushes
+    if PROFILER.enabled:
+        PROFILER.count(f'{name}.searches')
+        PROFILER.count(f'{name}.settled', settled)
+        PROFILER.count(f'{name}.relaxed', relaxed)
+        PROFILER.count(f'{name}.pushes', pushes)
+
+class SearchWorkspace:
+    '''
+    Distance, parent and open-set arrays indexed by node.index, reused by every search on one thread
+        - An entry belongs to the current search only if its stamp equals the search's generation, so starting a search
+          is O(1) instead of clearing (or allocating) arrays the size of the graph
+    '''
+
+    def __init__(self, size: int = 0) -> None:
+        self.dist = []
+        self.parent = [] # node.index of the predecessor on the best path found, -1 at the source
+        self.stamp = [] # Generation that last wrote dist/parent
+        self.open = [] # Generation while a node is in an A* open set
+        self.generation = 0
+        self.reserve(size)
+
+    def __len__(self) -> int:
+        return len(self.dist)
+
+    def reserve(self, size: int) -> None:
+        grow = size - len(self.dist)
+        if grow > 0:
+            self.dist.extend([math.inf] * grow)
+            self.parent.extend([-1] * grow)
+            self.stamp.extend([0] * grow)
+            self.open.extend([0] * grow)
+
+    def begin(self) -> int:
+        '''
+        Start a search: every entry becomes stale
+            - Returns the new generation
+        '''
+
+        self.generation += 1
+        return self.generation
+
+    def route(self, target: int) -> list:
+        '''
+        Node indices from the last search's source to target, [] if the search did not reach it
+        '''
+
+        if self.stamp[target] != self.generation:
+            return []
+        route = [target]
+        while self.parent[route[-1]] >= 0:
+            route.append(self.parent[route[-1]])
+        return route[::-1]
+
+def reserve_workspaces(size: int) -> None:
+    '''
+    Make every thread's workspace large enough for node indices 0 .. size - 1 (loader.load_nodes calls this)
+    '''
+
+    global WORKSPACE_SIZE
+    WORKSPACE_SIZE = max(WORKSPACE_SIZE, size)
+
+def workspace() -> SearchWorkspace:
+    '''
+    This thread's search workspace
+    '''
+
+    ws = getattr(_WORKSPACES, 'workspace', None)
+    if ws is None:
+        ws = _WORKSPACES.workspace = SearchWorkspace(WORKSPACE_SIZE)
+    elif len(ws) < WORKSPACE_SIZE:
+        ws.reserve(WORKSPACE_SIZE)
+    return ws
+
+class NotUberObject:
+
+    def __init__(self, id: int = None, lat: float = None, lon: float = None) -> None:
+        self.id = id
+        self.coords = (lat, lon)
+
+        self.node = None
+
+    def __eq__(self, other) -> bool:
+        return isinstance(self, NotUberObject) and isinstance(other, NotUberObject) and self.id == other.id
+    
+    def __hash__(self) -> int:
+        return self.id # This is a really bad hashcode but its fine since we're only ever hashing objects of the same type
+
+    def euclidean_dist(self, other, *args, **kwargs) -> float:
+        '''
+        Return distance between latitude/longitude coordinates
+            - Object must have coords attribute
+        '''
+
+        if not self.coords or not other.coords:
+            print('Missing latitude/longitude coordinates')
+            return
+        
+        return math.sqrt((self.coords[0] - other.coords[0])**2 + (self.coords[1] - other.coords[1])**2)
+
+    def network_dist(self, other, time) -> float:
+        '''
+        Return length/time of shortest path through network 
+            - Object must have node attribute
+            - Call on object that is actually travelling (i.e. driver.network_dist(passenger, driver.time))
+        '''
+
+        if not self.node or not other.node:
+            print('Objects not on network')
+            return 
+        
+        if not self.time:
+            print('No time specified')
+            return
+        
+        return self.node.shortest_path(end_node = other.node, start_time = time)
+
+class Node(NotUberObject):
+
+    def __init__(self, id: int = None, lat: float = None, lon: float = None) -> None:
+        super().__init__(id, lat, lon)
+
+        self.neighbors = [] # Edge objects to node neighbors
+        self.incoming = [] # Edge objects from nodes leading here (original edges, also after contraction)
+        self.drivers = [] # Driver objects at node
+        self.index = None # Position in the loaded graph (0 .. len(nodes) - 1), set by loader.load_nodes
+        self.via = None # Set if contracted out of the search graph: <entry Node: [edges from entry to this node]> (see contraction.py)
+        self.components = None # components.ComponentIndex of this node's graph once indexed; lets searches reject unreachable pairs up front
+
+    def __eq__(self, other) -> bool:
+        return isinstance(self, Node) and isinstance(other, Node) and self.id == other.id
+
+    def __hash__(self) -> int:
+        return self.id if self.id is not None else super().__hash__() 
+
+    def __lt__(self, other) -> bool:
+        return self.id < other.id # Breaks distance ties in search heaps
+
+    def shortest_path(self, end_node, start_time: dt.datetime, stats: dict = None) -> float:
+        '''
+        Dijkstra's Algorithm to find shortest travel time between two nodes
+            - stats: if given, receives 'settled' (nodes expanded), 'relaxed' (edges scanned) and 'pushes' (heap pushes)
+
+        Returns -1 if no path is found
+        '''
+
+        if self.components is not None and not self.components.reachable(self, end_node): # No path, skip the search
+            record_search('shortest_path', stats, 0, 0, 0)
+            return -1
+
+        ws = workspace()
+        generation = ws.begin()
+        dist, stamp, parent = ws.dist, ws.stamp, ws.parent
+        dist[self.index], stamp[self.index], parent[self.index] = 0, generation, -1
+        goal = end_node.index
+        pq = [(0, self)]
+        settled = relaxed = pushes = 0
+        via = end_node.via # Only reachable through its chain entries if contracted away
+
+        while pq:
+            current_dist, current_node = heapq.heappop(pq)
+            current = current_node.index
+            
+            if current == goal:
+                record_search('shortest_path', stats, settled, relaxed, pushes)
+                return current_dist
+            
+            if current_dist > dist[current]:
+                continue
+            
+            settled += 1
+            if via is not None and current_node in via:
+                for prefix in via[current_node]:
+                    heapq.heappush(pq, (current_dist + sum(edge.travel_time(start_time) for edge in prefix), end_node))
+                    pushes += 1
+            relaxed += len(current_node.neighbors)
+            for edge in current_node.neighbors:
+                neighbor = edge.end_node
+                new_dist = current_dist + edge.travel_time(start_time) # Heuristic - finding path with shortest time to destination at start time (without accounting for changes during travel)
+                i = neighbor.index
+                if stamp[i] != generation or new_dist < dist[i]:
+                    dist[i], stamp[i], parent[i] = new_dist, generation, current
+                    heapq.heappush(pq, (new_dist, neighbor))
+                    pushes += 1
+                    
+        record_search('shortest_path', stats, settled, relaxed, pushes)
+        return -1
+    
+    def shortest_path_a_star(self, end_node, start_time: dt.datetime, AVG_MPH, stats: dict = None) -> float:
+        '''
+        A* pathfinding algorithm to find shortest travel time between two nodes. Prioritizes paths that seem to be leading closer to the end_node.
+            - stats: if given, receives 'settled' (nodes expanded), 'relaxed' (edges scanned) and 'pushes' (heap pushes)
+
+        Returns -1 if no path is found
+        '''
+
+        def heuristic(start: Node, end: Node):
+            '''
+            Heuristic function: Estimate of time needed to travel path (based on Euclidian distance and average speed across network). 
+            The average speed across the network (AVG_MPH) is calculated in the initialize() method. 
+            The LON2MI and LAT2MI are used to convert lat and long to miles based on sampling two points in NYC and calculating lat/lon mile distance.
+            '''
+            lat_dist = abs(start.coords[0] - end.coords[0])
+            lon_dist = abs(start.coords[1] - end.coords[1])
+
+            lat_dist_in_miles = lat_dist * LAT2MI
+            lon_dist_in_miles = lon_dist * LON2MI
+            
+            distance_in_miles = math.sqrt((lat_dist_in_miles)**2 + (lon_dist_in_miles)**2)
+
+            time = 60*distance_in_miles/AVG_MPH
+            return time
+        
+        if self.components is not None and not self.components.reachable(self, end_node): # No path, skip the search
+            record_search('shortest_path_a_star', stats, 0, 0, 0)
+            return -1
+
+        ws = workspace()
+        generation = ws.begin()
+        g, stamp, parent, open_set = ws.dist, ws.stamp, ws.parent, ws.open # open_set[i] == generation: node i is in the open set
+        start, goal = self.index, end_node.index
+        g[start], stamp[start], parent[start], open_set[start] = 0, generation, -1, generation
+        open_nodes = [(heuristic(self, end_node), self)]
+        settled = relaxed = pushes = 0
+        via = end_node.via # Only reachable through its chain entries if contracted away
+        
+        while len(open_nodes) > 0:
+            _, curr_node = heapq.heappop(open_nodes)
+            curr = curr_node.index
+            open_set[curr] = 0
+            
+            if curr == goal:
+                record_search('shortest_path_a_star', stats, settled, relaxed, pushes)
+                return g[curr]
+            
+            settled += 1
+            if via is not None and curr_node in via:
+                for prefix in via[curr_node]:
+                    new_g = g[curr] + sum(edge.travel_time(start_time) for edge in prefix)
+                    if stamp[goal] != generation or new_g < g[goal]:
+                        g[goal], stamp[goal], parent[goal] = new_g, generation, curr
+                        if open_set[goal] != generation:
+                            open_set[goal] = generation
+                            heapq.heappush(open_nodes, (new_g, end_node))
+                            pushes += 1
+            relaxed += len(curr_node.neighbors)
+            for edge in curr_node.neighbors:
+                neighbor = edge.end_node
+                new_g = g[curr] + edge.travel_time(start_time)
+                i = neighbor.index
+                if stamp[i] != generation or new_g < g[i]:
+                    g[i], stamp[i], parent[i] = new_g, generation, curr
+                    new_f = new_g + heuristic(neighbor, end_node)
+                    if open_set[i] != generation:
+                        open_set[i] = generation
+                        heapq.heappush(open_nodes, (new_f, neighbor))
+                        pushes += 1
+        
+        record_search('shortest_path_a_star', stats, settled, relaxed, pushes)
+        return -1
+    
+    def isochrone(self, start_time: dt.datetime, budget: float, reverse: bool = False, stats: dict = None) -> dict:
+        '''
+        Every node reachable from this node within budget minutes (Dijkstra that never expands past the budget)
+            - reverse: instead find every node that can reach this node within budget, along node.incoming
+            - stats: if given, receives 'settled' (nodes expanded), 'relaxed' (edges scanned) and 'pushes' (heap pushes)
+
+        Returns <Node: minutes>, including this node at 0. Edge times are taken at start_time, as in shortest_path.
+        '''
+
+        ws = workspace()
+        generation = ws.begin()
+        dist, stamp = ws.dist, ws.stamp
+        dist[self.index], stamp[self.index] = 0, generation
+        reached = [] # Nodes settled, in order
+        chain_nodes = {} # <contracted node.index: (minutes, Node)>, only reached along ChainEdges
+        pq = [(0, self)]
+        settled = relaxed = pushes = 0
+
+        while pq:
+            current_dist, current_node = heapq.heappop(pq)
+            if current_dist > dist[current_node.index]:
+                continue
+            reached.append(current_node)
+
+            settled += 1
+            edges = current_node.incoming if reverse else current_node.neighbors
+            relaxed += len(edges)
+            for edge in edges:
+                if not reverse and isinstance(edge, ChainEdge): # Label the contracted nodes along the chain without expanding them
+                    chain_dist = current_dist
+                    for link in edge.chain[:-1]:
+                        chain_dist += link.travel_time(start_time)
+                        if chain_dist > budget:
+                            break
+                        if chain_dist < chain_nodes.get(link.end_node.index, (budget + 1,))[0]:
+                            chain_nodes[link.end_node.index] = (chain_dist, link.end_node)
+                neighbor = edge.start_node if reverse else edge.end_node
+                new_dist = current_dist + edge.travel_time(start_time)
+                i = neighbor.index
+                if new_dist <= budget and (stamp[i] != generation or new_dist < dist[i]):
+                    dist[i], stamp[i] = new_dist, generation
+                    heapq.heappush(pq, (new_dist, neighbor))
+                    pushes += 1
+
+        for i, (chain_dist, node) in chain_nodes.items(): # Settled nodes keep their label if it is no larger
+            if stamp[i] != generation:
+                reached.append(node)
+            elif chain_dist >= dist[i]:
+                continue
+            dist[i], stamp[i] = chain_dist, generation
+        record_search('isochrone', stats, settled, relaxed, pushes)
+        return {node: dist[node.index] for node in reached}
+
+    def partition(self, grid: list = None, grid_params: list = None) -> None:
+        '''
+        Partition node into grid
+            - grid: m x m matrix of lists representing subpartitions (WILL BE MUTATED)
+            - grid_params: [num_partitions, minlat, maxlat, minlon, maxlon]
+
+        grid and grid_params are global variables in each file that are set by the initialize function
+        '''
+
+        lat, lon = self.coords
+        num_partitions, minlat, maxlat, minlon, maxlon = grid_params
+        side = math.ceil(math.sqrt(num_partitions))
+        lat_idx, lon_idx = math.floor( side*(lat - minlat) / (maxlat - minlat) ), math.floor( side*(lon - minlon) / (maxlon - minlon) ) # Index of subpartition in grid
+        
+        # Edge cases
+        if lat_idx == side:
+            lat_idx -= 1 
+        if lon_idx == side:
+            lon_idx -= 1
+
+        grid[lat_idx][lon_idx].append(self) # Add node to appropriate subpartition
+        
+class Person(NotUberObject):
+
+    def __init__(self, id: int = None, timestamp: str = None, lat: float = None, lon: float = None) -> None:
+        super().__init__(id, lat, lon)
+        self.time = timestamp if isinstance(timestamp, dt.datetime) else dt.datetime.strptime(timestamp, "%m/%d/%Y %H:%M:%S")
+        self.node = None
+
+    def __eq__(self, other) -> bool:
+        return isinstance(self, Person) and isinstance(other, Person) and self.id == other.id
+
+    def __lt__(self, other) -> bool:
+        return self.time < other.time
+    
+    def __le__(self, other) -> bool:
+        return self.time <= other.time
+    
+    def __gt__(self, other) -> bool:
+        return self.time > other.time
+    
+    def __ge__(self, other) -> bool:
+        return self.time >= other.time
+
+    def partition(self, coords: tuple = None, grid_params: list = None) -> tuple:
+        '''
+        Find subpartition of Person
+            - coods: Lat/lon coordinates of object to be partitioned
+            - grid_params: [num_partitions, minlat, maxlat, minlon, maxlon]
+        '''
+
+        lat, lon = coords
+        num_partitions, minlat, maxlat, minlon, maxlon = grid_params
+        side = math.ceil(math.sqrt(num_partitions))
+        lat_idx, lon_idx = math.floor( side*(lat - minlat) / (maxlat - minlat) ), math.floor( side*(lon - minlon) / (maxlon - minlon) )
+
+        # Edge cases
+        if lat_idx >= side:
+            lat_idx = side - 1
+        elif lat_idx < 0:
+            lat_idx = 0
+        if lon_idx >= side:
+            lon_idx = side - 1
+        elif lon_idx < 0:
+            lon_idx = 0
+
+        # Index of subpartition in grid matrix
+        return (lat_idx, lon_idx)
+    
+    def grid_search(self, idx1, idx2, n, side):
+        '''
+        Subpartitions within n of (idx1, idx2) on a side x side grid
+        '''
+
+        surrounding_grid = []
+        for i in range(max(0, idx1-n), min(side, idx1+n+1)):
+            for j in range(max(0, idx2-n), min(side, idx2+n+1)):
+                surrounding_grid.append((i, j))
+        
+        return surrounding_grid
+    
+    def assign_node(self, coords: tuple = None, grid: list = None, grid_params: list = None) -> Node:
+        '''
+        Assign Person to nearest node given coordinates and partition grid
+            - - coods: Lat/lon coordinates of object to be partitioned
+            - grid: nodes in graph grouped by subpartition
+            - grid_params: [num_partitions, minlat, maxlat, minlon, maxlon]
+        '''
+
+        lat_idx, lon_idx = self.partition(coords, grid_params) # Get subpartition of object
+        side = len(grid)
+
+        # Get surrounding subpartitions (max 3x3 grid surrounding subpartition)
+        nodes = []
+        n = 1
+        while not nodes:
+            search_space = self.grid_search(lat_idx, lon_idx, n, side)
+            for idx1, idx2 in search_space:
+                nodes.extend(grid[idx1][idx2])
+            n += 1
+
+        # Find nearest node
+        nearest_node = None
+        min_dist = float('inf')
+        for node in nodes:
+            dist = math.sqrt((coords[0] - node.coords[0])**2 + (coords[1] - node.coords[1])**2)
+            if dist < min_dist:
+                nearest_node = node
+                min_dist = dist
+
+        return nearest_node
+
+class Driver(Person):
+
+    def __init__(self, id: int = None, timestamp: str = None, lat: float = None, lon: float = None) -> None:
+        super().__init__(id, timestamp, lat, lon)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(self, Driver) and isinstance(other, Driver) and self.id == other.id
+    
+    def __hash__(self) -> int:
+        return self.id
+
+class Passenger(Person):
+
+    def __init__(self, id: int = None, timestamp: str = None, start_lat: float = None, start_lon: float = None, end_lat: float = None, end_lon: float = None, start_node: Node = None, end_node: Node = None) -> None:
+        super().__init__(id, timestamp, start_lat, start_lon)
+        self.end_coords = (end_lat, end_lon)
+
+        self.end_node = None 
+
+    def __eq__(self, other) -> bool:
+        return isinstance(self, Passenger) and isinstance(other, Passenger) and self.id == other.id
+
+    def euclidean_dist(self, other, time = 'start') -> float:
+        '''
+        Return distance between latitude/longitude coordinates
+            - Object must have coords attribute
+            - time: {'start', 'end'} specifies whether you want the distance to/from the passenger's start location or end location
+        '''
+
+        if not self.coords or not other.coords:
+            print('Missing latitude/longitude coordinates')
+            return
+        
+        if time == 'start':
+            return math.sqrt((self.coords[0] - other.coords[0])**2 + (self.coords[1] - other.coords[1])**2)
+        if time == 'end':
+            return math.sqrt((self.end_coords[0] - other.coords[0])**2 + (self.end_coords[1] - other.coords[1])**2)
+
+class SpeedProfiles:
+    '''
+    Table of distinct hourly speed profiles shared by edges (see loader.load_edges(..., profiles = SpeedProfiles()))
+        - Each distinct (weekday, weekend) profile is stored once as two 24-tuples of floats; edges hold its id and
+          references to the shared tuples instead of two dicts of strings
+        - Equal speeds are interned too, so hours with the same speed share one float object
+    '''
+
+    def __init__(self) -> None:
+        self.profiles = [] # <profile_id: (weekday_speeds, weekend_speeds)>
+        self._ids = {} # <raw or parsed profile: profile_id>
+        self._speeds = {} # <mph: mph>, one float object per distinct speed
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    def intern(self, weekday_speeds, weekend_speeds) -> int:
+        '''
+        Id of a profile given its 24 weekday and 24 weekend speeds (strings or numbers), adding it if new
+        '''
+
+        raw = (tuple(weekday_speeds), tuple(weekend_speeds))
+        profile_id = self._ids.get(raw)
+        if profile_id is not None:
+            return profile_id
+
+        parsed = (tuple(self._speed(mph) for mph in raw[0]), tuple(self._speed(mph) for mph in raw[1]))
+        profile_id = self._ids.get(parsed) # Same speeds spelled differently, e.g. '25' and '25.0'
+        if profile_id is None:
+            profile_id = len(self.profiles)
+            self.profiles.append(parsed)
+            self._ids[parsed] = profile_id
+        self._ids[raw] = profile_id
+        return profile_id
+
+    def _speed(self, mph) -> float:
+        mph = float(mph)
+        return self._speeds.setdefault(mph, mph)
+
+    def steps(self, profile_id: int, weekend: bool = False) -> list:
+        '''
+        Profile collapsed into runs of equal speed: [(first_hour, mph), ...]
+        '''
+
+        steps = []
+        for hour, mph in enumerate(self.profiles[profile_id][weekend]):
+            if not steps or steps[-1][1] != mph:
+                steps.append((hour, mph))
+        return steps
+
+    def hour_groups(self, weekend: bool = False) -> list:
+        '''
+        Hours grouped where every profile has the same speed, e.g. [[0, 1, 2, 3, 4, 5], [6], ...]: per-hour tables
+        (edge weights, grid averages) only need building once per group
+        '''
+
+        groups = []
+        for hour in range(24):
+            if groups and all(speeds[weekend][hour] == speeds[weekend][hour - 1] for speeds in self.profiles):
+                groups[-1].append(hour)
+            else:
+                groups.append([hour])
+        return groups
+
+class Edge:
+
+    __slots__ = ('start_node', 'end_node', 'length', 'weekday_speeds', 'weekend_speeds', 'profile')
+
+    def __init__(self, start_node: Node = None, end_node: Node = None, length: float = None, weekday_speeds: dict = None, weekend_speeds: dict = None, profile: int = None) -> None:
+        '''
+            - weekday_speeds/weekend_speeds: indexable by hour (dict of strings from edges.csv, or shared tuples of floats)
+            - profile: id in a SpeedProfiles table when the speeds are interned
+        '''
+        self.start_node = start_node
+        self.end_node = end_node
+        self.length = float(length)
+        self.weekday_speeds = weekday_speeds
+        self.weekend_speeds = weekend_speeds
+        self.profile = profile
+
+    def travel_time(self, start_time: dt.datetime) -> float:
+        '''
+        Get time to travel over an edge given start time
+        '''
+
+        hour = start_time.hour
+        if start_time.weekday() > 4:
+            return 60*self.length / float(self.weekend_speeds[hour])
+        else:
+            return 60*self.length / float(self.weekday_speeds[hour])
+        
+    def __eq__(self, other: object) -> bool:
+        return (isinstance(other, self.__class__) and 
+            ((self.start_node == other.start_node and self.end_node == other.end_node) or
+             (self.end_node == other.start_node and self.start_node == other.end_node)))
+        
+    def __hash__(self) -> int:
+        return round(0.5 * (self.start_node.id + self.end_node.id)*(self.start_node.id + self.end_node.id + 1) + self.end_node.id)
+
+class ChainEdge(Edge):
+    '''
+    Edge standing in for a contracted chain of edges (see contraction.py), with per-hour travel times summed over the chain
+        - Speeds are the equivalent average mph over the chain's total length, for code that reads weekday_speeds/weekend_speeds
+    '''
+
+    __slots__ = ('weekday_minutes', 'weekend_minutes', 'chain')
+
+    def __init__(self, chain: list) -> None:
+        length = sum(edge.length for edge in chain)
+        self.weekday_minutes = tuple(sum(60*edge.length / float(edge.weekday_speeds[hour]) for edge in chain) for hour in range(24))
+        self.weekend_minutes = tuple(sum(60*edge.length / float(edge.weekend_speeds[hour]) for edge in chain) for hour in range(24))
+        super().__init__(chain[0].start_node, chain[-1].end_node, length,
+                         tuple(60*length / minutes for minutes in self.weekday_minutes), tuple(60*length / minutes for minutes in self.weekend_minutes))
+        self.chain = chain # Original edges, in order
+
+    def travel_time(self, start_time: dt.datetime) -> float:
+        if start_time.weekday() > 4:
+            return self.weekend_minutes[start_time.hour]
+        return self.weekday_minutes[start_time.hour]
+        
+'''
+class Ride:
+
+    def __init__(self, start_time: str = None, end_time: str = None, driver: int = None, passenger: int = None, start_lat: float = None, start_lon: float = None, end_lat: float = None, end_lon: float = None) -> None:
+        self.start_time = dt.datetime.strptime(start_time, "%m/%d/%Y %H:%M:%S")
+        self.end_time = dt.datetime.strptime(end_time, "%m/%d/%Y %H:%M:%S")
+        self.driver = driver
+        self.passenger = passenger
+        self.start_coords = (start_lat, start_lon)
+        self.end_coords = (end_lat, end_lon)
+'''
\ No newline at end of file
@@ -0,0 +1,169 @@
+'''
+The `notuber` command
+
+    notuber simulate --matcher astar --data DIR --limit 5000
+    notuber startup --runs 20                     # startup-time benchmark, fails when over budget
+    notuber benchmark --synthetic 150             # every other command runs a module's own command line
+    notuber daemon serve --data DIR &
+
+Commands import what they need when they run (down to json and subprocess): `notuber --help` and `import notuber` load neither numpy nor the
+simulation modules, so the many short runs our tooling launches don't pay for them.
+'''
+
+import argparse
+import importlib
+import os
+import sys
+import time
+
+from . import MATCHERS
+from . import load_matcher
+
+### Commands handled by a module's main(argv): <command: (module, help)>
+TOOLS = {
+    'benchmark': ('benchmark', 'hot-path micro-benchmarks'),
+    'bench-matchers': ('bench_matchers', 'matcher throughput and scaling'),
+    'replay': ('replay', 'real-time replay of passengers.csv against a matcher'),
+    'serve': ('server', 'dispatch service on a local socket'),
+    'client': ('client', 'load-test client for the dispatch service'),
+    'shard': ('sharding', 'time-sharded parallel simulation'),
+    'daemon': ('daemon', 'warm graph daemon for repeated simulation jobs'),
+    'generate': ('generator', 'synthetic city and workload'),
+}
+
+### Startup benchmark
+STARTUP_RUNS = 20
+STARTUP_BUDGET_MS = 50.0 # Median time over a bare interpreter start, for `import notuber` and `notuber --help`
+HEAVY_MODULES = ('numpy', 'notuber.classes', 'notuber.simulation') # Must not be imported by startup alone
+
+
+def simulate(args) -> int:
+    import json
+    import random
+
+    from . import simulation
+    from .profiling import PROFILER
+
+    if args.profile:
+        PROFILER.enable(None if args.profile is True else args.profile)
+    matcher = load_matcher(args.matcher)
+
+    start = time.perf_counter()
+    matcher.initialize(args.data)
+    print(f'Finished initializing {matcher.__name__} in {time.perf_counter() - start} seconds')
+
+    random.seed(args.seed) # Driver drop-out is random
+    metrics = simulation.Metrics()
+    start = time.perf_counter()
+    simulation.run(matcher, matcher.PASSENGERS[:args.limit] if args.limit else matcher.PASSENGERS, metrics, progress = args.progress)
+    metrics.print_summary(len(matcher.DRIVERS))
+    for stage in (getattr(matcher, 'HOTSPOTS', None), getattr(matcher, 'DROPOFFS', None)):
+        if stage is not None:
+            print(stage.summary())
+    PROFILER.report()
+    print(f'Simulation Runtime: {time.perf_counter() - start} seconds')
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(metrics.summary(len(matcher.DRIVERS)), f, indent = 2)
+    return 0
+
+def package_env() -> dict:
+    '''
+    Environment for child interpreters that import this copy of the package (installed or not)
+    '''
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return dict(os.environ, PYTHONPATH = os.pathsep.join(filter(None, [root, os.environ.get('PYTHONPATH')])))
+
+def time_command(command: list, runs: int) -> list:
+    '''
+    Sorted wall-clock milliseconds of `runs` runs of a command
+    '''
+
+    import subprocess
+
+    env = package_env()
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, env = env, stdout = subprocess.DEVNULL, check = True)
+        times.append((time.perf_counter() - start) * 1000)
+    return sorted(times)
+
+def startup(args) -> int:
+    '''
+    Time `import notuber` and `notuber --help` against a bare interpreter start; fail if either median exceeds the
+    budget, or if they import one of HEAVY_MODULES
+    '''
+
+    import subprocess
+
+    commands = {'python': [sys.executable, '-c', 'pass'], 'import notuber': [sys.executable, '-c', 'import notuber'],
+                'notuber --help': [sys.executable, '-m', 'notuber', '--help']}
+
+    print(f'{"command":<18}{"min ms":>9}{"median ms":>11}{"max ms":>9}{"over python":>13}')
+    base = None
+    over_budget = []
+    for name, command in commands.items():
+        times = time_command(command, args.runs)
+        median = times[len(times) // 2]
+        base = median if base is None else base
+        print(f'{name:<18}{times[0]:>9.1f}{median:>11.1f}{times[-1]:>9.1f}{median - base:>13.1f}')
+        if median - base > args.budget_ms:
+            over_budget.append(name)
+
+    env = package_env()
+    check = f'import sys; import notuber.cli; print(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))'
+    heavy = subprocess.run([sys.executable, '-c', check], env = env, capture_output = True, text = True, check = True).stdout.strip()
+
+    if args.importtime:
+        report = subprocess.run([sys.executable, '-X', 'importtime', '-m', 'notuber', '--help'], env = env, capture_output = True, text = True).stderr
+        rows = [line.split('|') for line in report.splitlines() if line.startswith('import time:') and 'cumulative' not in line]
+        rows.sort(key = lambda row: -int(row[1]))
+        print('\nSlowest imports (cumulative us):')
+        for row in rows[:args.importtime]:
+            print(f'{int(row[1]):>10}  {row[2].strip()}')
+
+    if heavy:
+        print(f'Startup imports {heavy}; import it where it is used instead')
+    if over_budget:
+        print(f'Over the {args.budget_ms:g} ms startup budget: {", ".join(over_budget)}')
+    return 1 if heavy or over_budget else 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog = 'notuber', description = 'NotUber ride matching simulations')
+    commands = parser.add_subparsers(dest = 'command', required = True, metavar = 'command')
+
+    run = commands.add_parser('simulate', help = 'simulate a matcher on a workload')
+    run.add_argument('--matcher', default = 'astar', help = f'matcher name or alias ({", ".join(MATCHERS)})')
+    run.add_argument('--data', default = None, help = 'data directory (defaults to the bundled data or NOTUBER_DATA)')
+    run.add_argument('--limit', type = int, default = None, help = 'simulate only the first N passengers')
+    run.add_argument('--seed', type = int, default = None, help = 'seed driver drop-out for a reproducible run')
+    run.add_argument('--progress', type = int, default = 0, help = 'report elapsed time every N passengers')
+    run.add_argument('--profile', nargs = '?', const = True, default = None, metavar = 'PROF_FILE', help = 'print profiler phases (and dump cProfile stats to PROF_FILE)')
+    run.add_argument('--out', default = None, help = 'write the metrics summary as JSON')
+    run.set_defaults(handler = simulate)
+
+    bench = commands.add_parser('startup', help = 'benchmark import and command startup time against a budget')
+    bench.add_argument('--runs', type = int, default = STARTUP_RUNS)
+    bench.add_argument('--budget-ms', type = float, default = STARTUP_BUDGET_MS, help = 'allowed median over a bare interpreter start')
+    bench.add_argument('--importtime', type = int, nargs = '?', const = 15, default = 0, metavar = 'N', help = 'also list the N slowest imports')
+    bench.set_defaults(handler = startup)
+
+    for name, (_, description) in TOOLS.items(): # Listed for --help; their arguments belong to the module
+        commands.add_parser(name, help = description, add_help = False)
+    return parser
+
+def main(argv: list = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in TOOLS:
+        module, _ = TOOLS[argv[0]]
+        sys.argv[0] = f'notuber {argv[0]}' # Usage lines of the module's parser
+        return importlib.import_module(f'{__package__}.{module}').main(argv[1:])
+
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
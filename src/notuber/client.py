@@ -0,0 +1,152 @@
+'''
+Load-test client for the dispatch service (server.py, `notuber serve`): replays passengers.csv (and optionally drivers.csv) as JSON-lines requests
+
+Requests are sent at their Date/Time compressed by --speedup, or as fast as the server accepts them with --speedup 0.
+Round-trip latency is measured per request; "overloaded" replies are retried after --retry-ms.
+
+    notuber client --port 8330 --speedup 600 --limit 2000
+    notuber client --unix /tmp/notuber.sock --send-drivers --speedup 0
+'''
+
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+
+from . import loader
+
+### Defaults
+SPEEDUP = 0.0 # 0 sends as fast as possible
+RETRY_MS = 50.0
+TIME_FORMAT = '%m/%d/%Y %H:%M:%S'
+
+
+def build_messages(data_dir: str = None, limit: int = None, send_drivers: bool = False) -> list:
+    '''
+    Ride requests (and driver arrivals) as (timestamp, message) in time order
+    '''
+
+    passengers = loader.load_passengers(data_dir)
+    passengers = passengers[:limit] if limit else passengers
+    messages = [(passenger.time, {'type': 'ride', 'id': f'p{passenger.id}', 'time': passenger.time.strftime(TIME_FORMAT),
+                                  'lat': passenger.coords[0], 'lon': passenger.coords[1],
+                                  'dest_lat': passenger.end_coords[0], 'dest_lon': passenger.end_coords[1]})
+                for passenger in passengers]
+    if send_drivers:
+        messages.extend((driver.time, {'type': 'driver', 'id': driver.id, 'status': 'available', 'time': driver.time.strftime(TIME_FORMAT),
+                                       'lat': driver.coords[0], 'lon': driver.coords[1]})
+                        for driver in loader.load_drivers(data_dir))
+    messages.sort(key = lambda row: (row[0], row[1]['type'] == 'ride')) # Drivers first when simultaneous
+    return messages
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)] if ordered else float('nan')
+
+async def replay(messages: list, host: str, port: int, unix: str = None, speedup: float = SPEEDUP, retry_ms: float = RETRY_MS) -> dict:
+    '''
+    Send every message and wait for all replies
+        - Returns {'latencies': [ms per ride], 'replies': [...], 'retries': n}
+    '''
+
+    if unix:
+        reader, writer = await asyncio.open_unix_connection(unix)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+
+    loop = asyncio.get_running_loop()
+    waiting = {} # <message id: future>; ride ids are strings and driver ids ints, stats has none
+    retries = 0
+
+    async def read_replies():
+        async for line in reader:
+            reply = json.loads(line)
+            future = waiting.get(reply.get('id'))
+            if future is not None and not future.done():
+                future.set_result(reply)
+
+    async def request(message):
+        nonlocal retries
+        sent = time.perf_counter() # Latency includes time spent retrying
+        while True:
+            future = waiting[message.get('id')] = loop.create_future()
+            writer.write((json.dumps(message) + '\n').encode())
+            await writer.drain()
+            reply = await future
+            if reply.get('error') != 'overloaded':
+                del waiting[message.get('id')]
+                return reply, (time.perf_counter() - sent) * 1000
+            retries += 1
+            await asyncio.sleep(retry_ms / 1000)
+
+    receiver = asyncio.ensure_future(read_replies())
+    tasks = []
+    first = messages[0][0] if messages else None
+    start = time.perf_counter()
+    for timestamp, message in messages:
+        if speedup > 0:
+            delay = (timestamp - first).total_seconds() / speedup - (time.perf_counter() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(request(message)))
+        await asyncio.sleep(0) # Let the request go out before building the next one
+    results = await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    server_stats, _ = await request({'type': 'stats'})
+    receiver.cancel()
+    writer.close()
+
+    return {
+        'replies': [reply for reply, _ in results],
+        'latencies': [latency for (reply, latency), (_, message) in zip(results, messages) if message['type'] == 'ride'],
+        'retries': retries,
+        'elapsed': elapsed,
+        'server': server_stats,
+    }
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description = 'Replay passengers.csv against a running dispatch service (notuber serve)')
+    parser.add_argument('--data', default = None, help = 'data directory (defaults to the bundled data)')
+    parser.add_argument('--host', default = '127.0.0.1')
+    parser.add_argument('--port', type = int, default = 8330)
+    parser.add_argument('--unix', default = None, help = 'connect to this Unix socket path instead of TCP')
+    parser.add_argument('--speedup', type = float, default = SPEEDUP, help = 'simulated seconds per wall-clock second (0 sends as fast as possible)')
+    parser.add_argument('--limit', type = int, default = None, help = 'send only the first N passengers')
+    parser.add_argument('--send-drivers', action = 'store_true', help = 'also send drivers.csv as status updates (for servers started with --empty-fleet)')
+    parser.add_argument('--retry-ms', type = float, default = RETRY_MS, help = 'wait before resending an overloaded request')
+    parser.add_argument('--out', default = None, help = 'write every reply as JSON lines')
+    args = parser.parse_args(argv)
+
+    messages = build_messages(args.data, args.limit, args.send_drivers)
+    print(f'Sending {len(messages)} messages')
+    result = asyncio.run(replay(messages, args.host, args.port, args.unix, args.speedup, args.retry_ms))
+
+    replies = result['replies']
+    latencies = result['latencies']
+    assigned = sum(reply['type'] == 'assignment' for reply in replies)
+    unassigned = sum(reply['type'] == 'unassigned' for reply in replies)
+    errors = sum(reply['type'] == 'error' for reply in replies)
+    pickups = [reply['pickup_eta'] for reply in replies if reply['type'] == 'assignment']
+
+    print(f'Finished in {result["elapsed"]:.2f} seconds ({len(latencies) / result["elapsed"]:.1f} rides/s)')
+    print(f'Assigned: {assigned}, unassigned: {unassigned}, errors: {errors}, overloaded retries: {result["retries"]}')
+    if latencies:
+        print(f'Round trip ms: mean {sum(latencies) / len(latencies):.1f}, p50 {percentile(latencies, 50):.1f}, p95 {percentile(latencies, 95):.1f}, p99 {percentile(latencies, 99):.1f}, max {max(latencies):.1f}')
+    if pickups:
+        print(f'Mean pickup ETA: {sum(pickups) / len(pickups):.2f} minutes')
+    if result['server']:
+        server = result['server']
+        print(f'Server: {server["batches"]} batches, largest {server["largest_batch"]}, {server["rejected"]} rejected, {server["match_seconds"]:.2f} s matching')
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            for reply in replies:
+                f.write(json.dumps(reply) + '\n')
+
+    return 0 if not errors else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,188 @@
+'''
+Strongly connected components of the road graph, for O(1) "no route" answers
+
+Labels come from an iterative Tarjan pass at load time. Two nodes in the same component always reach each other; for
+nodes in different components the condensation (a DAG of components) decides. Nearly every query involves the main
+(largest) component, so whether each component reaches it or is reached from it is precomputed, and the rare query
+between two fragments walks the small part of the DAG outside the main component.
+
+Once index_graph() installs the index on the graph's nodes (node.components), shortest_path and shortest_path_a_star
+return -1 immediately for unreachable pairs instead of exhausting everything reachable from the source. Each graph
+loaded in a process (the daemon, bench_matchers) keeps its own index. Set NOTUBER_SNAP_MAIN=1 to snap people
+only to nodes in the main component, so their searches never start or end on a fragment.
+'''
+
+import os
+
+SNAP_MAIN = os.environ.get('NOTUBER_SNAP_MAIN', '0') == '1'
+
+
+def strongly_connected(successors: list) -> list:
+    '''
+    Tarjan's algorithm without recursion
+        - successors: successors[i] lists the node indices reachable from node i in one edge
+        - Returns the component label of every node (labels are in reverse topological order of the condensation)
+    '''
+
+    n = len(successors)
+    index = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    stack = []
+    labels = [-1] * n
+    counter = components = 0
+
+    for root in range(n):
+        if index[root] >= 0:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, iter(successors[root]))]
+
+        while work:
+            v, neighbors = work[-1]
+            for w in neighbors:
+                if index[w] < 0: # Descend into w, resume v's neighbors afterwards
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    work.append((w, iter(successors[w])))
+                    break
+                if on_stack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[v] < low[parent]:
+                        low[parent] = low[v]
+                if low[v] == index[v]: # v is the root of a component
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        labels[w] = components
+                        if w == v:
+                            break
+                    components += 1
+
+    return labels
+
+class ComponentIndex:
+    '''
+    Component labels and condensation reachability for a loaded graph
+        - nodes: <node_id: Node_Object> with neighbors loaded and node.index set (before any chain contraction)
+    '''
+
+    def __init__(self, nodes: dict) -> None:
+        ordered = sorted(nodes.values(), key = lambda node: node.index)
+        self.labels = strongly_connected([[edge.end_node.index for edge in node.neighbors] for node in ordered])
+
+        count = max(self.labels) + 1 if self.labels else 0
+        self.sizes = [0] * count
+        for label in self.labels:
+            self.sizes[label] += 1
+        self.main = max(range(count), key = self.sizes.__getitem__) if count else -1
+
+        # Condensation DAG
+        self.successors = [set() for _ in range(count)]
+        predecessors = [set() for _ in range(count)]
+        for node in ordered:
+            source = self.labels[node.index]
+            for edge in node.neighbors:
+                target = self.labels[edge.end_node.index]
+                if target != source:
+                    self.successors[source].add(target)
+                    predecessors[target].add(source)
+
+        self.from_main = self._closure(self.main, self.successors, count)
+        self.reaches_main = self._closure(self.main, predecessors, count)
+        self._fragment_reach = {} # <component: components reachable from it without passing the main one>
+
+    @staticmethod
+    def _closure(start: int, adjacency: list, count: int) -> bytearray:
+        reached = bytearray(count)
+        if start < 0:
+            return reached
+        reached[start] = 1
+        frontier = [start]
+        while frontier:
+            component = frontier.pop()
+            for other in adjacency[component]:
+                if not reached[other]:
+                    reached[other] = 1
+                    frontier.append(other)
+        return reached
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def component(self, node) -> int:
+        return self.labels[node.index]
+
+    def in_main(self, node) -> bool:
+        return self.labels[node.index] == self.main
+
+    def reachable(self, source, target) -> bool:
+        '''
+        Whether any path leads from node source to node target
+        '''
+
+        a, b = self.labels[source.index], self.labels[target.index]
+        if a == b:
+            return True
+        if self.reaches_main[a] and self.from_main[b]:
+            return True
+        # Any remaining path avoids the main component (through it, main would reach b)
+        if a not in self._fragment_reach:
+            self._fragment_reach[a] = self._closure_avoiding_main(a)
+        return b in self._fragment_reach[a]
+
+    def _closure_avoiding_main(self, start: int) -> set:
+        reached = {start}
+        frontier = [start]
+        while frontier:
+            component = frontier.pop()
+            for other in self.successors[component]:
+                if other != self.main and other not in reached:
+                    reached.add(other)
+                    frontier.append(other)
+        return reached
+
+    def main_nodes(self, nodes: dict) -> dict:
+        '''
+        Subset of nodes in the main component (for snapping)
+        '''
+
+        return {node_id: node for node_id, node in nodes.items() if self.labels[node.index] == self.main}
+
+    def summary(self) -> dict:
+        return {'components': len(self), 'main_size': self.sizes[self.main] if self.sizes else 0, 'nodes': len(self.labels)}
+
+def index_graph(nodes: dict) -> ComponentIndex:
+    '''
+    Label the loaded graph and install the index on its nodes for shortest_path/shortest_path_a_star (call before
+    contraction)
+    '''
+
+    index = ComponentIndex(nodes)
+    for node in nodes.values():
+        node.components = index
+    return index
+
+def reachable(source, target) -> bool:
+    '''
+    Whether a route can exist from node source to node target (always True before index_graph)
+    '''
+
+    return source.components is None or source.components.reachable(source, target)
+
+def snapping_nodes(nodes: dict) -> dict:
+    '''
+    Nodes people may be snapped to: the main component with NOTUBER_SNAP_MAIN=1, otherwise all of them
+    '''
+
+    index = next((node.components for node in nodes.values()), None)
+    return index.main_nodes(nodes) if SNAP_MAIN and index is not None else nodes
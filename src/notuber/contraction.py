@@ -0,0 +1,79 @@
+'''
+Degree-2 chain contraction of the road graph
+
+A node that only passes traffic along (one way: one edge in, one edge out; two way: the same two neighbors in both
+directions) is contracted out of the search graph. Every maximal chain of such nodes between two kept nodes is replaced
+in its entry node's neighbors by one ChainEdge whose per-hour travel time is the sum over the chain, so searches
+push and settle only kept nodes.
+
+Contracted nodes stay in the nodes dict and keep their own outgoing edges, so people snapped to them still resolve:
+    - a search starting on one walks its original edges to the chain's ends and continues from there
+    - a search ending on one reaches it from the chain entries listed in node.via, adding the partial chain time
+
+Enable in the matchers with NOTUBER_CONTRACT=1.
+'''
+
+import os
+
+from . import classes
+
+ENABLED = os.environ.get('NOTUBER_CONTRACT', '0') == '1'
+
+
+def pass_through(node: classes.Node, incoming: list) -> bool:
+    '''
+    Whether a node only continues a road: u -> node -> w (u != w), or u <-> node <-> w
+    '''
+
+    out_ids = [edge.end_node.id for edge in node.neighbors]
+    in_ids = [edge.start_node.id for edge in incoming]
+    if node.id in out_ids:
+        return False
+    if len(out_ids) == 1 and len(in_ids) == 1:
+        return out_ids[0] != in_ids[0]
+    if len(out_ids) == 2 and len(in_ids) == 2:
+        return out_ids[0] != out_ids[1] and set(out_ids) == set(in_ids)
+    return False
+
+def contract(nodes: dict, edges: list) -> dict:
+    '''
+    Contract degree-2 chains in place
+        - nodes: <node_id: Node_Object> with neighbors loaded (WILL BE MUTATED: neighbors of kept nodes, via of removed ones)
+        - edges: every edge of the graph (not modified; keep using it for road statistics)
+        - Returns counts: removed nodes, chains, edges replaced
+    '''
+
+    incoming = {node_id: [] for node_id in nodes}
+    for edge in edges:
+        incoming[edge.end_node.id].append(edge)
+    interior = {node_id for node_id, node in nodes.items() if pass_through(node, incoming[node_id])}
+
+    removed = set()
+    chains = replaced = 0
+    for node in nodes.values():
+        if node.id in interior:
+            continue
+
+        neighbors = []
+        for edge in node.neighbors:
+            chain = [edge]
+            current = edge.end_node
+            while current.id in interior and current != node:
+                # Continue along the road, never back the way we came
+                previous = chain[-1].start_node
+                chain.append(next(out for out in current.neighbors if out.end_node != previous))
+                if current.via is None:
+                    current.via = {}
+                current.via.setdefault(node, []).append(chain[:-1])
+                removed.add(current.id)
+                current = chain[-1].end_node
+
+            if len(chain) == 1:
+                neighbors.append(edge)
+            else:
+                neighbors.append(classes.ChainEdge(chain))
+                chains += 1
+                replaced += len(chain)
+        node.neighbors = neighbors
+
+    return {'removed_nodes': len(removed), 'chains': chains, 'replaced_edges': replaced}
@@ -0,0 +1,212 @@
+'''
+Warm simulation daemon: load the road graph once, run simulation jobs in forked children
+
+Starting a matcher pays for parsing the graph, building its indexes and snapping people before the first ride. The
+daemon initializes the requested matchers once and then listens on a Unix socket. Every connection is one job, handled
+in a child forked from the warm process: the child sees the graph as loaded (copy-on-write), loads the job's workload,
+simulates it and streams its output back, and whatever it changes disappears with it. A job costs the simulation (plus
+snapping a new workload, itself cached per workload and graph).
+
+    notuber daemon serve --data data --matchers T3,T4 &
+    notuber daemon run T4 --limit 2000
+    notuber daemon run T4 --people ~/workloads/monday --seed 11 --set AVG_MPH=18
+
+Protocol (JSON lines): the client sends one job and reads replies until "result" or "error".
+    {"matcher": "T4", "people": "/dir/with/drivers_and_passengers", "limit": 2000, "seed": 7, "progress": 1000,
+     "set": {"AVG_MPH": 20.0}, "profile": false}
+        -> {"type": "output", "line": "..."}   (the matcher's prints, as they happen)
+        -> {"type": "result", "summary": {...}, "phases": {...}, "seconds": ..}
+    "people", "limit", "seed", "progress", "set" and "profile" are optional. "set" overrides module-level settings of
+    the matcher (names it already defines) for this job only.
+'''
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import socket
+import socketserver
+import sys
+import time
+
+from . import load_matcher
+from . import matcher_module
+from . import loader
+from . import simulation
+from . import trips
+from .profiling import PROFILER
+
+### Defaults
+SOCKET = '/tmp/notuber-daemon.sock'
+MATCHERS = ('T4',)
+SEED = 7
+
+
+def log(message: str) -> None:
+    print(message, file = sys.stderr, flush = True)
+
+class LineStream:
+    '''
+    File-like object that sends every complete line written to it as an "output" message
+    '''
+
+    def __init__(self, send) -> None:
+        self.send = send
+        self.buffer = ''
+
+    def write(self, text: str) -> int:
+        self.buffer += text
+        *lines, self.buffer = self.buffer.split('\n')
+        for line in lines:
+            self.send({'type': 'output', 'line': line})
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+def run_job(job: dict, matchers: dict, data_dir: str, send) -> dict:
+    '''
+    Simulate one job on an already initialized matcher (call in a forked child: the matcher's state is changed)
+        - send: function taking each reply message while the job runs
+        - Returns the "result" message
+    '''
+
+    matcher = matchers.get(matcher_module(str(job.get('matcher'))))
+    if matcher is None:
+        raise ValueError(f'matcher {job.get("matcher")!r} is not loaded (loaded: {", ".join(matchers)})')
+    for name, value in job.get('set', {}).items():
+        if not name.isupper() or not hasattr(matcher, name):
+            raise ValueError(f'{matcher.__name__} has no setting {name!r}')
+        setattr(matcher, name, value)
+
+    PROFILER.reset()
+    if job.get('profile'):
+        PROFILER.enable()
+    scorer = getattr(matcher, 'SCORER', None)
+    if scorer is not None and scorer.pool is not None: # The parent's pool threads did not survive the fork
+        matcher.SCORER = type(scorer)(matcher.NODES, scorer.method, scorer.workers, scorer.chunks_per_worker, scorer.min_parallel, engine = scorer.engine)
+    prefetcher = getattr(matcher, 'DROPOFFS', None)
+    if prefetcher is not None and prefetcher.pool is not None: # Same for dropoff routing (load_people forks its own)
+        matcher.DROPOFFS = None if job.get('people') else type(prefetcher)(prefetcher.nodes, prefetcher.table, prefetcher.method, prefetcher.args, prefetcher.workers, prefetcher.chunk, prefetcher.ahead, engine = prefetcher.engine)
+
+    start = time.perf_counter()
+    metrics = simulation.Metrics()
+    with contextlib.redirect_stdout(LineStream(send)):
+        if job.get('people'): # Snapping is cached under the graph's data directory
+            matcher.load_people(data_dir, loader.load_drivers(job['people']), trips.load(job['people']))
+        random.seed(job.get('seed', SEED)) # Driver drop-out is random
+        passengers = matcher.PASSENGERS[:job['limit']] if job.get('limit') else matcher.PASSENGERS
+        simulation.run(matcher, passengers, metrics, progress = job.get('progress', 0))
+        metrics.print_summary(len(matcher.DRIVERS))
+
+    return {'type': 'result', 'summary': metrics.summary(len(matcher.DRIVERS)), 'phases': dict(PROFILER.times),
+            'counters': dict(PROFILER.counters), 'seconds': time.perf_counter() - start}
+
+class JobHandler(socketserver.StreamRequestHandler):
+    '''
+    One connection = one job, run in the child ForkingMixIn forked for it
+    '''
+
+    def send(self, message: dict) -> None:
+        self.wfile.write((json.dumps(message, default = str) + '\n').encode())
+        self.wfile.flush()
+
+    def handle(self) -> None:
+        try:
+            job = json.loads(self.rfile.readline())
+            if not isinstance(job, dict):
+                raise ValueError('expected a JSON object')
+            self.send(run_job(job, self.server.matchers, self.server.data_dir, self.send))
+        except BrokenPipeError: # Client went away, nothing to report to
+            pass
+        except Exception as e:
+            self.send({'type': 'error', 'error': f'{type(e).__name__}: {e}'})
+
+class Daemon(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+
+    def __init__(self, path: str, matchers: dict, data_dir: str = None) -> None:
+        self.matchers = matchers # <module name: initialized matcher module>
+        self.data_dir = data_dir
+        if os.path.exists(path):
+            os.remove(path)
+        super().__init__(path, JobHandler)
+
+def load_matchers(names: list, data_dir: str = None) -> dict:
+    '''
+    Import and initialize every matcher
+        - Returns <module name (T1 ... T5): matcher module>
+    '''
+
+    matchers = {}
+    for name in names:
+        start = time.perf_counter()
+        matcher = matchers[matcher_module(name)] = load_matcher(name)
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            matcher.initialize(data_dir)
+        log(f'{matcher_module(name)} ready with {len(matcher.DRIVERS)} drivers, {len(matcher.PASSENGERS)} passengers in {time.perf_counter() - start:.1f} seconds')
+    return matchers
+
+def submit(job: dict, path: str = SOCKET, out = sys.stdout) -> dict:
+    '''
+    Send a job to a running daemon, echo its output lines to out and return the final message
+    '''
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(path)
+        connection.sendall((json.dumps(job) + '\n').encode())
+        for line in connection.makefile('r'):
+            message = json.loads(line)
+            if message['type'] == 'output':
+                print(message['line'], file = out, flush = True)
+            else:
+                return message
+    return {'type': 'error', 'error': 'daemon closed the connection'}
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description = 'Keep NotUber matchers loaded and run simulation jobs in forked children')
+    commands = parser.add_subparsers(dest = 'command', required = True)
+
+    serve = commands.add_parser('serve', help = 'load the graph and wait for jobs')
+    serve.add_argument('--data', default = None, help = 'data directory (defaults to the bundled data)')
+    serve.add_argument('--matchers', default = ','.join(MATCHERS), help = 'comma separated matcher modules to keep loaded')
+    serve.add_argument('--socket', default = SOCKET)
+
+    run = commands.add_parser('run', help = 'submit a job to a running daemon')
+    run.add_argument('matcher', help = 'matcher module, e.g. T4')
+    run.add_argument('--people', default = None, help = "directory with the job's drivers.csv and passengers.csv (default: the daemon's)")
+    run.add_argument('--limit', type = int, default = None, help = 'simulate only the first N passengers')
+    run.add_argument('--seed', type = int, default = SEED)
+    run.add_argument('--progress', type = int, default = 0, help = 'report elapsed time every N passengers')
+    run.add_argument('--set', action = 'append', default = [], metavar = 'NAME=JSON', help = 'override a matcher setting for this job')
+    run.add_argument('--profile', action = 'store_true', help = 'collect profiler counters')
+    run.add_argument('--socket', default = SOCKET)
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        daemon = Daemon(args.socket, load_matchers(args.matchers.split(','), args.data), args.data)
+        log(f'Listening on {args.socket}')
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            daemon.server_close()
+            os.remove(args.socket)
+        return 0
+
+    overrides = dict(setting.split('=', 1) for setting in args.set)
+    job = {'matcher': args.matcher, 'people': os.path.abspath(args.people) if args.people else None, 'limit': args.limit, 'seed': args.seed,
+           'progress': args.progress, 'set': {name: json.loads(value) for name, value in overrides.items()}, 'profile': args.profile}
+    start = time.perf_counter()
+    result = submit(job, args.socket)
+    if result['type'] == 'error':
+        print(f'Error: {result["error"]}', file = sys.stderr)
+        return 1
+    print(f'Job finished in {result["seconds"]:.2f} seconds ({time.perf_counter() - start:.2f} seconds round trip)')
+    if args.profile:
+        print(json.dumps(result['phases'], indent = 2))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
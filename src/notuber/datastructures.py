@@ -0,0 +1,535 @@
+import datetime as dt
+import math
+import heapq
+
+import numpy as np
+
+from . import classes
+from .profiling import PROFILER
+
+# Pre-computed values from prior pre-processing
+MIN_LAT, MIN_LON, MAX_LAT, MAX_LON = 40.49, -74.26, 40.92, -73.69
+LAT_RANGE = MAX_LAT - MIN_LAT
+LON_RANGE = MAX_LON - MIN_LON
+GRID_WIDTH, GRID_HEIGHT = 20, 30
+GRID_SPEC = (MIN_LAT, MIN_LON, MAX_LAT, MAX_LON, GRID_WIDTH, GRID_HEIGHT) # Part of cache keys for grid statistics
+
+class GridSpace:
+    def __init__(self, lat_idx, lon_idx) -> None:
+        self.nodes = set() # nodes within grid space
+        self.edges = []
+        self.edge_length = []
+        self.total_length = 0
+        
+        min_coords = Grid.idx2min_coords((lat_idx, lon_idx))
+        max_coords = Grid.idx2min_coords((lat_idx+1, lon_idx+1))
+        self.lat_bounds = (min_coords[0], max_coords[0])
+        self.lon_bounds = (min_coords[1], max_coords[1])
+        self.clip_bounds = ((self.lat_bounds[0] if lat_idx > 0 else -math.inf, self.lat_bounds[1] if lat_idx < GRID_WIDTH-1 else math.inf),
+                            (self.lon_bounds[0] if lon_idx > 0 else -math.inf, self.lon_bounds[1] if lon_idx < GRID_HEIGHT-1 else math.inf))
+        self.weekday_avg_mph = []
+        self.weekend_avg_mph = []
+        
+        
+    def add_node(self, node:classes.Node):
+        self.nodes.add(node)
+        
+    def add_edge(self, edge:classes.Edge, length=None):
+        self.edges.append(edge)
+        
+        if length is not None:
+            self.edge_length.append(length)
+            self.total_length += length
+            return
+        
+        self.edge_length.append(self.get_edge_intersecting_length(edge))
+        self.total_length += self.edge_length[-1]
+    
+    def get_edge_intersecting_length(self, edge:classes.Edge):
+        '''
+        Miles of an edge starting in this grid space that lie inside it (Liang-Barsky clip of the segment against the
+        space, with the outer sides of border spaces left open since coord2idx clamps outlying nodes into them)
+        '''
+        if edge.start_node in self.nodes and edge.end_node in self.nodes: return edge.length
+        
+        exit_t = 1.0 # Fraction of the edge travelled when it leaves the space
+        for axis, (low, high) in enumerate(self.clip_bounds):
+            delta = edge.end_node.coords[axis] - edge.start_node.coords[axis]
+            if delta > 0:
+                exit_t = min(exit_t, (high - edge.start_node.coords[axis]) / delta)
+            elif delta < 0:
+                exit_t = min(exit_t, (low - edge.start_node.coords[axis]) / delta)
+        
+        return edge.length * max(0.0, exit_t)
+                
+        
+    def calc_avg_mph(self):
+        if self.total_length == 0:
+            # there are no edges in this region, so we say it takes infinite time
+            self.weekday_avg_mph = [float('inf')] * 24
+            self.weekend_avg_mph = [float('inf')] * 24
+            return
+        
+        # for each edge at each time step, calculate weightings and store average mph at each hour
+        
+        self.weekday_avg_mph = [0] * 24
+        self.weekend_avg_mph = [0] * 24
+        
+        # Each edge is weighted by the length it takes up in the gridspace
+        for i, edge in enumerate(self.edges):
+            for hour in range(24):
+                self.weekday_avg_mph[hour] += self.edge_length[i] * float(edge.weekday_speeds[hour])
+                self.weekend_avg_mph[hour] += self.edge_length[i] * float(edge.weekend_speeds[hour])
+                
+        for hour in range(24):
+            self.weekday_avg_mph[hour] /= self.total_length
+            self.weekend_avg_mph[hour] /= self.total_length
+    
+def grid_statistics(edges:list, profiles:classes.SpeedProfiles=None) -> dict:
+    '''
+    Vectorized Grid.add_edge + calc_avg_speeds over every edge
+        - Each edge's length (miles) is split between the grid spaces of its start and end nodes at the point where it
+          leaves the start space (Liang-Barsky, as in GridSpace.get_edge_intersecting_length)
+        - Returns arrays total_length (GRID_WIDTH, GRID_HEIGHT) and weekday_mph/weekend_mph (GRID_WIDTH, GRID_HEIGHT, 24),
+          length-weighted average speed per hour (inf where a space has no roads)
+        - profiles: table the edges' speeds were interned into, so speeds are gathered by profile id instead of per edge
+    '''
+    coords = np.array([(*edge.start_node.coords, *edge.end_node.coords) for edge in edges], dtype=float).reshape(-1, 4)
+    length = np.fromiter((edge.length for edge in edges), dtype=float, count=len(edges))
+    if profiles is not None:
+        table = np.array([weekday + weekend for weekday, weekend in profiles.profiles], dtype=float).reshape(-1, 48)
+        speeds = table[np.fromiter((edge.profile for edge in edges), dtype=int, count=len(edges))]
+        weekday, weekend = speeds[:, :24], speeds[:, 24:]
+    else:
+        weekday = np.array([[edge.weekday_speeds[hour] for hour in range(24)] for edge in edges], dtype=float).reshape(-1, 24)
+        weekend = np.array([[edge.weekend_speeds[hour] for hour in range(24)] for edge in edges], dtype=float).reshape(-1, 24)
+    
+    axes = ((MIN_LAT, LAT_RANGE, GRID_WIDTH), (MIN_LON, LON_RANGE, GRID_HEIGHT))
+    start_idx = [np.clip(np.floor((coords[:, axis] - origin) / span * cells).astype(int), 0, cells-1) for axis, (origin, span, cells) in enumerate(axes)]
+    end_idx = [np.clip(np.floor((coords[:, axis+2] - origin) / span * cells).astype(int), 0, cells-1) for axis, (origin, span, cells) in enumerate(axes)]
+    
+    # Parameter t in [0, 1] at which each edge leaves its start space
+    exit_t = np.ones(len(edges))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for axis, (origin, span, cells) in enumerate(axes):
+            idx = start_idx[axis]
+            low = np.where(idx == 0, -np.inf, idx / cells * span + origin)
+            high = np.where(idx == cells-1, np.inf, (idx + 1) / cells * span + origin)
+            delta = coords[:, axis+2] - coords[:, axis]
+            t = np.where(delta > 0, (high - coords[:, axis]) / delta, np.where(delta < 0, (low - coords[:, axis]) / delta, np.inf))
+            exit_t = np.minimum(exit_t, t)
+    same_space = (start_idx[0] == end_idx[0]) & (start_idx[1] == end_idx[1])
+    start_length = np.where(same_space, length, np.maximum(exit_t, 0) * length)
+    
+    # Accumulate both halves of every edge into flat space indices
+    spaces = np.concatenate([start_idx[0] * GRID_HEIGHT + start_idx[1], end_idx[0] * GRID_HEIGHT + end_idx[1]])
+    weights = np.concatenate([start_length, length - start_length])
+    num_spaces = GRID_WIDTH * GRID_HEIGHT
+    total_length = np.bincount(spaces, weights, minlength=num_spaces)
+    
+    stats = {'total_length': total_length.reshape(GRID_WIDTH, GRID_HEIGHT)}
+    for name, speeds in (('weekday_mph', weekday), ('weekend_mph', weekend)):
+        speeds = np.concatenate([speeds, speeds])
+        weighted = np.stack([np.bincount(spaces, weights * speeds[:, hour], minlength=num_spaces) for hour in range(24)], axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mph = np.where(total_length[:, None] > 0, weighted / total_length[:, None], np.inf)
+        stats[name] = mph.reshape(GRID_WIDTH, GRID_HEIGHT, 24)
+    
+    return stats
+        
+class Grid:
+    @staticmethod
+    def coord2idx(coords):
+        lat_idx = math.floor((coords[0] - MIN_LAT) / LAT_RANGE * GRID_WIDTH)
+        lon_idx = math.floor((coords[1] - MIN_LON) / LON_RANGE * GRID_HEIGHT)
+        lat_idx = max(0, min(lat_idx, GRID_WIDTH-1))
+        lon_idx = max(0, min(lon_idx, GRID_HEIGHT-1))
+        return (lat_idx, lon_idx)
+    @staticmethod
+    def idx2min_coords(idx):
+        lat = idx[0] / GRID_WIDTH * LAT_RANGE + MIN_LAT
+        lon = idx[1] / GRID_HEIGHT * LON_RANGE + MIN_LON
+        return (lat, lon)
+    
+    def __init__(self) -> None:
+        self.grid = [[GridSpace(lat_idx, lon_idx) for lon_idx in range(0, GRID_HEIGHT)]
+                        for lat_idx in range(0, GRID_WIDTH)]
+        self.drivers = QuadTree() # Driver index, independent of the grid
+        self.max_mph = {True: [1.0] * 24, False: [1.0] * 24}
+        self.mean_mph = {True: [1.0] * 24, False: [1.0] * 24}
+        
+    def calc_avg_speeds(self):
+        for lat_idx in range(GRID_WIDTH):
+            for lon_idx in range(GRID_HEIGHT):
+                self.grid[lat_idx][lon_idx].calc_avg_mph()
+        self.update_speed_bounds()
+    
+    def add_node(self, node) -> None:
+        self.get_grid_space(node.coords).add_node(node)
+        
+    def add_edge(self, edge:classes.Edge):
+        l = self.get_grid_space(edge.start_node.coords).get_edge_intersecting_length(edge)
+        self.get_grid_space(edge.start_node.coords).add_edge(edge, l)
+        self.get_grid_space(edge.end_node.coords).add_edge(edge, edge.length - l)
+
+    def add_edges(self, edges:list, profiles:classes.SpeedProfiles=None):
+        '''
+        Grid statistics for all edges at once (same result as add_edge on each edge followed by calc_avg_speeds,
+        without filling GridSpace.edges)
+        '''
+        self.set_statistics(grid_statistics(edges, profiles))
+    
+    def set_statistics(self, stats:dict):
+        '''
+        Load total road length and hourly average speeds per grid space from grid_statistics() arrays
+        '''
+        for lat_idx in range(GRID_WIDTH):
+            for lon_idx in range(GRID_HEIGHT):
+                space = self.grid[lat_idx][lon_idx]
+                space.total_length = float(stats['total_length'][lat_idx, lon_idx])
+                space.weekday_avg_mph = stats['weekday_mph'][lat_idx, lon_idx].tolist()
+                space.weekend_avg_mph = stats['weekend_mph'][lat_idx, lon_idx].tolist()
+        self.update_speed_bounds()
+    
+    def get_grid_space(self, coords) -> GridSpace:
+        idx = Grid.coord2idx(coords)
+        return self.grid[idx[0]][idx[1]]
+    
+    def add_driver(self, driver) -> None:
+        self.drivers.insert(driver)
+    
+    def remove_driver(self, driver):
+        self.drivers.remove(driver)
+        
+    def move_driver_to(self, driver:classes.Driver, coords):
+        self.drivers.move(driver, coords)
+    
+    @property
+    def driver_count(self) -> int:
+        return len(self.drivers)
+    
+    def update_speed_bounds(self):
+        '''
+        Per hour, the fastest grid space average (bounds the quadtree search) and the road-length weighted network
+        average (stands in for spaces without roads)
+        '''
+        spaces = [space for row in self.grid for space in row]
+        total = sum(space.total_length for space in spaces)
+        for weekday in (True, False):
+            hourly = [space.weekday_avg_mph if weekday else space.weekend_avg_mph for space in spaces]
+            self.max_mph[weekday] = [max((mph[hour] for mph in hourly if math.isfinite(mph[hour]) and mph[hour] > 0), default=1.0) for hour in range(24)]
+            self.mean_mph[weekday] = [sum(space.total_length * mph[hour] for space, mph in zip(spaces, hourly) if space.total_length > 0) / total if total else 1.0
+                                      for hour in range(24)]
+    
+    def get_closest_driver(self, coords, time, eligible=None) -> classes.Driver:
+        '''
+        Driver with the lowest estimated pickup time: Manhattan miles at the hourly average speed of the driver's grid
+        space, plus the wait until the driver becomes available
+            - eligible(driver): if given, only drivers it returns True for are considered
+            - Returns (eta in minutes, driver), or (inf, None) if there are no (eligible) drivers
+        '''
+        hour = time.hour
+        weekday = time.isoweekday() < 6
+        max_mph = self.max_mph[weekday][hour]
+        mean_mph = self.mean_mph[weekday][hour]
+        
+        def eta(driver):
+            if eligible is not None and not eligible(driver):
+                return math.inf
+            space = self.get_grid_space(driver.coords)
+            mph = space.weekday_avg_mph[hour] if weekday else space.weekend_avg_mph[hour]
+            if not math.isfinite(mph) or mph <= 0: # No roads in this space
+                mph = mean_mph
+            miles = abs(driver.coords[0] - coords[0]) * classes.LAT2MI + abs(driver.coords[1] - coords[1]) * classes.LON2MI
+            minutes = miles / mph * 60
+            if driver.time > time: # Driver hasn't arrived yet, add time till arrival
+                minutes += (driver.time - time).total_seconds() / 60
+            return minutes
+        
+        def lower_bound(lat_bounds, lon_bounds):
+            miles = (max(lat_bounds[0] - coords[0], 0, coords[0] - lat_bounds[1]) * classes.LAT2MI
+                     + max(lon_bounds[0] - coords[1], 0, coords[1] - lon_bounds[1]) * classes.LON2MI)
+            return miles / max_mph * 60
+        
+        return self.drivers.nearest(eta, lower_bound)
+        
+
+
+class QuadTree:
+    '''
+    Region quadtree over driver positions
+        - A leaf splits into quadrants once it holds more than max_items drivers; a subtree merges back into one leaf
+          once it holds max_items // 2 or fewer, so dense areas get small cells and sparse areas large ones
+        - Border cells extend to infinity outwards, so positions outside the bounds are still indexed (and bounded) correctly
+    '''
+    
+    class Cell:
+        __slots__ = ('parent', 'mid', 'lat_bounds', 'lon_bounds', 'children', 'items', 'count', 'depth')
+        
+        def __init__(self, parent, lat_bounds, lon_bounds, split_lat, split_lon, depth) -> None:
+            self.parent = parent
+            self.lat_bounds = lat_bounds # Search bounds (infinite on the outer sides of the tree)
+            self.lon_bounds = lon_bounds
+            self.mid = (sum(split_lat) / 2, sum(split_lon) / 2, split_lat, split_lon) # Split point and finite extent
+            self.children = None # [south-west, south-east, north-west, north-east] once split
+            self.items = set()
+            self.count = 0 # Items in this subtree
+            self.depth = depth
+        
+        def child_for(self, coords):
+            return self.children[(coords[0] >= self.mid[0]) * 2 + (coords[1] >= self.mid[1])]
+    
+    def __init__(self, minlat=MIN_LAT, maxlat=MAX_LAT, minlon=MIN_LON, maxlon=MAX_LON, max_items:int=16, max_depth:int=16) -> None:
+        self.max_items = max_items
+        self.max_depth = max_depth
+        self.root = QuadTree.Cell(None, (-math.inf, math.inf), (-math.inf, math.inf), (minlat, maxlat), (minlon, maxlon), 0)
+        self.leaf_of = {} # <driver: leaf Cell>
+    
+    def __len__(self) -> int:
+        return len(self.leaf_of)
+    
+    def __contains__(self, driver) -> bool:
+        return driver in self.leaf_of
+    
+    def insert(self, driver) -> None:
+        cell = self.root
+        while cell.children is not None:
+            cell.count += 1
+            cell = cell.child_for(driver.coords)
+        cell.count += 1
+        cell.items.add(driver)
+        self.leaf_of[driver] = cell
+        if len(cell.items) > self.max_items and cell.depth < self.max_depth:
+            self._split(cell)
+    
+    def remove(self, driver) -> None:
+        cell = self.leaf_of.pop(driver)
+        cell.items.remove(driver)
+        
+        # Merge the highest ancestor that has become sparse back into a leaf
+        sparse = None
+        while cell is not None:
+            cell.count -= 1
+            if cell.children is not None and cell.count <= self.max_items // 2:
+                sparse = cell
+            cell = cell.parent
+        if sparse is not None:
+            self._merge(sparse)
+    
+    def _split(self, cell) -> None:
+        mid_lat, mid_lon, (minlat, maxlat), (minlon, maxlon) = cell.mid
+        cell.children = []
+        for north in (False, True):
+            for east in (False, True):
+                lat_bounds = (mid_lat, cell.lat_bounds[1]) if north else (cell.lat_bounds[0], mid_lat)
+                lon_bounds = (mid_lon, cell.lon_bounds[1]) if east else (cell.lon_bounds[0], mid_lon)
+                split_lat = (mid_lat, maxlat) if north else (minlat, mid_lat)
+                split_lon = (mid_lon, maxlon) if east else (minlon, mid_lon)
+                cell.children.append(QuadTree.Cell(cell, lat_bounds, lon_bounds, split_lat, split_lon, cell.depth + 1))
+        
+        items, cell.items = cell.items, set()
+        for driver in items:
+            child = cell.child_for(driver.coords)
+            child.items.add(driver)
+            child.count += 1
+            self.leaf_of[driver] = child
+        for child in cell.children: # Everyone may have landed in the same quadrant
+            if len(child.items) > self.max_items and child.depth < self.max_depth:
+                self._split(child)
+    
+    def _merge(self, cell) -> None:
+        stack = list(cell.children)
+        cell.children = None
+        while stack:
+            child = stack.pop()
+            if child.children is not None:
+                stack.extend(child.children)
+            for driver in child.items:
+                cell.items.add(driver)
+                self.leaf_of[driver] = cell
+    
+    def nearest(self, cost, lower_bound) -> tuple:
+        '''
+        Best-first search for the driver with the lowest cost
+            - cost(driver): score of one driver
+            - lower_bound(lat_bounds, lon_bounds): no driver inside these bounds can score lower
+            - Returns (cost, driver), or (inf, None) if the tree is empty
+        '''
+        best_cost, best_driver = math.inf, None
+        cells = [(lower_bound(self.root.lat_bounds, self.root.lon_bounds), 0, self.root)]
+        order = 1 # Tie-breaker so cells are never compared
+        visited = checked = 0
+        while cells:
+            bound, _, cell = heapq.heappop(cells)
+            if bound >= best_cost:
+                break
+            visited += 1
+            if cell.children is None:
+                for driver in cell.items:
+                    checked += 1
+                    driver_cost = cost(driver)
+                    if driver_cost < best_cost:
+                        best_cost, best_driver = driver_cost, driver
+                continue
+            for child in cell.children:
+                if child.count:
+                    heapq.heappush(cells, (lower_bound(child.lat_bounds, child.lon_bounds), order, child))
+                    order += 1
+        
+        if PROFILER.enabled:
+            PROFILER.count('quadtree.searches')
+            PROFILER.count('quadtree.cells', visited)
+            PROFILER.count('quadtree.checked', checked)
+        return (best_cost, best_driver)
+    
+    def move(self, driver, coords) -> None:
+        '''
+        Update a driver's position (driver.coords is set to coords)
+        '''
+        cell = self.leaf_of[driver]
+        lat, lon = coords
+        if cell.lat_bounds[0] <= lat < cell.lat_bounds[1] and cell.lon_bounds[0] <= lon < cell.lon_bounds[1]:
+            driver.coords = coords # Same leaf, nothing to restructure
+            return
+        self.remove(driver)
+        driver.coords = coords
+        self.insert(driver)
+class KDTree:
+    left = None
+    right = None
+    nodes = None # if at leaf, this contains all nodes in this region
+    depth = 0
+    
+    split_val = None
+    x_bounds = None
+    y_bounds = None
+    
+    @staticmethod
+    def selector(depth:int): return int(depth % 2 != 0)
+    @staticmethod
+    def dist(coord1, coord2):
+        # Euclidean distance
+        d1 = coord2[0] - coord1[0]
+        d2 = coord2[1] - coord1[1]
+        return math.sqrt(d1*d1 + d2*d2)
+    @staticmethod
+    def dist_to_rect(point, rect_x_bounds, rect_y_bounds):
+        dx = max(rect_x_bounds[0] - point[0], 0, point[0] - rect_x_bounds[1])
+        dy = max(rect_y_bounds[0] - point[1], 0, point[1] - rect_y_bounds[1])
+        return math.sqrt(dx*dx + dy*dy)
+    
+    # return the distance from the bounds of this region and a point
+    def dist_to_point(self, point):
+        return KDTree.dist_to_rect(point, self.x_bounds, self.y_bounds)
+    
+    def __init__(self, nodes, depth: int, max_depth: int,
+                 minx=MIN_LAT, maxx=MAX_LAT, miny=MIN_LON, maxy=MAX_LON) -> None:
+        self.depth = depth
+        self.x_bounds = (minx, maxx)
+        self.y_bounds = (miny, maxy)
+        
+        # If reached max split depth, make leaf
+        if depth >= max_depth:
+            self.nodes = nodes
+            return
+        
+        # Select lat if even depth, lon if odd depth
+        selector = KDTree.selector(depth)
+        
+        sorted_nodes = sorted(nodes, key=lambda x: x.coords[selector])
+        
+        median = int(len(sorted_nodes) / 2)
+        self.split_val = sorted_nodes[median].coords[selector]
+        #print(f'Split on {"lon" if selector else "lat"} at {self.split_val}')
+        
+        left_nodes = sorted_nodes[:median]
+        right_nodes = sorted_nodes[median:]
+        
+        if selector == 0:
+            if len(left_nodes) > 0:
+                self.left = KDTree(left_nodes, depth+1, max_depth,
+                                    minx, self.split_val, miny, maxy)
+            if len(right_nodes) > 0:
+                self.right = KDTree(right_nodes, depth+1, max_depth,
+                                    self.split_val, maxx, miny, maxy)
+        else:
+            if len(left_nodes) > 0:
+                self.left = KDTree(left_nodes, depth+1, max_depth,
+                                    minx, maxx, miny, self.split_val)
+            if len(right_nodes) > 0:
+                self.right = KDTree(right_nodes, depth+1, max_depth,
+                                    minx, maxx, self.split_val, maxy)
+        
+        if self.left == None and self.right == None:
+            # Leaf node, assign single value to nodes
+            self.nodes = nodes
+    
+    def kNN_helper(self, k, query_coords, k_closest_heap, counts = None):#, search_list = None):
+        # counts: optional [leaves visited, points checked, heap pushes], incremented in place
+        #seen_nodes = []
+        #if (search_list is not None and len(search_list) > 0): seen_nodes = search_list[-1][2].copy()
+        
+        # if at a leaf, check if any nodes are closer
+        if self.nodes:
+            if counts is not None:
+                counts[0] += 1
+                counts[1] += len(self.nodes)
+            for node in self.nodes:
+                #seen_nodes.append(node)
+                
+                d = KDTree.dist(node.coords, query_coords)
+                # If closer, or heap not filled, add new point
+                if len(k_closest_heap) < k or d < -k_closest_heap[0][0]:
+                    heapq.heappush(k_closest_heap, (-d, node))
+                    if counts is not None: counts[2] += 1
+                    # if more than k stored, pop worst
+                    if len(k_closest_heap) > k: heapq.heappop(k_closest_heap)
+            
+            #if search_list is not None: search_list.append((self, k_closest_heap.copy(), seen_nodes, self.dist_to_point(query_coords)))
+            return
+        
+        #if search_list is not None: search_list.append((self, k_closest_heap.copy(), seen_nodes, self.dist_to_point(query_coords)))
+        
+        # otherwise, traverse
+        selector = KDTree.selector(self.depth)
+        
+        # check which side to prioritize
+        search_side = self.left
+        opp_side = self.right
+        if query_coords[selector] > self.split_val:
+            search_side = self.right
+            opp_side = self.left
+        
+        # recurse
+        if search_side is not None and (len(k_closest_heap) < k or
+            search_side.dist_to_point(query_coords) < -k_closest_heap[0][0]):
+            search_side.kNN_helper(k, query_coords, k_closest_heap, counts)#, search_list)
+            
+        #if (search_list is not None and len(search_list) > 0): seen_nodes = search_list[-1][2].copy()
+        #if search_list is not None: search_list.append((self, k_closest_heap.copy(), seen_nodes, self.dist_to_point(query_coords)))
+        
+        # check if other side should be searched
+        if opp_side is not None and (len(k_closest_heap) < k or
+            opp_side.dist_to_point(query_coords) < -k_closest_heap[0][0]):
+            opp_side.kNN_helper(k, query_coords, k_closest_heap, counts)#, search_list)
+            
+        #if (search_list is not None and len(search_list) > 0): seen_nodes = search_list[-1][2].copy()
+        #if search_list is not None: search_list.append((self, k_closest_heap.copy(), seen_nodes, self.dist_to_point(query_coords)))
+        
+        
+    def get_kNN(self, k, query_coords, stats: dict = None):
+        # stats: if given, receives 'leaves', 'checked' and 'pushes' counters of this search
+        #search_list = []
+        knn_list = []
+        counts = [0, 0, 0] if stats is not None or PROFILER.enabled else None
+        self.kNN_helper(k, query_coords, knn_list, counts)#, search_list)
+        if counts is not None:
+            if stats is not None:
+                stats['leaves'], stats['checked'], stats['pushes'] = counts
+            if PROFILER.enabled:
+                PROFILER.count('get_kNN.searches')
+                PROFILER.count('get_kNN.leaves', counts[0])
+                PROFILER.count('get_kNN.checked', counts[1])
+                PROFILER.count('get_kNN.pushes', counts[2])
+        return knn_list#, search_list
+    
\ No newline at end of file
@@ -0,0 +1,141 @@
+'''
+Ahead-of-time dropoff legs: pickup to dropoff minutes for upcoming trips, routed in worker processes
+
+A trip's dropoff leg doesn't depend on the driver matched, only on the hour the ride starts in (edge times are taken
+at the start of a search, see trees.bucket). DropoffPrefetcher routes the trips of a snapped trip table in chunks, a few
+chunks ahead of the passenger being dispatched, while the matcher scores drivers. Each chunk is routed for its expected
+pickup time: request time plus the delay from request to pickup of the last trip dispatched when the chunk was queued.
+The matcher then reads the leg instead of searching, unless the pickup lands in another bucket than expected (e.g. a
+20 minute pickup at 8:50): then the prefetched minutes are for the wrong edge times and the matcher routes the leg itself.
+
+Workers are forked once the graph and the table's node columns are loaded, and share them copy-on-write; only row
+ranges and minutes cross the process boundary. Set NOTUBER_DROPOFF_WORKERS=N to route with N processes (fork start
+method, i.e. Linux/macOS).
+'''
+
+import datetime as dt
+import math
+import multiprocessing
+import os
+
+import numpy as np
+
+from . import classes
+from . import fleet
+from . import trees
+from .engine import search
+from .profiling import PROFILER
+
+### Defaults
+WORKERS = int(os.environ.get('NOTUBER_DROPOFF_WORKERS', '0')) # 0 routes dropoffs inline in the matcher
+CHUNK = 256 # Trips per task
+AHEAD = 4 # Chunks per worker queued past the one being dispatched
+
+_NODES = [] # <node.index: Node_Object>, inherited by forked workers
+_TABLE = None # trips.TripTable, inherited by forked workers
+_ENGINE = None # engine.Engine searched instead of the nodes, inherited by forked workers
+
+
+def request_time(seconds: float) -> dt.datetime:
+    return fleet.EPOCH + dt.timedelta(seconds = seconds) # As trips.TripTable builds Passenger.time
+
+def _route_chunk(task: tuple) -> np.ndarray:
+    '''
+    Worker side: dropoff minutes of trips start .. stop - 1, starting delay seconds after their request times (nan where
+    not snapped)
+    '''
+
+    method, start, stop, delay, args = task
+    minutes = np.full(stop - start, np.nan)
+    rows = zip(_TABLE.records['time'][start:stop].tolist(), _TABLE.node[start:stop].tolist(), _TABLE.end_node[start:stop].tolist())
+    for i, (seconds, node, end_node) in enumerate(rows):
+        if node >= 0 and end_node >= 0:
+            minutes[i] = search(_ENGINE, method, _NODES[node], _NODES[end_node], request_time(seconds + delay), *args)
+    return minutes
+
+class DropoffPrefetcher:
+    '''
+    Dropoff legs of a trip table, routed with Node.shortest_path or Node.shortest_path_a_star ahead of the simulation
+        - nodes: Node objects in node.index order; the graph must not change after the pool starts
+        - table: snapped trips.TripTable the simulation walks (or a slice of)
+        - args: extra arguments of the search method (AVG_MPH for shortest_path_a_star)
+        - engine: engine.Engine to route with instead of the Node methods
+        - workers/chunk/ahead: see WORKERS, CHUNK and AHEAD
+    '''
+
+    def __init__(self, nodes: list, table, method: str = 'shortest_path', args: tuple = (), workers: int = WORKERS, chunk: int = CHUNK, ahead: int = AHEAD, engine = None) -> None:
+        global _TABLE, _ENGINE
+        _NODES[:] = nodes
+        _TABLE = table
+        _ENGINE = engine
+        self.nodes = nodes
+        self.table = table
+        self.method = method
+        self.args = args
+        self.engine = engine
+        self.workers = workers
+        self.chunk = chunk
+        self.ahead = ahead
+        self.window = max(1, workers) * ahead
+        self.pending = {} # <chunk: AsyncResult>
+        self.minutes = {} # <chunk: minutes of its trips>
+        self.delays = {} # <chunk: seconds from request to expected pickup it was routed for>
+        self.delay = 0.0 # Request to pickup of the last trip dispatched
+        self.hits = self.corrections = 0 # Legs read / routed by the matcher after all
+        self.pool = multiprocessing.get_context('fork').Pool(max(1, workers))
+
+    def __len__(self) -> int:
+        return len(self.minutes)
+
+    def _submit(self, first: int) -> None:
+        '''
+        Queue chunks first .. first + window that are neither queued nor done
+        '''
+
+        for chunk in range(first, min(first + self.window + 1, -(-len(self.table) // self.chunk))):
+            if chunk not in self.pending and chunk not in self.minutes:
+                start = chunk * self.chunk
+                task = (self.method, start, min(start + self.chunk, len(self.table)), self.delay, self.args)
+                self.pending[chunk] = self.pool.apply_async(_route_chunk, (task,))
+                self.delays[chunk] = self.delay
+
+    def travel_time(self, passenger: classes.Passenger, start_time: dt.datetime) -> float:
+        '''
+        Minutes from passenger.node to passenger.end_node for a ride starting at start_time, waiting for the workers if
+        they are behind; None if the leg has to be routed by the caller (pickup in another bucket, or not a trip of the table)
+        '''
+
+        row = passenger.id - 1 - self.table.first
+        if not 0 <= row < len(self.table) or self.pool is None:
+            return None
+        if (passenger.node is None or passenger.end_node is None or passenger.node.index != self.table.node[row]
+                or passenger.end_node.index != self.table.end_node[row]):
+            return None
+
+        requested = float(self.table.records['time'][row])
+        self.delay = (start_time - request_time(requested)).total_seconds()
+        chunk = row // self.chunk
+        self._submit(chunk)
+        if trees.bucket(start_time) != trees.bucket(request_time(requested + self.delays[chunk])):
+            self.corrections += 1
+            if PROFILER.enabled:
+                PROFILER.count('dropoffs.corrections')
+            return None
+        if chunk not in self.minutes:
+            self.minutes[chunk] = self.pending.pop(chunk).get()
+        minutes = self.minutes[chunk][row - chunk * self.chunk]
+        if math.isnan(minutes):
+            return None
+        self.hits += 1
+        if PROFILER.enabled:
+            PROFILER.count('dropoffs.hits')
+        return float(minutes)
+
+    def summary(self) -> str:
+        return f'Prefetched dropoff legs: {self.hits} used, {self.corrections} routed again (pickup in another hour than expected)'
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
@@ -0,0 +1,249 @@
+'''
+Integer-weight Dijkstra and A* over a compressed (CSR) copy of the road graph, on a bucket queue
+
+Travel times are quantized to whole milliseconds, so a queue entry is a single int, priority << shift | node index,
+and nothing is allocated per push beyond the int. Edges are walked as slices of flat lists instead of Edge objects,
+and distances live in the thread's classes.SearchWorkspace.
+
+BucketQueue is a Dial-style bucket queue: entries are appended to the bucket of their priority (width: the hour's
+shortest edge, at least MIN_WIDTH ms), and a bucket is sorted once when the search reaches it. Dijkstra never pushes
+into the bucket being popped when the width is at most the shortest edge, so a push is an append and a pop an index
+step; only the per-bucket sort (in C) and the small heap of bucket numbers are not O(1). An entry below the current
+bucket (A* with an inconsistent heuristic) is inserted into it in order, so pops always come out smallest first.
+
+Routes equal Node.shortest_path's (and Node.shortest_path_a_star's) within the quantization (half a millisecond per
+edge), which can still flip a tie between two drivers: the matchers only search with an engine when NOTUBER_ENGINE=1.
+Weights for each (weekday/weekend, hour) are built the first time a search starts in that hour. The engine copies the
+graph as it is when built: build it after contraction, and rebuild it if the graph changes.
+'''
+
+import bisect
+import datetime as dt
+import heapq
+import math
+import os
+
+from . import classes
+
+ENABLED = os.environ.get('NOTUBER_ENGINE', '0') == '1'
+MS_PER_MINUTE = 60000
+MIN_WIDTH = 1000 # Narrowest bucket (ms), bounding the buckets a search walks through on very short edges
+
+
+def search(engine, method: str, source: classes.Node, target: classes.Node, start_time: dt.datetime, *args) -> float:
+    '''
+    Minutes from source to target with Node.<method>, or with the engine's method of the same name if engine is given
+    '''
+
+    if engine is None:
+        return getattr(source, method)(target, start_time, *args)
+    return getattr(engine, method)(source, target, start_time, *args)
+
+class BucketQueue:
+    '''
+    Monotone-friendly priority queue of packed ints (priority << shift | index), smallest first
+        - width: priority range of one bucket
+        - shift: bits of the index part
+    '''
+
+    def __init__(self, width: int, shift: int) -> None:
+        self.span = width << shift # Entries key // span share a bucket
+        self.buckets = {} # <bucket: [keys]>, not yet reached
+        self.numbers = [] # Heap of the bucket numbers in buckets
+        self.current = [] # Sorted keys of the bucket being popped
+        self.position = 0 # Next key of current
+        self.bucket = -1 # Number of the bucket being popped
+
+    def __bool__(self) -> bool:
+        return self.position < len(self.current) or bool(self.buckets)
+
+    def push(self, key: int) -> None:
+        number = key // self.span
+        if number <= self.bucket: # Reached already, keep current sorted
+            bisect.insort(self.current, key, self.position)
+            return
+        keys = self.buckets.get(number)
+        if keys is None:
+            self.buckets[number] = [key]
+            heapq.heappush(self.numbers, number)
+        else:
+            keys.append(key)
+
+    def pop(self) -> int:
+        '''
+        Smallest key, -1 if empty
+        '''
+
+        if self.position == len(self.current):
+            if not self.numbers:
+                return -1
+            self.bucket = heapq.heappop(self.numbers)
+            self.current = self.buckets.pop(self.bucket)
+            self.current.sort()
+            self.position = 0
+        key = self.current[self.position]
+        self.position += 1
+        return key
+
+class Engine:
+    '''
+    CSR adjacency and per-hour integer edge weights for a loaded graph
+        - nodes: Node objects in node.index order (e.g. sorted(NODES.values(), key = lambda node: node.index))
+    '''
+
+    def __init__(self, nodes: list) -> None:
+        self.nodes = nodes
+        self.offsets = [0] # Edges of node i are slots offsets[i] .. offsets[i + 1] - 1
+        self.targets = []
+        self.edges = []
+        for node in nodes:
+            for edge in node.neighbors:
+                self.targets.append(edge.end_node.index)
+                self.edges.append(edge)
+            self.offsets.append(len(self.targets))
+        self.miles = [(node.coords[0] * classes.LAT2MI, node.coords[1] * classes.LON2MI) for node in nodes] # For A*'s heuristic
+        self.shift = len(nodes).bit_length() # Low bits of a queue entry hold the node index
+        self._weights = {} # <(weekend, hour): [ms per slot]>
+        self._widths = {} # <(weekend, hour): bucket width in ms>
+
+    def weights(self, start_time: dt.datetime) -> list:
+        '''
+        Edge travel times in whole milliseconds for searches starting at start_time
+        '''
+
+        key = (start_time.weekday() > 4, start_time.hour)
+        if key not in self._weights:
+            self._weights[key] = [round(edge.travel_time(start_time) * MS_PER_MINUTE) for edge in self.edges]
+            self._widths[key] = max(min(self._weights[key], default = 0), MIN_WIDTH)
+        return self._weights[key]
+
+    def queue(self, start_time: dt.datetime) -> BucketQueue:
+        self.weights(start_time)
+        return BucketQueue(self._widths[(start_time.weekday() > 4, start_time.hour)], self.shift)
+
+    def entries(self, target: classes.Node, start_time: dt.datetime) -> dict:
+        '''
+        <entry node index: ms from it to target> if target was contracted away, else {}
+        '''
+
+        if target.via is None:
+            return {}
+        return {entry.index: min(sum(round(edge.travel_time(start_time) * MS_PER_MINUTE) for edge in prefix) for prefix in prefixes)
+                for entry, prefixes in target.via.items()}
+
+    def shortest_path(self, source: classes.Node, target: classes.Node, start_time: dt.datetime, stats: dict = None) -> float:
+        '''
+        Dijkstra over integer weights; same contract as Node.shortest_path
+            - stats: if given, receives 'settled' (nodes expanded), 'relaxed' (edges scanned) and 'pushes' (queue pushes)
+
+        Returns travel minutes, or -1 if no path is found
+        '''
+
+        if source.components is not None and not source.components.reachable(source, target): # No path, skip the search
+            classes.record_search('engine', stats, 0, 0, 0)
+            return -1
+
+        offsets, targets, weights = self.offsets, self.targets, self.weights(start_time)
+        goal = target.index
+        entries = self.entries(target, start_time)
+
+        shift = self.shift
+        mask = (1 << shift) - 1
+        ws = classes.workspace()
+        generation = ws.begin()
+        dist, stamp = ws.dist, ws.stamp
+        dist[source.index], stamp[source.index] = 0, generation
+        pq = self.queue(start_time)
+        push, pop = pq.push, pq.pop
+        push(source.index) # dist << shift | index
+        settled = relaxed = pushes = 0
+
+        while pq:
+            key = pop()
+            u, du = key & mask, key >> shift
+            if u == goal:
+                classes.record_search('engine', stats, settled, relaxed, pushes)
+                return du / MS_PER_MINUTE
+            if du > dist[u]:
+                continue
+
+            settled += 1
+            if u in entries and (stamp[goal] != generation or du + entries[u] < dist[goal]):
+                dist[goal], stamp[goal] = du + entries[u], generation
+                push(dist[goal] << shift | goal)
+                pushes += 1
+            start, end = offsets[u], offsets[u + 1]
+            relaxed += end - start
+            for slot in range(start, end):
+                v = targets[slot]
+                dv = du + weights[slot]
+                if stamp[v] != generation or dv < dist[v]:
+                    dist[v], stamp[v] = dv, generation
+                    push(dv << shift | v)
+                    pushes += 1
+
+        classes.record_search('engine', stats, settled, relaxed, pushes)
+        return -1
+
+    def shortest_path_a_star(self, source: classes.Node, target: classes.Node, start_time: dt.datetime, AVG_MPH, stats: dict = None) -> float:
+        '''
+        A* over integer weights, expanding like Node.shortest_path_a_star (same heuristic, one queue entry per open node)
+            - stats: as in shortest_path
+
+        Returns travel minutes, or -1 if no path is found
+        '''
+
+        if source.components is not None and not source.components.reachable(source, target): # No path, skip the search
+            classes.record_search('engine_a_star', stats, 0, 0, 0)
+            return -1
+
+        offsets, targets, weights, miles = self.offsets, self.targets, self.weights(start_time), self.miles
+        start, goal = source.index, target.index
+        entries = self.entries(target, start_time)
+        goal_lat, goal_lon = miles[goal]
+        ms_per_mile = 60 * MS_PER_MINUTE / AVG_MPH
+
+        def heuristic(i: int) -> int:
+            lat, lon = miles[i]
+            return round(math.sqrt((lat - goal_lat)**2 + (lon - goal_lon)**2) * ms_per_mile)
+
+        shift = self.shift
+        mask = (1 << shift) - 1
+        ws = classes.workspace()
+        generation = ws.begin()
+        g, stamp, open_set = ws.dist, ws.stamp, ws.open # open_set[i] == generation: node i is in the open set
+        g[start], stamp[start], open_set[start] = 0, generation, generation
+        pq = self.queue(start_time)
+        push, pop = pq.push, pq.pop
+        push(heuristic(start) << shift | start) # f << shift | index
+        settled = relaxed = pushes = 0
+
+        while pq:
+            u = pop() & mask
+            open_set[u] = 0
+            if u == goal:
+                classes.record_search('engine_a_star', stats, settled, relaxed, pushes)
+                return g[u] / MS_PER_MINUTE
+
+            settled += 1
+            gu = g[u]
+            if u in entries and (stamp[goal] != generation or gu + entries[u] < g[goal]):
+                g[goal], stamp[goal] = gu + entries[u], generation
+                if open_set[goal] != generation:
+                    open_set[goal] = generation
+                    push(g[goal] << shift | goal)
+                    pushes += 1
+            begin, end = offsets[u], offsets[u + 1]
+            relaxed += end - begin
+            for slot in range(begin, end):
+                v = targets[slot]
+                gv = gu + weights[slot]
+                if stamp[v] != generation or gv < g[v]:
+                    g[v], stamp[v] = gv, generation
+                    if open_set[v] != generation:
+                        open_set[v] = generation
+                        push(gv + heuristic(v) << shift | v)
+                        pushes += 1
+
+        classes.record_search('engine_a_star', stats, settled, relaxed, pushes)
+        return -1
@@ -0,0 +1,196 @@
+'''
+Columnar fleet state for the matchers that keep drivers in a time-ordered queue (T1 to T4)
+
+Every driver that has joined the fleet owns one row, addressed by an int: the time (seconds since EPOCH) from which
+they are free, lat/lon, the index of their snapped node (-1 if not snapped) and their completed rides. Drivers out of
+the fleet keep their row with free_at = inf, so rows never move. Queues and indexes carry (free_at, row) tuples of
+plain numbers, matching and updates are array operations, and the state costs 32 bytes per driver.
+
+Driver objects are only handles: their time/coords/node are read when they join (add) and not written back, so ask
+the fleet, not the object, where a driver is.
+'''
+
+import datetime as dt
+import heapq
+
+import numpy as np
+
+from . import classes
+
+EPOCH = dt.datetime(1970, 1, 1) # Naive, like the simulation's timestamps
+INITIAL_ROWS = 1024
+
+
+def seconds(time: dt.datetime) -> float:
+    return (time - EPOCH).total_seconds()
+
+def manhattan_minutes(origins: np.ndarray, destinations: np.ndarray, mph: float) -> np.ndarray:
+    '''
+    Vectorized Manhattan distance estimate of travel time (same formula as T1/T2's manhattan_est_time)
+        - origins/destinations: (..., 2) arrays of lat/lon, broadcast against each other
+    '''
+
+    delta = np.abs(origins - destinations)
+    return (delta[..., 0] * classes.LAT2MI + delta[..., 1] * classes.LON2MI) / mph * 60
+
+class Fleet:
+    '''
+    Driver availability, position and ride counts as NumPy columns indexed by row
+        - drivers: initial fleet (each available from driver.time at driver.coords, on driver.node if snapped)
+    '''
+
+    def __init__(self, drivers: list = ()) -> None:
+        self.drivers = [] # <row: Driver>
+        self.rows = {} # <driver_id: row>
+        self.free_at = np.full(INITIAL_ROWS, np.inf)
+        self.coords = np.zeros((INITIAL_ROWS, 2)) # lat, lon
+        self.node = np.full(INITIAL_ROWS, -1, dtype = np.int32)
+        self.rides = np.zeros(INITIAL_ROWS, dtype = np.int32)
+        for driver in drivers:
+            self.add(driver)
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.free_at[:len(self.drivers)] < np.inf))
+
+    def _grow(self) -> None:
+        size = len(self.free_at)
+        self.free_at = np.concatenate([self.free_at, np.full(size, np.inf)])
+        self.coords = np.concatenate([self.coords, np.zeros((size, 2))])
+        self.node = np.concatenate([self.node, np.full(size, -1, dtype = np.int32)])
+        self.rides = np.concatenate([self.rides, np.zeros(size, dtype = np.int32)])
+
+    def queue(self) -> list:
+        '''
+        Heap of (free_at, row) for every driver in the fleet, for matchers that pop drivers by available time
+        '''
+
+        rows = np.flatnonzero(self.free_at[:len(self.drivers)] < np.inf)
+        entries = list(zip(self.free_at[rows].tolist(), rows.tolist()))
+        heapq.heapify(entries)
+        return entries
+
+    def row_of(self, driver: classes.Driver) -> int:
+        '''
+        Row of a driver in the fleet, or -1 if they never joined or went offline
+        '''
+
+        row = self.rows.get(driver.id, -1)
+        return row if row >= 0 and self.free_at[row] < np.inf else -1
+
+    def add(self, driver: classes.Driver) -> int:
+        '''
+        Put a new or returning driver into the fleet at driver.coords (and driver.node), available from driver.time
+            - Returns their row
+        '''
+
+        row = self.rows.get(driver.id)
+        if row is None:
+            row = self.rows[driver.id] = len(self.drivers)
+            self.drivers.append(driver)
+            if row == len(self.free_at):
+                self._grow()
+        self.drivers[row] = driver
+        self.free_at[row] = seconds(driver.time)
+        self.coords[row] = driver.coords
+        self.node[row] = driver.node.index if driver.node is not None else -1
+        return row
+
+    def remove(self, row: int) -> bool:
+        '''
+        Take a driver out of the fleet
+            - Returns False if they were not in it
+        '''
+
+        if row < 0 or self.free_at[row] == np.inf:
+            return False
+        self.free_at[row] = np.inf
+        return True
+
+    def finish_ride(self, row: int, free_at: float, coords: tuple, node: int = -1) -> None:
+        '''
+        Record a completed ride: the driver is free again at free_at (seconds), at the drop-off
+        '''
+
+        self.free_at[row] = free_at
+        self.coords[row] = coords
+        self.node[row] = node
+        self.rides[row] += 1
+
+    def next_free(self) -> int:
+        '''
+        Row of the driver who has been free longest (or frees up first), or -1 if the fleet is empty
+        '''
+
+        if not self.drivers:
+            return -1
+        row = int(np.argmin(self.free_at[:len(self.drivers)]))
+        return row if self.free_at[row] < np.inf else -1
+
+    def nearest(self, coords: tuple, time: float) -> int:
+        '''
+        Row of the closest driver by straight-line distance among those free at time (seconds); if nobody is, the
+        driver who frees up first. -1 if the fleet is empty.
+        '''
+
+        n = len(self.drivers)
+        free = self.free_at[:n] <= time
+        if not free.any():
+            return self.next_free()
+        delta = self.coords[:n] - coords
+        squared = np.einsum('ij,ij->i', delta, delta)
+        squared[~free] = np.inf
+        return int(np.argmin(squared))
+
+    def available_on(self, reached: dict, time: float) -> tuple:
+        '''
+        Drivers free at time (seconds) whose node is in a search result, e.g. Node.isochrone(..., reverse = True)
+            - reached: <Node: minutes>
+            - Returns (rows, minutes) arrays, minutes being each driver's node's value in reached
+        '''
+
+        if not reached:
+            return np.empty(0, dtype = np.int64), np.empty(0)
+        index = np.fromiter((node.index for node in reached), dtype = np.int64, count = len(reached))
+        minutes = np.fromiter(reached.values(), dtype = float, count = len(reached))
+        order = np.argsort(index)
+        index, minutes = index[order], minutes[order]
+
+        n = len(self.drivers)
+        position = np.minimum(np.searchsorted(index, self.node[:n]), len(index) - 1)
+        rows = np.flatnonzero((index[position] == self.node[:n]) & (self.free_at[:n] <= time))
+        return rows, minutes[position[rows]]
+
+    def active_drivers(self) -> list:
+        '''
+        New Driver objects for everyone still in the fleet, at their current position and available from their free
+        time, ordered by it (e.g. to carry the fleet into a later simulation)
+        '''
+
+        rows = np.flatnonzero(self.free_at[:len(self.drivers)] < np.inf)
+        rows = rows[np.argsort(self.free_at[rows], kind = 'stable')]
+        return [classes.Driver(id = self.drivers[row].id, timestamp = EPOCH + dt.timedelta(seconds = free_at), lat = lat, lon = lon)
+                for row, free_at, (lat, lon) in zip(rows.tolist(), self.free_at[rows].tolist(), self.coords[rows].tolist())]
+
+    def pickup_times(self, coords: np.ndarray, mph: float, time: float = None) -> np.ndarray:
+        '''
+        Manhattan pickup estimate (minutes) from every driver to every passenger in a batch
+            - coords: (passengers, 2) array of lat/lon
+            - time: if given (seconds), drivers not free at time score inf
+            - Returns a (passengers, rows) matrix; memory grows with both, so split very large batches
+        '''
+
+        n = len(self.drivers)
+        minutes = manhattan_minutes(self.coords[None, :n], np.asarray(coords, dtype = float)[:, None], mph)
+        available = self.free_at[:n] < np.inf if time is None else self.free_at[:n] <= time
+        minutes[:, ~available] = np.inf
+        return minutes
+
+    def statistics(self, time: float) -> dict:
+        '''
+        Fleet-wide counts at time (seconds)
+        '''
+
+        free_at = self.free_at[:len(self.drivers)]
+        idle = np.maximum(time - free_at[free_at < np.inf], 0)
+        return {'drivers': len(idle), 'available': int(np.count_nonzero(free_at <= time)), 'rides': int(self.rides[:len(self.drivers)].sum()),
+                'mean_idle_minutes': float(idle.mean() / 60) if len(idle) else 0.0}
@@ -0,0 +1,246 @@
+'''
+Seeded synthetic city and demand generator
+
+Writes node_data.json, edges.csv, drivers.csv and passengers.csv in the same schema as the bundled data, so any
+matcher can be load-tested at any size without outside data:
+
+    notuber generate data/synthetic --nodes 100000 --passengers 1000000 --drivers 50000 --days 7
+
+The road network is a jittered lattice over the NYC bounding box. Every street (lattice row or column) is local,
+arterial or highway and all its blocks share one hourly speed profile per direction, with weekday rush-hour dips
+and a flatter weekend curve. A few local blocks are removed so the lattice has dead ends and degree-2 chains.
+Demand follows hourly weekday/weekend curves, with most trips starting or ending near weighted hotspots.
+'''
+
+import argparse
+import bisect
+import csv
+import datetime as dt
+import math
+import os
+import random
+import sys
+
+from .classes import LAT2MI, LON2MI
+from .datastructures import MIN_LAT, MIN_LON, MAX_LAT, MAX_LON
+
+SEED = 330
+START_DATE = dt.datetime(2014, 4, 21) # A Monday
+
+### Road network
+ARTERIAL_EVERY = 8 # Every 8th street is an arterial
+HIGHWAY_EVERY = 40 # Every 40th street is a highway
+DROP_RATE = 0.06 # Share of local blocks removed
+JITTER = 0.3 # Node position jitter as a share of block size
+
+# <road class: (free-flow mph, congestion sensitivity)>
+ROAD_CLASSES = {
+    'local': (18.0, 0.6),
+    'arterial': (28.0, 0.9),
+    'highway': (45.0, 1.2),
+}
+
+# Share of free-flow speed by hour (before applying a class's sensitivity)
+WEEKDAY_CONGESTION = [1.00, 1.00, 1.00, 1.00, 0.98, 0.92, 0.80, 0.62, 0.55, 0.65, 0.75, 0.76,
+                      0.74, 0.74, 0.72, 0.66, 0.58, 0.52, 0.56, 0.68, 0.80, 0.88, 0.94, 0.98]
+WEEKEND_CONGESTION = [0.95, 0.96, 0.98, 1.00, 1.00, 1.00, 0.98, 0.95, 0.90, 0.85, 0.80, 0.76,
+                      0.74, 0.74, 0.75, 0.76, 0.78, 0.80, 0.80, 0.82, 0.84, 0.86, 0.88, 0.92]
+
+### Demand
+# Relative ride requests by hour of day
+WEEKDAY_DEMAND = [1.6, 1.0, 0.7, 0.5, 0.6, 1.2, 2.6, 4.2, 4.8, 3.8, 3.2, 3.2,
+                  3.4, 3.4, 3.6, 4.0, 4.6, 5.4, 5.6, 5.0, 4.4, 4.0, 3.4, 2.4]
+WEEKEND_DEMAND = [3.8, 3.4, 2.8, 2.0, 1.2, 0.8, 0.8, 1.0, 1.6, 2.4, 3.0, 3.4,
+                  3.6, 3.6, 3.6, 3.6, 3.8, 4.0, 4.2, 4.2, 4.4, 4.6, 4.6, 4.2]
+SUPPLY_LEAD = 1 # Drivers come online following demand, this many hours earlier
+HOTSPOTS = 12
+HOTSPOT_SHARE = 0.65 # Share of trip ends drawn around a hotspot (rest uniform over the city)
+DRIVER_HOTSPOT_SHARE = 0.4
+
+
+def street_class(index: int) -> str:
+    if index % HIGHWAY_EVERY == 0:
+        return 'highway'
+    if index % ARTERIAL_EVERY == 0:
+        return 'arterial'
+    return 'local'
+
+def speed_profile(rng: random.Random, road_class: str) -> tuple:
+    '''
+    Hourly weekday and weekend speeds (mph, as strings like edges.csv) for one street direction
+    '''
+
+    free_flow, sensitivity = ROAD_CLASSES[road_class]
+    free_flow *= rng.uniform(0.9, 1.1)
+    weekday = [f'{free_flow * factor ** sensitivity:.2f}' for factor in WEEKDAY_CONGESTION]
+    weekend = [f'{free_flow * factor ** sensitivity:.2f}' for factor in WEEKEND_CONGESTION]
+    return weekday, weekend
+
+def lattice_shape(num_nodes: int) -> tuple:
+    '''
+    Rows and columns of a lattice with about num_nodes nodes and the aspect ratio of the bounding box in miles
+    '''
+
+    aspect = ((MAX_LON - MIN_LON) * LON2MI) / ((MAX_LAT - MIN_LAT) * LAT2MI)
+    rows = max(2, round(math.sqrt(num_nodes / aspect)))
+    cols = max(2, round(num_nodes / rows))
+    return rows, cols
+
+def generate_network(rows: int, cols: int, seed: int = SEED) -> tuple:
+    '''
+    Jittered lattice road network
+        - Returns (nodes, edges): nodes is a list of (node_id, lat, lon) and edges an iterator of
+          (start_id, end_id, length_mi, weekday_speeds, weekend_speeds) rows in edges.csv order
+    '''
+
+    rng = random.Random(seed)
+    lat_step = (MAX_LAT - MIN_LAT) / rows
+    lon_step = (MAX_LON - MIN_LON) / cols
+
+    nodes = []
+    for i in range(rows):
+        for j in range(cols):
+            lat = MIN_LAT + (i + 0.5 + rng.uniform(-JITTER, JITTER)) * lat_step
+            lon = MIN_LON + (j + 0.5 + rng.uniform(-JITTER, JITTER)) * lon_step
+            nodes.append((i * cols + j + 1, round(lat, 7), round(lon, 7)))
+
+    # One profile per street and direction, shared by all its blocks
+    row_profiles = [(speed_profile(rng, street_class(i)), speed_profile(rng, street_class(i))) for i in range(rows)]
+    col_profiles = [(speed_profile(rng, street_class(j)), speed_profile(rng, street_class(j))) for j in range(cols)]
+
+    def edges():
+        edge_rng = random.Random(seed + 1)
+        for i in range(rows):
+            for j in range(cols):
+                a = nodes[i * cols + j]
+                for di, dj in ((0, 1), (1, 0)):
+                    if i + di >= rows or j + dj >= cols:
+                        continue
+                    if di == 0: # Along row street i
+                        road_class, (forward, backward) = street_class(i), row_profiles[i]
+                    else: # Along column street j
+                        road_class, (forward, backward) = street_class(j), col_profiles[j]
+                    if road_class == 'local' and edge_rng.random() < DROP_RATE:
+                        continue
+
+                    b = nodes[(i + di) * cols + j + dj]
+                    length = math.sqrt(((a[1] - b[1]) * LAT2MI)**2 + ((a[2] - b[2]) * LON2MI)**2)
+                    yield (a[0], b[0], round(length, 5), *forward)
+                    yield (b[0], a[0], round(length, 5), *backward)
+
+    return nodes, edges()
+
+def make_hotspots(rng: random.Random, count: int = HOTSPOTS) -> list:
+    '''
+    Trip hotspots as (lat, lon, spread_deg, weight): one airport-like hotspot near the south-east corner and the
+    rest concentrated toward the middle of the city, weighted by a Zipf law
+    '''
+
+    hotspots = [(MIN_LAT + 0.37 * (MAX_LAT - MIN_LAT), MIN_LON + 0.82 * (MAX_LON - MIN_LON), 0.004, 1.0)]
+    for k in range(1, count):
+        lat = rng.triangular(MIN_LAT, MAX_LAT, MIN_LAT + 0.55 * (MAX_LAT - MIN_LAT))
+        lon = rng.triangular(MIN_LON, MAX_LON, MIN_LON + 0.45 * (MAX_LON - MIN_LON))
+        hotspots.append((lat, lon, rng.uniform(0.004, 0.015), 1.0 / k))
+    return hotspots
+
+def sample_point(rng: random.Random, hotspots: list, cum_weights: list, hotspot_share: float) -> tuple:
+    if rng.random() < hotspot_share:
+        lat, lon, spread, _ = hotspots[bisect.bisect(cum_weights, rng.random() * cum_weights[-1])]
+        lat = min(MAX_LAT, max(MIN_LAT, rng.gauss(lat, spread)))
+        lon = min(MAX_LON, max(MIN_LON, rng.gauss(lon, spread)))
+        return (round(lat, 4), round(lon, 4))
+    return (round(rng.uniform(MIN_LAT, MAX_LAT), 4), round(rng.uniform(MIN_LON, MAX_LON), 4))
+
+def sample_times(rng: random.Random, count: int, days: int, start: dt.datetime, lead_hours: int = 0) -> list:
+    '''
+    Sorted request times following WEEKDAY_DEMAND/WEEKEND_DEMAND (shifted lead_hours earlier)
+    '''
+
+    slots, cum_weights, total = [], [], 0
+    for day in range(days):
+        curve = WEEKEND_DEMAND if (start + dt.timedelta(days = day)).weekday() > 4 else WEEKDAY_DEMAND
+        for hour in range(24):
+            total += curve[(hour + lead_hours) % 24]
+            slots.append(day * 24 + hour)
+            cum_weights.append(total)
+
+    seconds = sorted(slots[bisect.bisect(cum_weights, rng.random() * total)] * 3600 + rng.randrange(3600) for _ in range(count))
+    return [start + dt.timedelta(seconds = s) for s in seconds]
+
+def generate_people(num_drivers: int, num_passengers: int, days: int = 1, start: dt.datetime = START_DATE, seed: int = SEED, hotspots: int = HOTSPOTS) -> tuple:
+    '''
+    Driver and passenger rows in drivers.csv/passengers.csv order
+        - Returns (drivers, passengers): lists of (time, lat, lon) and (time, lat, lon, dest_lat, dest_lon)
+    '''
+
+    rng = random.Random(seed + 2)
+    spots = make_hotspots(rng, hotspots)
+    cum_weights = []
+    for spot in spots:
+        cum_weights.append((cum_weights[-1] if cum_weights else 0) + spot[3])
+
+    drivers = [(timestamp, *sample_point(rng, spots, cum_weights, DRIVER_HOTSPOT_SHARE))
+               for timestamp in sample_times(rng, num_drivers, days, start, SUPPLY_LEAD)]
+    passengers = [(timestamp, *sample_point(rng, spots, cum_weights, HOTSPOT_SHARE), *sample_point(rng, spots, cum_weights, HOTSPOT_SHARE))
+                  for timestamp in sample_times(rng, num_passengers, days, start)]
+    return drivers, passengers
+
+def write_network(out_dir: str, nodes: list, edges) -> int:
+    '''
+    Write node_data.json and edges.csv
+        - Returns number of edges written
+    '''
+
+    with open(os.path.join(out_dir, 'node_data.json'), 'w') as f:
+        f.write('{')
+        f.write(', '.join(f'"{node_id}": {{"lon": {lon}, "lat": {lat}}}' for node_id, lat, lon in nodes))
+        f.write('}')
+
+    count = 0
+    with open(os.path.join(out_dir, 'edges.csv'), 'w', newline = '') as f:
+        writer = csv.writer(f)
+        writer.writerow(['start_id', 'end_id', 'length'] + [f'weekday_{h}' for h in range(24)] + [f'weekend_{h}' for h in range(24)])
+        for start_id, end_id, length, weekday, weekend in edges:
+            writer.writerow([start_id, end_id, length, *weekday, *weekend])
+            count += 1
+    return count
+
+def write_people(out_dir: str, drivers: list, passengers: list) -> None:
+    with open(os.path.join(out_dir, 'drivers.csv'), 'w', newline = '') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Date/Time', 'Source Lat', 'Source Lon'])
+        for timestamp, lat, lon in drivers:
+            writer.writerow([timestamp.strftime("%m/%d/%Y %H:%M:%S"), lat, lon])
+
+    with open(os.path.join(out_dir, 'passengers.csv'), 'w', newline = '') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Date/Time', 'Source Lat', 'Source Lon', 'Dest Lat', 'Dest Lon'])
+        for timestamp, lat, lon, dest_lat, dest_lon in passengers:
+            writer.writerow([timestamp.strftime("%m/%d/%Y %H:%M:%S"), lat, lon, dest_lat, dest_lon])
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description = 'Generate a synthetic NotUber city and demand in the bundled data format')
+    parser.add_argument('out_dir')
+    parser.add_argument('--nodes', type = int, default = 100000, help = 'approximate number of road network nodes')
+    parser.add_argument('--drivers', type = int, default = 5000)
+    parser.add_argument('--passengers', type = int, default = 50000)
+    parser.add_argument('--days', type = int, default = 1)
+    parser.add_argument('--start', default = START_DATE.strftime('%Y-%m-%d'), help = 'first service day (YYYY-MM-DD)')
+    parser.add_argument('--hotspots', type = int, default = HOTSPOTS)
+    parser.add_argument('--seed', type = int, default = SEED)
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.out_dir, exist_ok = True)
+
+    rows, cols = lattice_shape(args.nodes)
+    nodes, edges = generate_network(rows, cols, args.seed)
+    num_edges = write_network(args.out_dir, nodes, edges)
+    print(f'Wrote {len(nodes)} nodes ({rows} x {cols}) and {num_edges} edges')
+
+    drivers, passengers = generate_people(args.drivers, args.passengers, args.days, dt.datetime.strptime(args.start, '%Y-%m-%d'), args.seed, args.hotspots)
+    write_people(args.out_dir, drivers, passengers)
+    print(f'Wrote {len(drivers)} drivers and {len(passengers)} passengers over {args.days} day(s) to {args.out_dir}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
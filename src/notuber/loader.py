@@ -0,0 +1,141 @@
+import os
+import json
+import csv
+import math
+
+from . import classes
+
+### Bundled data lives next to src/ in a checkout, independent of the working directory; NOTUBER_DATA points elsewhere
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DATA_DIR = os.environ.get('NOTUBER_DATA') or os.path.join(REPO_DIR, 'data')
+
+
+def data_path(filename: str, data_dir: str = None) -> str:
+    '''
+    Absolute path of a data file
+        - data_dir: directory holding node_data.json, edges.csv, drivers.csv and passengers.csv (defaults to the bundled data)
+    '''
+
+    return os.path.join(data_dir or DATA_DIR, filename)
+
+def load_nodes(data_dir: str = None) -> dict:
+    '''
+    Read node_data.json into Node objects
+        - Returns <node_id: Node_Object>
+    '''
+
+    with open(data_path('node_data.json', data_dir), 'r') as v:
+        n_reader = json.load(v)
+
+    nodes = {}
+    for index, node_id in enumerate(n_reader):
+        nodes[int(node_id)] = classes.Node(id = int(node_id), lat = n_reader[node_id]['lat'], lon = n_reader[node_id]['lon'])
+        nodes[int(node_id)].index = index
+    classes.reserve_workspaces(len(nodes))
+
+    return nodes
+
+def load_edges(nodes: dict, data_dir: str = None, profiles: classes.SpeedProfiles = None) -> list:
+    '''
+    Read edges.csv into Edge objects and attach them to the neighbors of their start node and the incoming of their end node
+        - nodes: <node_id: Node_Object> (WILL BE MUTATED)
+        - profiles: intern speed profiles into this table (WILL BE MUTATED); edges then share tuples of float speeds
+          and carry a profile id instead of holding their own dicts of strings
+        - Returns list of all edges in file order
+    '''
+
+    edges = []
+    with open(data_path('edges.csv', data_dir), 'r') as e:
+        _ = e.readline()
+        e_reader = csv.reader(e)
+
+        for edge in e_reader:
+            start_node = nodes[int(edge[0])]
+            end_node = nodes[int(edge[1])]
+            if profiles is None:
+                weekday_speeds = dict(zip([*range(0, 24)], edge[3:27]))
+                weekend_speeds = dict(zip([*range(0, 24)], edge[27:]))
+                neighbor = classes.Edge(start_node, end_node, edge[2], weekday_speeds, weekend_speeds)
+            else:
+                profile = profiles.intern(edge[3:27], edge[27:])
+                neighbor = classes.Edge(start_node, end_node, edge[2], *profiles.profiles[profile], profile)
+            start_node.neighbors.append(neighbor) # Add edge to neighbors of start node
+            end_node.incoming.append(neighbor)
+            edges.append(neighbor)
+
+    return edges
+
+def load_drivers(data_dir: str = None) -> list:
+    '''
+    Read drivers.csv into Driver objects (IDs assigned in file order starting at 1 because the data doesn't come with them)
+    '''
+
+    drivers = []
+    with open(data_path('drivers.csv', data_dir), 'r') as d:
+        _ = d.readline()
+        d_reader = csv.reader(d)
+
+        id = 1
+        for timestamp, lat, lon in d_reader:
+            drivers.append(classes.Driver(id = id, timestamp = timestamp, lat = float(lat), lon = float(lon)))
+            id += 1
+
+    return drivers
+
+def load_passengers(data_dir: str = None) -> list:
+    '''
+    Read passengers.csv into Passenger objects (IDs assigned in file order starting at 1 because the data doesn't come with them)
+    '''
+
+    passengers = []
+    with open(data_path('passengers.csv', data_dir), 'r') as p:
+        _ = p.readline()
+        p_reader = csv.reader(p)
+
+        id = 1
+        for timestamp, start_lat, start_lon, end_lat, end_lon in p_reader:
+            passengers.append(classes.Passenger(id = id, timestamp = timestamp, start_lat = float(start_lat), start_lon = float(start_lon), end_lat = float(end_lat), end_lon = float(end_lon)))
+            id += 1
+
+    return passengers
+
+def snapping_grid(nodes: dict, partitions: int) -> tuple:
+    '''
+    Partition nodes into the square grid used by Person.assign_node
+        - partitions: number of subpartitions (rounded up to a square)
+        - Returns (grid, grid_params) where grid_params is [num_partitions, minlat, maxlat, minlon, maxlon]
+    '''
+
+    minlat = min(node.coords[0] for node in nodes.values())
+    maxlat = max(node.coords[0] for node in nodes.values())
+    minlon = min(node.coords[1] for node in nodes.values())
+    maxlon = max(node.coords[1] for node in nodes.values())
+    grid_params = [partitions, minlat, maxlat, minlon, maxlon]
+
+    side = math.ceil(math.sqrt(partitions))
+    grid = [[[] for i in range(side)] for j in range(side)]
+    for node in nodes.values():
+        node.partition(grid, grid_params)
+
+    return grid, grid_params
+
+def avg_mph(edges: list) -> float:
+    '''
+    Average speed across all roads and all weekday/weekend hours (used by A* heuristic and Manhattan estimates)
+    '''
+
+    total = 0
+    profile_means = {} # <profile_id: mean speed>, for interned edges
+    for edge in edges:
+        if edge.profile in profile_means:
+            total += profile_means[edge.profile]
+            continue
+        avg_speed = 0
+        for hour in range(24):
+            avg_speed += float(edge.weekday_speeds[hour]) + float(edge.weekend_speeds[hour])
+        avg_speed /= 48
+        if edge.profile is not None:
+            profile_means[edge.profile] = avg_speed
+        total += avg_speed
+
+    return total / len(edges)
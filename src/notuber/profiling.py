@@ -0,0 +1,132 @@
+'''
+Switchable per-phase timers and search counters
+
+Disabled by default. Enable with the NOTUBER_PROFILE environment variable (NOTUBER_PROFILE=1 for phase timers and
+counters, NOTUBER_PROFILE=out.prof to also run cProfile and dump its stats there), or from code with
+PROFILER.enable(). The .prof dump is standard pstats, readable by snakeviz, flameprof or gprof2dot.
+
+Hot code only pays for an attribute check or a no-op call while disabled:
+
+    lap = PROFILER.lap()     # no-op object when disabled
+    ...
+    lap('match')             # time since previous lap goes to 'match'
+'''
+
+import os
+import time
+import cProfile
+import pstats
+
+
+class _Lap:
+
+    def __init__(self, profiler) -> None:
+        self.profiler = profiler
+        self.last = time.perf_counter()
+
+    def __call__(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.profiler.add_time(phase, now - self.last)
+        self.last = now
+
+class _NullLap:
+
+    def __call__(self, phase: str) -> None:
+        pass
+
+NULL_LAP = _NullLap()
+
+
+class Profiler:
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.times = {} # <phase: seconds>
+        self.calls = {} # <phase: number of timed sections>
+        self.counters = {} # <counter name: total>
+        self.cprofile = None
+        self.dump_path = None
+
+    def enable(self, dump_path: str = None) -> None:
+        '''
+        Turn on phase timers and counters
+            - dump_path: also run cProfile and write pstats there on dump()
+        '''
+
+        self.enabled = True
+        if dump_path:
+            self.dump_path = dump_path
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+    def disable(self) -> None:
+        self.enabled = False
+        if self.cprofile is not None:
+            self.cprofile.disable()
+
+    def reset(self) -> None:
+        self.times.clear()
+        self.calls.clear()
+        self.counters.clear()
+
+    def lap(self):
+        '''
+        Sequential phase timer started now (a shared no-op when disabled)
+        '''
+
+        return _Lap(self) if self.enabled else NULL_LAP
+
+    def add_time(self, phase: str, seconds: float) -> None:
+        self.times[phase] = self.times.get(phase, 0.0) + seconds
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self) -> str:
+        '''
+        Table of phase times and counters
+        '''
+
+        total = sum(self.times.values())
+        lines = [f'{"phase":<20}{"calls":>10}{"seconds":>12}{"share":>9}{"us/call":>12}']
+        for phase, seconds in sorted(self.times.items(), key = lambda item: -item[1]):
+            calls = self.calls[phase]
+            lines.append(f'{phase:<20}{calls:>10}{seconds:>12.3f}{seconds / total if total else 0:>9.1%}{seconds / calls * 1e6:>12.1f}')
+        if self.counters:
+            lines.append('')
+            lines.append(f'{"counter":<40}{"total":>14}')
+            for name, value in sorted(self.counters.items()):
+                lines.append(f'{name:<40}{value:>14}')
+        return '\n'.join(lines)
+
+    def dump(self, path: str = None) -> str:
+        '''
+        Write cProfile stats (pstats format) if cProfile is running
+            - Returns the path written, or None
+        '''
+
+        path = path or self.dump_path
+        if self.cprofile is None or not path:
+            return None
+        self.cprofile.disable()
+        pstats.Stats(self.cprofile).dump_stats(path)
+        return path
+
+    def report(self) -> None:
+        '''
+        Print the summary table and write the cProfile dump (no-op when disabled)
+        '''
+
+        if not self.enabled:
+            return
+        print(self.summary())
+        path = self.dump()
+        if path:
+            print(f'cProfile stats written to {path}')
+
+PROFILER = Profiler()
+
+_setting = os.environ.get('NOTUBER_PROFILE', '')
+if _setting and _setting != '0':
+    PROFILER.enable(None if _setting == '1' else _setting)
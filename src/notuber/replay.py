@@ -0,0 +1,148 @@
+'''
+Real-time replay of passengers.csv against a matcher
+
+Requests are released at their Date/Time, compressed by a speedup factor (60 means one simulated hour per wall-clock
+minute). For each request we measure the wall-clock latency from its release to its assignment, which includes any
+time spent queued behind earlier requests. A matcher keeps up when requests never wait longer than the allowed lag;
+otherwise the report shows when it fell behind and how deep the queue grew.
+
+    notuber replay T4 --speedup 60 --timeline t4_timeline.csv
+'''
+
+import argparse
+import bisect
+import csv
+import contextlib
+import datetime as dt
+import math
+import os
+import sys
+import time
+
+from . import load_matcher
+from . import simulation
+
+### Defaults
+SPEEDUP = 60.0
+BUCKET_MINUTES = 60 # Simulated minutes per row of the timeline summary
+
+
+def replay(matcher, passengers: list, speedup: float = SPEEDUP, quiet: bool = True) -> list:
+    '''
+    Release passengers (sorted by request time) in scaled real time and dispatch each as soon as the matcher is free
+        - matcher: module exposing setup() and dispatch(), already initialized
+        - Returns one record per dispatched request:
+          (request_time, arrival, start, done, queue_depth) with wall-clock times in seconds since replay start
+    '''
+
+    matcher.setup()
+    metrics = simulation.Metrics()
+    first = passengers[0].time
+    arrivals = [(passenger.time - first).total_seconds() / speedup for passenger in passengers]
+
+    records = []
+    wall_start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, (contextlib.redirect_stdout(devnull) if quiet else contextlib.nullcontext()):
+        for i, passenger in enumerate(passengers):
+            now = time.perf_counter() - wall_start
+            if now < arrivals[i]: # Ahead of schedule, wait for the request to arrive
+                time.sleep(arrivals[i] - now)
+
+            request_time = passenger.time # Matchers may advance passenger.time while dispatching
+            start = time.perf_counter() - wall_start
+            depth = bisect.bisect_right(arrivals, start) - i # Requests released but not yet assigned, including this one
+            if matcher.dispatch(passenger, metrics) is None: # Fleet exhausted
+                break
+            done = time.perf_counter() - wall_start
+
+            records.append((request_time, arrivals[i], start, done, depth))
+
+    return records
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)] if ordered else float('nan')
+
+def summarize(records: list, max_lag: float) -> dict:
+    '''
+    Latency distribution (ms), queueing and whether the matcher kept up
+        - max_lag: wall-clock seconds a request may wait in queue before the matcher counts as falling behind
+    '''
+
+    latencies = [(done - arrival) * 1000 for _, arrival, _, done, _ in records]
+    lags = [start - arrival for _, arrival, start, _, _ in records]
+    behind = next((record for record, lag in zip(records, lags) if lag > max_lag), None)
+
+    return {
+        'requests': len(records),
+        'mean_ms': sum(latencies) / len(latencies) if latencies else float('nan'),
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'max_ms': max(latencies, default = float('nan')),
+        'max_queue': max((record[4] for record in records), default = 0),
+        'final_lag_s': lags[-1] if lags else 0.0,
+        'keeps_up': behind is None,
+        'fell_behind_at': behind[0] if behind else None,
+    }
+
+def timeline(records: list, bucket_minutes: int = BUCKET_MINUTES) -> list:
+    '''
+    Per simulated time bucket: (bucket start, requests, mean latency ms, max latency ms, max queue depth)
+    '''
+
+    buckets = {}
+    for request_time, arrival, start, done, depth in records:
+        minutes = request_time.hour * 60 + request_time.minute
+        key = request_time.replace(hour = 0, minute = 0, second = 0, microsecond = 0) + dt.timedelta(minutes = minutes - minutes % bucket_minutes)
+        buckets.setdefault(key, []).append(((done - arrival) * 1000, depth))
+
+    rows = []
+    for key in sorted(buckets):
+        values = buckets[key]
+        rows.append((key, len(values), sum(v[0] for v in values) / len(values), max(v[0] for v in values), max(v[1] for v in values)))
+    return rows
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description = 'Replay passengers.csv in scaled real time and measure per-request match latency')
+    parser.add_argument('matcher', help = 'matcher module, e.g. T4')
+    parser.add_argument('--data', default = None, help = 'data directory (defaults to the bundled data)')
+    parser.add_argument('--speedup', type = float, default = SPEEDUP, help = 'simulated seconds per wall-clock second')
+    parser.add_argument('--limit', type = int, default = None, help = 'replay only the first N passengers')
+    parser.add_argument('--max-lag', type = float, default = None, help = 'wall seconds a request may queue before the matcher counts as behind (default: one simulated minute)')
+    parser.add_argument('--bucket', type = int, default = BUCKET_MINUTES, help = 'simulated minutes per timeline row')
+    parser.add_argument('--timeline', default = None, help = 'write every request as CSV')
+    args = parser.parse_args(argv)
+
+    matcher = load_matcher(args.matcher)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        matcher.initialize(args.data)
+    passengers = matcher.PASSENGERS[:args.limit] if args.limit else matcher.PASSENGERS
+
+    span = (passengers[-1].time - passengers[0].time).total_seconds() / args.speedup
+    print(f'Replaying {len(passengers)} requests through {args.matcher} at {args.speedup:g}x (about {span:.0f} s wall clock)')
+    records = replay(matcher, passengers, args.speedup)
+
+    summary = summarize(records, args.max_lag if args.max_lag is not None else 60 / args.speedup)
+    print(f'{"sim time":<18}{"requests":>9}{"mean ms":>10}{"max ms":>10}{"queue":>7}')
+    for key, count, mean, worst, depth in timeline(records, args.bucket):
+        print(f'{key.strftime("%m/%d %H:%M"):<18}{count:>9}{mean:>10.1f}{worst:>10.1f}{depth:>7}')
+    print()
+    print(f'Latency ms: mean {summary["mean_ms"]:.1f}, p50 {summary["p50_ms"]:.1f}, p95 {summary["p95_ms"]:.1f}, p99 {summary["p99_ms"]:.1f}, max {summary["max_ms"]:.1f}')
+    print(f'Max queue depth: {summary["max_queue"]}, final lag: {summary["final_lag_s"]:.2f} s')
+    if summary['keeps_up']:
+        print(f'{args.matcher} keeps up at {args.speedup:g}x')
+    else:
+        print(f'{args.matcher} falls behind at {args.speedup:g}x from {summary["fell_behind_at"]}')
+
+    if args.timeline:
+        with open(args.timeline, 'w', newline = '') as f:
+            writer = csv.writer(f)
+            writer.writerow(['request_time', 'arrival_s', 'start_s', 'done_s', 'latency_ms', 'queue_depth'])
+            for request_time, arrival, start, done, depth in records:
+                writer.writerow([request_time.strftime("%m/%d/%Y %H:%M:%S"), f'{arrival:.4f}', f'{start:.4f}', f'{done:.4f}', f'{(done - arrival) * 1000:.2f}', depth])
+
+    return 0 if summary['keeps_up'] else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
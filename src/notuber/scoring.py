@@ -0,0 +1,78 @@
+'''
+Candidate driver scoring for the network-distance matchers (T3, T4), optionally spread over a process pool
+
+The pool is forked after the graph is loaded, so workers share the parent's nodes copy-on-write and only node ids
+and distances cross the process boundary. Candidates are cut into a few contiguous chunks per worker and the results
+come back in candidate order, so the matcher's "first strictly smaller ETA wins" tie-breaking is unchanged.
+
+Set NOTUBER_WORKERS=N to score with N processes (fork start method, i.e. Linux/macOS).
+'''
+
+import multiprocessing
+import os
+
+from .engine import search
+
+### Defaults
+WORKERS = int(os.environ.get('NOTUBER_WORKERS', '0')) # 0 or 1 scores in the calling process
+CHUNKS_PER_WORKER = 4 # More chunks balance uneven searches, fewer amortize IPC better
+MIN_PARALLEL = 16 # Fewer candidates than this are scored serially; a round trip costs more than a few searches
+
+_NODES = {} # <node_id: Node_Object>, inherited by forked workers
+_ENGINE = None # engine.Engine searched instead of the nodes, inherited by forked workers
+
+
+def _score_chunk(task: tuple) -> list:
+    '''
+    Worker side: travel times from each source node to the target
+    '''
+
+    method, source_ids, target_id, start_time, args = task
+    target = _NODES[target_id]
+    return [search(_ENGINE, method, _NODES[source_id], target, start_time, *args) for source_id in source_ids]
+
+class CandidateScorer:
+    '''
+    Travel time from many candidate nodes to one target with Node.shortest_path or Node.shortest_path_a_star
+        - nodes: the loaded graph; must not change after the pool starts
+        - workers: processes to fork (0 or 1 for serial scoring)
+        - engine: engine.Engine to search with instead of the Node methods
+
+    Searches run in workers report their counters to the workers' profiler, not the parent's.
+    '''
+
+    def __init__(self, nodes: dict, method: str = 'shortest_path', workers: int = WORKERS, chunks_per_worker: int = CHUNKS_PER_WORKER, min_parallel: int = MIN_PARALLEL, engine = None) -> None:
+        global _ENGINE
+        self.method = method
+        self.engine = engine
+        self.workers = workers
+        self.chunks_per_worker = chunks_per_worker
+        self.min_parallel = min_parallel
+        self.pool = None
+        if workers > 1:
+            _NODES.clear()
+            _NODES.update(nodes)
+            _ENGINE = engine
+            self.pool = multiprocessing.get_context('fork').Pool(workers)
+
+    def travel_times(self, sources: list, target, start_time, *args) -> list:
+        '''
+        Minutes from every source node to target (-1 where unreachable), in the order of sources
+            - args: extra arguments of the search method (AVG_MPH for shortest_path_a_star)
+        '''
+
+        if self.pool is None or len(sources) < self.min_parallel:
+            return [search(self.engine, self.method, source, target, start_time, *args) for source in sources]
+
+        size = -(-len(sources) // (self.workers * self.chunks_per_worker)) # Ceiling division
+        tasks = [(self.method, [source.id for source in sources[i:i + size]], target.id, start_time, args) for i in range(0, len(sources), size)]
+        times = []
+        for chunk in self.pool.map(_score_chunk, tasks, chunksize = 1):
+            times.extend(chunk)
+        return times
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
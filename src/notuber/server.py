@@ -0,0 +1,293 @@
+'''
+Long-lived dispatch service: one matcher behind a local socket
+
+The graph and fleet stay in memory between requests. Clients speak JSON lines over TCP or a Unix socket; requests
+arriving within the batching window are matched together in one pass (in request-time order), and when more than
+--max-pending messages are waiting the server answers "overloaded" instead of queueing without bound.
+
+    notuber serve T4 --port 8330 --batch-ms 5
+    notuber serve T5 --unix /tmp/notuber.sock --empty-fleet
+
+Messages (one JSON object per line, replies carry the request's id):
+    {"type": "ride", "id": "r1", "time": "04/25/2014 07:00:00", "lat": .., "lon": .., "dest_lat": .., "dest_lon": ..}
+        -> {"type": "assignment", "id": "r1", "driver": 17, "pickup_eta": 4.2, "dropoff_eta": 11.8, "wait": 0.0, "batch": 3}
+        -> {"type": "unassigned", "id": "r1", "reason": "no drivers"}   (or "no route" when the trip can't be routed)
+    {"type": "driver", "id": 17, "status": "available", "time": "04/25/2014 07:00:00", "lat": .., "lon": ..}
+    {"type": "driver", "id": 17, "status": "offline"}
+        -> {"type": "ack", "id": 17, "status": "available"}
+    {"type": "stats"}
+        -> {"type": "stats", "received": .., "assigned": .., ...}
+    Anything else -> {"type": "error", "id": .., "error": "..."}; "overloaded" means retry later. A message the matcher
+    fails on gets an error reply too ("matching failed: ..."), and the server goes on with the rest of the batch.
+'''
+
+import argparse
+import asyncio
+import concurrent.futures
+import contextlib
+import datetime as dt
+import json
+import os
+import sys
+import time
+
+from . import load_matcher
+from . import classes
+from . import simulation
+
+### Defaults
+HOST = '127.0.0.1'
+PORT = 8330
+BATCH_MS = 5.0 # Window after the first queued message during which later ones join the same matching pass
+MAX_BATCH = 256
+MAX_PENDING = 1024 # Messages waiting to be matched before new ones are rejected as overloaded
+TIME_FORMAT = '%m/%d/%Y %H:%M:%S'
+
+
+def log(message: str) -> None:
+    print(message, file = sys.stderr, flush = True) # stdout belongs to the matcher's chatter
+
+class Dispatcher:
+    '''
+    Owns the matcher state. Messages are queued from the event loop and matched in batches on a single worker thread,
+    so the matcher never sees concurrent calls and the loop keeps accepting connections while a batch runs.
+    '''
+
+    def __init__(self, matcher, batch_ms: float = BATCH_MS, max_batch: int = MAX_BATCH, max_pending: int = MAX_PENDING) -> None:
+        self.matcher = matcher
+        self.metrics = simulation.Metrics()
+        self.fleet = {driver.id: driver for driver in matcher.DRIVERS} # <driver_id: Driver>, online or not
+        self.batch_window = batch_ms / 1000
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.pending = None # asyncio.Queue, made by serve() in the running loop (before Python 3.10 a queue binds to the loop current when it is made)
+        self.worker = concurrent.futures.ThreadPoolExecutor(1)
+        self.next_passenger_id = 1
+
+        self.stats = {'received': 0, 'assigned': 0, 'unassigned': 0, 'rejected': 0, 'errors': 0, 'driver_updates': 0,
+                      'batches': 0, 'largest_batch': 0, 'match_seconds': 0.0}
+
+    def submit(self, message: dict):
+        '''
+        Queue a ride request or driver update
+            - Returns a future resolving to the reply, or None if the queue is full
+        '''
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.pending.put_nowait((message, future))
+        except asyncio.QueueFull:
+            self.stats['rejected'] += 1
+            return None
+        self.stats['received'] += 1
+        return future
+
+    async def run_batches(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.pending.get()]
+            if self.batch_window > 0:
+                await asyncio.sleep(self.batch_window) # Let the rest of the burst arrive
+            while len(batch) < self.max_batch and not self.pending.empty():
+                batch.append(self.pending.get_nowait())
+
+            try:
+                replies = await loop.run_in_executor(self.worker, self.match_batch, [message for message, _ in batch])
+            except Exception as e: # Keep serving: every client of the batch gets an error instead of waiting forever
+                log(f'Batch failed: {e!r}')
+                self.stats['errors'] += len(batch)
+                replies = [{'type': 'error', 'id': message.get('id'), 'error': f'matching failed: {e}'} for message, _ in batch]
+            for (_, future), reply in zip(batch, replies):
+                if not future.done(): # Client may have disconnected
+                    future.set_result(reply)
+
+    def match_batch(self, messages: list) -> list:
+        '''
+        One matching pass: apply driver updates in arrival order, then dispatch the batch's rides by request time
+            - Returns one reply per message, in the order given
+        '''
+
+        start = time.perf_counter()
+        replies = [None] * len(messages)
+        rides = []
+        for i, message in enumerate(messages):
+            try:
+                if message.get('type') == 'ride':
+                    rides.append((self.parse_ride(message), i))
+                else:
+                    replies[i] = self.update_driver(message)
+            except (KeyError, TypeError, ValueError) as e:
+                self.stats['errors'] += 1
+                replies[i] = {'type': 'error', 'id': message.get('id'), 'error': f'bad {message.get("type")} message: {e}'}
+            except Exception as e: # From the matcher (snapping, add_driver/remove_driver): reply and go on with the batch
+                log(f'{message.get("type")} message failed: {e!r}')
+                self.stats['errors'] += 1
+                replies[i] = {'type': 'error', 'id': message.get('id'), 'error': f'{message.get("type")} failed: {e}'}
+
+        rides.sort(key = lambda ride: ride[0].time) # Stable, so simultaneous requests keep arrival order
+        for passenger, i in rides:
+            try:
+                replies[i] = self.dispatch(passenger, messages[i].get('id'), len(messages))
+            except Exception as e: # A failing request must not take the batch (and every waiting client) down with it
+                log(f'Dispatch failed: {e!r}')
+                self.stats['errors'] += 1
+                replies[i] = {'type': 'error', 'id': messages[i].get('id'), 'error': f'matching failed: {e}'}
+
+        self.stats['batches'] += 1
+        self.stats['largest_batch'] = max(self.stats['largest_batch'], len(messages))
+        self.stats['match_seconds'] += time.perf_counter() - start
+        return replies
+
+    def parse_ride(self, message: dict) -> classes.Passenger:
+        passenger = classes.Passenger(self.next_passenger_id, message['time'], float(message['lat']), float(message['lon']),
+                                      float(message['dest_lat']), float(message['dest_lon']))
+        self.next_passenger_id += 1
+        snap = getattr(self.matcher, 'snap_passenger', None) # Matchers that snap up front; the rest snap when matching
+        if snap:
+            snap(passenger)
+        return passenger
+
+    def dispatch(self, passenger: classes.Passenger, request_id, batch_size: int) -> dict:
+        request_time = passenger.time # Matchers advance passenger.time to the pickup
+        served = len(self.metrics.passenger_wait_times)
+        match = self.matcher.dispatch(passenger, self.metrics)
+        if match is None or match is simulation.UNREACHABLE:
+            self.stats['unassigned'] += 1
+            return {'type': 'unassigned', 'id': request_id, 'reason': 'no route' if match else 'no drivers'}
+
+        driver, pickup_eta, dropoff_eta = match
+        total = self.metrics.passenger_wait_times[served] # Availability wait + pickup + dropoff, as recorded by the matcher
+        self.stats['assigned'] += 1
+        return {'type': 'assignment', 'id': request_id, 'driver': driver.id, 'time': request_time.strftime(TIME_FORMAT),
+                'pickup_eta': round(pickup_eta, 3), 'dropoff_eta': round(dropoff_eta, 3),
+                'wait': round(total - pickup_eta - dropoff_eta, 3), 'batch': batch_size}
+
+    def update_driver(self, message: dict) -> dict:
+        '''
+        Driver status change: "available" (new driver, or an existing one reappearing at a time and place) or "offline"
+        '''
+
+        driver_id, status = int(message['id']), message['status']
+        driver = self.fleet.get(driver_id)
+        if status == 'offline':
+            if driver is not None:
+                self.matcher.remove_driver(driver)
+        elif status == 'available':
+            if driver is None:
+                driver = self.fleet[driver_id] = classes.Driver(driver_id, message['time'], float(message['lat']), float(message['lon']))
+            else:
+                self.matcher.remove_driver(driver) # Position is indexed, so take it out before moving
+                driver.time = dt.datetime.strptime(message['time'], TIME_FORMAT)
+                driver.coords = (float(message['lat']), float(message['lon']))
+            self.matcher.add_driver(driver)
+        else:
+            raise ValueError(f'unknown status {status!r}')
+
+        self.stats['driver_updates'] += 1
+        return {'type': 'ack', 'id': driver_id, 'status': status}
+
+    def snapshot(self) -> dict:
+        stats = dict(self.stats, type = 'stats', pending = self.pending.qsize() if self.pending is not None else 0, fleet = len(self.fleet))
+        stats.update({key: value for key, value in self.metrics.summary(len(self.fleet)).items() if key in ('mean_wait', 'p95_wait')})
+        return stats
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        '''
+        One client connection. Replies are written as their batches finish, so they may come back out of order.
+        '''
+
+        replies = set()
+
+        async def reply_when_done(future):
+            send(await future)
+
+        def send(reply):
+            writer.write((json.dumps(reply) + '\n').encode())
+
+        try:
+            async for line in reader:
+                if not line.strip():
+                    continue
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    send({'type': 'error', 'id': None, 'error': 'invalid JSON'})
+                    continue
+                if not isinstance(message, dict):
+                    send({'type': 'error', 'id': None, 'error': 'expected a JSON object'})
+                    continue
+
+                if message.get('type') == 'stats':
+                    send(self.snapshot())
+                elif message.get('type') not in ('ride', 'driver'):
+                    send({'type': 'error', 'id': message.get('id'), 'error': f'unknown message type {message.get("type")!r}'})
+                else:
+                    future = self.submit(message)
+                    if future is None:
+                        send({'type': 'error', 'id': message.get('id'), 'error': 'overloaded', 'pending': self.pending.qsize()})
+                    else:
+                        task = asyncio.ensure_future(reply_when_done(future))
+                        replies.add(task)
+                        task.add_done_callback(replies.discard)
+                await writer.drain() # Stop reading from a client that is not reading its replies
+
+            if replies:
+                await asyncio.gather(*replies)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for task in replies:
+                task.cancel()
+            writer.close()
+
+async def serve(dispatcher: Dispatcher, host: str = HOST, port: int = PORT, unix: str = None) -> None:
+    dispatcher.pending = asyncio.Queue(dispatcher.max_pending)
+    if unix:
+        if os.path.exists(unix):
+            os.remove(unix)
+        server = await asyncio.start_unix_server(dispatcher.handle, unix)
+        log(f'Listening on {unix}')
+    else:
+        server = await asyncio.start_server(dispatcher.handle, host, port)
+        log(f'Listening on {host}:{port}')
+
+    batches = asyncio.ensure_future(dispatcher.run_batches())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        batches.cancel()
+        dispatcher.worker.shutdown(wait = True)
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description = 'Serve a NotUber matcher over a local socket (JSON lines)')
+    parser.add_argument('matcher', help = 'matcher module, e.g. T4')
+    parser.add_argument('--data', default = None, help = 'data directory (defaults to the bundled data)')
+    parser.add_argument('--host', default = HOST)
+    parser.add_argument('--port', type = int, default = PORT)
+    parser.add_argument('--unix', default = None, help = 'listen on this Unix socket path instead of TCP')
+    parser.add_argument('--batch-ms', type = float, default = BATCH_MS, help = 'batching window in milliseconds (0 matches as soon as the worker is free)')
+    parser.add_argument('--max-batch', type = int, default = MAX_BATCH)
+    parser.add_argument('--max-pending', type = int, default = MAX_PENDING, help = 'queued messages before replying overloaded')
+    parser.add_argument('--empty-fleet', action = 'store_true', help = 'start without drivers.csv; drivers join through status updates')
+    args = parser.parse_args(argv)
+
+    matcher = load_matcher(args.matcher)
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        matcher.initialize(args.data, [] if args.empty_fleet else None, [])
+        matcher.setup()
+        log(f'{args.matcher} ready with {len(matcher.DRIVERS)} drivers in {time.perf_counter() - start:.1f} seconds')
+
+        dispatcher = Dispatcher(matcher, args.batch_ms, args.max_batch, args.max_pending)
+        try:
+            asyncio.run(serve(dispatcher, args.host, args.port, args.unix))
+        except KeyboardInterrupt:
+            pass
+
+    log(json.dumps(dispatcher.snapshot()))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
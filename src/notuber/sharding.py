@@ -0,0 +1,230 @@
+'''
+Time-sharded simulation: independent periods of the workload simulated in parallel processes
+
+passengers.csv and drivers.csv are time ordered and the fleet mostly turns over between service days, so a long
+workload can be cut at quiet times into shards that are simulated separately, each in its own process (matchers keep
+their state in module globals), and their metrics merged. Shards end at a fixed hour every day (the quiet hour), or
+wherever requests pause for at least a given gap. Each shard starts with the drivers joining during it.
+
+With warm starts, each shard also starts with the drivers left at the end of the shard before it, at their last
+position. Shards are first simulated cold, all at once, and then every shard but the first again from the fleet its
+predecessor ended the cold round with, so a warm run takes about twice the longest shard (not the sum of all of them)
+and the handed-over fleet is the one a cold-started predecessor ends with.
+
+    notuber shard T4 --data data --workers 8
+    notuber shard T3 --quiet-gap 20 --warm --out shards.json
+'''
+
+import argparse
+import concurrent.futures
+import contextlib
+import datetime as dt
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+from . import load_matcher
+from . import classes
+from . import fleet
+from . import loader
+from . import simulation
+from . import trips
+
+### Defaults
+QUIET_HOUR = 4 # Shards end at 4 am, the quietest hour of the NYC data
+SEED = 7
+
+
+def day_boundaries(times: np.ndarray, hour: int = QUIET_HOUR) -> list:
+    '''
+    Shard start times (seconds) at `hour` o'clock of each day with requests after it
+        - times: request times in seconds (fleet.seconds), sorted
+        - Requests before the first `hour` o'clock join the first full day, whose shard then starts at the first
+          request: the workload starts in the middle of the service day they belong to, without the drivers who started it
+    '''
+
+    if not len(times):
+        return []
+    days = np.unique((times - hour * 3600) // 86400)
+    boundaries = (days * 86400 + hour * 3600).tolist()
+    if len(boundaries) > 1 and times[0] % 86400 < hour * 3600: # EPOCH is a midnight
+        return [float(times[0])] + boundaries[2:]
+    return boundaries
+
+def gap_boundaries(times: np.ndarray, gap_minutes: float) -> list:
+    '''
+    Shard start times (seconds): the first request, and every request following a pause of at least gap_minutes
+    '''
+
+    if not len(times):
+        return []
+    starts = np.flatnonzero(np.diff(times) >= gap_minutes * 60) + 1
+    return [float(times[0])] + times[starts].tolist()
+
+def split(times: np.ndarray, drivers: list, boundaries: list) -> list:
+    '''
+    Cut the workload at the boundaries
+        - Returns one (start seconds, first trip row, stop trip row, drivers joining) tuple per shard with requests;
+          drivers joining before the first boundary go to the first shard
+        - A period without requests or without drivers joining is folded into the next one (the last into the one
+          before it), so no shard's passengers are left without a fleet
+    '''
+
+    edges = sorted(boundaries)[1:]
+    rows = np.searchsorted(times, edges, side = 'left').tolist()
+    starts = [0] + rows
+    stops = rows + [len(times)]
+    joining = [[] for _ in starts]
+    driver_times = [fleet.seconds(driver.time) for driver in drivers]
+    for driver, shard in zip(drivers, np.searchsorted(edges, driver_times, side = 'right').tolist()):
+        joining[shard].append(driver)
+
+    shards = []
+    folded = None # Period carried into the next one
+    for start_time, start, stop, shard_drivers in zip(sorted(boundaries), starts, stops, joining):
+        if folded is not None:
+            start_time, start, shard_drivers = folded[0], folded[1], folded[3] + shard_drivers
+        folded = (start_time, start, stop, shard_drivers) if stop == start or not shard_drivers else None
+        if folded is None:
+            shards.append((start_time, start, stop, shard_drivers))
+    if folded is not None and folded[2] > folded[1]: # Trailing requests without drivers of their own
+        if shards:
+            start_time, start, _, shard_drivers = shards[-1]
+            shards[-1] = (start_time, start, folded[2], shard_drivers + folded[3])
+        else:
+            shards.append(folded)
+
+    return shards
+
+def warm_fleet(drivers: list, start_time: float) -> list:
+    '''
+    Carry drivers into a shard starting at start_time (seconds): those already free become available at the start, so
+    their idle time before it isn't counted twice
+    '''
+
+    start = fleet.EPOCH + dt.timedelta(seconds = start_time)
+    return [classes.Driver(id = driver.id, timestamp = max(driver.time, start), lat = driver.coords[0], lon = driver.coords[1]) for driver in drivers]
+
+def run_shard(task: tuple) -> dict:
+    '''
+    Simulate one shard in this process (the matcher module is initialized from scratch)
+        - task: (matcher name, data_dir, first trip row, stop trip row, drivers, seed)
+        - Returns the shard's raw metrics, fleet left at the end (as (id, time, lat, lon)) and timings
+    '''
+
+    matcher_name, data_dir, start, stop, drivers, seed = task
+    begin = time.perf_counter()
+    matcher = load_matcher(matcher_name)
+    metrics = simulation.Metrics()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        matcher.initialize(data_dir, drivers, list(trips.load(data_dir)[start:stop]))
+        ready = time.perf_counter()
+        random.seed(seed) # Driver drop-out is random
+        simulation.run(matcher, matcher.PASSENGERS, metrics)
+
+    return {
+        'passengers': stop - start,
+        'drivers': len(drivers),
+        'wait_times': metrics.passenger_wait_times,
+        'idle_times': metrics.driver_idle_times,
+        'profit': metrics.total_ride_profit,
+        'unserved': metrics.unserved,
+        'unreachable': metrics.unreachable,
+        'empty_grid': metrics.empty_grid,
+        'fleet': [(driver.id, driver.time, *driver.coords) for driver in matcher.active_drivers()],
+        'init_time': ready - begin,
+        'total_time': time.perf_counter() - begin,
+    }
+
+def merge(results: list) -> simulation.Metrics:
+    '''
+    One Metrics object over all shards
+    '''
+
+    metrics = simulation.Metrics()
+    for result in results:
+        metrics.passenger_wait_times.extend(result['wait_times'])
+        metrics.driver_idle_times.extend(result['idle_times'])
+        metrics.total_ride_profit += result['profit']
+        metrics.unserved += result['unserved']
+        metrics.unreachable += result['unreachable']
+        metrics.empty_grid += result['empty_grid']
+    return metrics
+
+def simulate(matcher_name: str, data_dir: str = None, boundaries: list = None, warm: bool = False, workers: int = None, seed: int = SEED) -> tuple:
+    '''
+    Simulate every shard of the workload in a pool of processes and merge the results
+        - boundaries: shard start times in seconds (default: day_boundaries of the requests)
+        - warm: start each shard after the first with the fleet its predecessor ended with (see module docstring)
+        - workers: processes (default: one per CPU)
+        - Returns (merged Metrics, drivers in the workload, per-shard results)
+    '''
+
+    table = trips.load(data_dir) # Parsed and cached once here, mapped by the workers
+    times = np.asarray(table.records['time'])
+    drivers = loader.load_drivers(data_dir)
+    shards = split(times, drivers, day_boundaries(times) if boundaries is None else boundaries)
+
+    context = multiprocessing.get_context('fork')
+    with concurrent.futures.ProcessPoolExecutor(workers or os.cpu_count(), mp_context = context) as pool: # Not a Pool: its daemonic workers could not fork scoring pools (NOTUBER_WORKERS)
+        tasks = [(matcher_name, data_dir, start, stop, joining, seed + k) for k, (_, start, stop, joining) in enumerate(shards)]
+        results = list(pool.map(run_shard, tasks))
+
+        if warm and len(shards) > 1:
+            tasks = []
+            for k, (start_time, start, stop, joining) in enumerate(shards[1:], 1):
+                handed_over = [classes.Driver(id = id, timestamp = timestamp, lat = lat, lon = lon) for id, timestamp, lat, lon in results[k - 1]['fleet']]
+                carried = sorted(warm_fleet(handed_over, start_time) + joining, key = lambda driver: driver.time)
+                tasks.append((matcher_name, data_dir, start, stop, carried, seed + k))
+            results[1:] = pool.map(run_shard, tasks)
+
+    for (start_time, _, _, _), result in zip(shards, results):
+        result['start'] = fleet.EPOCH + dt.timedelta(seconds = start_time)
+    return merge(results), len(drivers), results
+
+def print_report(results: list) -> None:
+    print(f'{"shard start":<18}{"pass.":>9}{"drivers":>9}{"served":>9}{"init s":>9}{"total s":>9}{"mean wait":>11}')
+    for r in results:
+        served = len(r['wait_times'])
+        mean_wait = sum(r['wait_times']) / served if served else float('nan')
+        print(f'{r["start"].strftime("%m/%d/%Y %H:%M"):<18}{r["passengers"]:>9}{r["drivers"]:>9}{served:>9}{r["init_time"]:>9.2f}{r["total_time"]:>9.2f}{mean_wait:>11.2f}')
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description = 'Simulate a matcher over independent time shards in parallel processes')
+    parser.add_argument('matcher', help = 'matcher module, e.g. T4')
+    parser.add_argument('--data', default = None, help = 'data directory (defaults to the bundled data)')
+    parser.add_argument('--hour', type = int, default = QUIET_HOUR, help = 'cut shards at this hour of every day')
+    parser.add_argument('--quiet-gap', type = float, default = None, help = 'instead cut wherever requests pause for this many minutes')
+    parser.add_argument('--warm', action = 'store_true', help = "hand each shard the fleet left at the end of the previous one")
+    parser.add_argument('--workers', type = int, default = None, help = 'processes (default: one per CPU)')
+    parser.add_argument('--seed', type = int, default = SEED)
+    parser.add_argument('--out', default = None, help = 'write the merged summary and per-shard results as JSON')
+    args = parser.parse_args(argv)
+
+    times = np.asarray(trips.load(args.data).records['time'])
+    boundaries = gap_boundaries(times, args.quiet_gap) if args.quiet_gap is not None else day_boundaries(times, args.hour)
+
+    start = time.perf_counter()
+    metrics, num_drivers, results = simulate(args.matcher, args.data, boundaries, args.warm, args.workers, args.seed)
+    elapsed = time.perf_counter() - start
+
+    print_report(results)
+    print()
+    metrics.print_summary(num_drivers)
+    longest = max((r['total_time'] for r in results), default = 0.0)
+    print(f'{len(results)} shards in {elapsed:.2f} s (longest shard {longest:.2f} s, sum {sum(r["total_time"] for r in results):.2f} s)')
+
+    if args.out:
+        summary = metrics.summary(num_drivers)
+        summary.update({'wall_time': elapsed, 'shards': [{key: (value.isoformat() if isinstance(value, dt.datetime) else value) for key, value in r.items() if key not in ('wait_times', 'idle_times', 'fleet')} for r in results]})
+        with open(args.out, 'w') as f:
+            json.dump(summary, f, indent = 2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
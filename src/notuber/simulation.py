@@ -0,0 +1,134 @@
+import datetime as dt
+import heapq
+import math
+import time
+
+### Returned by dispatch() when no route can serve a passenger (e.g. pickup or dropoff on a disconnected fragment)
+UNREACHABLE = 'unreachable'
+
+
+class Metrics:
+
+    def __init__(self) -> None:
+        self.passenger_wait_times = []
+        self.driver_idle_times = []
+        self.total_ride_profit = 0
+        self.unserved = 0 # Passengers left when the fleet ran out
+        self.unreachable = 0 # Passengers no available driver could route to or from
+        self.empty_grid = 0 # Requests that found nobody on T5's grid, so queued drivers were brought on early
+
+    def record(self, passenger_wait_time: float, driver_idle_time: float, ride_profit: float) -> None:
+        '''
+        Record one completed ride (all values in minutes)
+        '''
+
+        self.passenger_wait_times.append(passenger_wait_time)
+        self.driver_idle_times.append(driver_idle_time)
+        self.total_ride_profit += ride_profit
+
+    def summary(self, num_drivers: int) -> dict:
+        '''
+        Aggregate ride metrics (minutes)
+        '''
+
+        waits = sorted(self.passenger_wait_times)
+        served = len(waits)
+        return {
+            'served': served,
+            'unserved': self.unserved,
+            'unreachable': self.unreachable,
+            'empty_grid': self.empty_grid,
+            'mean_wait': sum(waits) / served if served else float('nan'),
+            'p95_wait': waits[max(0, math.ceil(0.95 * served) - 1)] if served else float('nan'),
+            'mean_idle': sum(self.driver_idle_times) / served if served else float('nan'),
+            'total_profit': self.total_ride_profit,
+            'avg_driver_profit': self.total_ride_profit / num_drivers if num_drivers else float('nan'),
+        }
+
+    def print_summary(self, num_drivers: int) -> None:
+        if self.unserved:
+            print(f'No more drivers available. Remaining passengers: {self.unserved}')
+        if self.unreachable:
+            print(f'Passengers without a route: {self.unreachable}')
+        if self.empty_grid:
+            print(f'Requests that brought drivers on early: {self.empty_grid}')
+        if not self.passenger_wait_times:
+            print('No rides completed')
+            return
+        print(f'Average Passenger Wait Time: {sum(self.passenger_wait_times) / len(self.passenger_wait_times)} minutes')
+        print(f'Average Driver Idle Time: {sum(self.driver_idle_times) / len(self.driver_idle_times)} minutes')
+        print(f'Total Driver Profit: {self.total_ride_profit} minutes')
+        print(f'Average Driver Profit: {self.total_ride_profit / num_drivers} minutes')
+
+def wait_times(driver_time, passenger_time) -> tuple:
+    '''
+    Minutes the driver idles before the request and minutes the passenger waits for the driver to become available
+        - driver_time/passenger_time: datetimes, or seconds (fleet.seconds) for both
+        - Returns (driver_idle_time, passenger_wait_time), at most one of which is nonzero
+    '''
+
+    delta = passenger_time - driver_time
+    delta = delta.total_seconds() if isinstance(delta, dt.timedelta) else float(delta)
+    if delta > 0: # Driver ready before passenger
+        return (delta / 60, 0)
+    if delta < 0: # Passenger ready before driver
+        return (0, -delta / 60)
+    return (0, 0)
+
+def pop_available(driver_queue: list, request_time: float) -> list:
+    '''
+    Pop every driver available at request_time (seconds) off a (free_at, row) heap
+        - If nobody is available yet, pop the driver that frees up first
+        - Returns their rows, [] if the heap is empty
+    '''
+
+    available_rows = []
+    if not driver_queue:
+        return available_rows
+
+    if driver_queue[0][0] > request_time: # If no available drivers
+        available_rows.append(heapq.heappop(driver_queue)[1])
+    else:
+        while driver_queue and driver_queue[0][0] <= request_time: # Get all available drivers at current time
+            available_rows.append(heapq.heappop(driver_queue)[1])
+
+    return available_rows
+
+def remove_from_queue(driver_queue: list, row: int) -> bool:
+    '''
+    Remove a driver's row from a (free_at, row) heap
+        - Returns False if it was not queued
+    '''
+
+    kept = [entry for entry in driver_queue if entry[1] != row]
+    if len(kept) == len(driver_queue):
+        return False
+    driver_queue[:] = kept
+    heapq.heapify(driver_queue)
+    return True
+
+def run(matcher, passengers, metrics: Metrics, progress: int = 0) -> Metrics:
+    '''
+    Feed passengers (sorted by request time) to a matcher module one by one
+        - matcher: module exposing setup() and dispatch(passenger, metrics), e.g. T1 ... T5, after initialize()
+          (dispatch returns None once the fleet is exhausted, or UNREACHABLE for a passenger it cannot route)
+        - progress: print elapsed time every `progress` passengers (0 disables)
+
+    Matchers time their phases with PROFILER.lap(): 'match', 'route_pickup', 'route_dropoff', 'driver_update'
+    ('snap' too for matchers that snap lazily), next to 'init'/'snap' recorded by initialize().
+    '''
+
+    matcher.setup()
+
+    count = 0
+    start = time.perf_counter()
+    for passenger in passengers:
+        if matcher.dispatch(passenger, metrics) is None: # Fleet exhausted
+            metrics.unserved = len(passengers) - count
+            break
+
+        count += 1 # Includes UNREACHABLE passengers, counted by the matcher in metrics.unreachable
+        if progress and count % progress == 0:
+            print(f'Time for {count} passengers: {time.perf_counter() - start} seconds')
+
+    return metrics
@@ -0,0 +1,390 @@
+'''
+Shortest-path trees kept per idle driver node, so repeated pickup ETAs from a driver who hasn't moved are lookups
+
+An idle driver is scored against every passenger that arrives while they wait, each time with a new search from the
+same node. A ShortestPathTree is one Dijkstra from that node that is paused instead of thrown away: a query settles
+nodes only until the target is settled, and the next query resumes from the same frontier (or just reads the label).
+Trees are only grown out to RADIUS minutes, a realistic pickup: a driver further away than that only needs the
+matcher's usual search if no other driver is within it. A node's first query in a bucket is a usual search too: a
+driver who is assigned straight away never pays for a tree.
+
+Edge times are taken at the start of the search, as in Node.shortest_path, so a tree is valid for every search
+starting in the same (weekday/weekend, hour) bucket and gives exactly Node.shortest_path's minutes. That makes them a
+T3 cache only: T4 scores drivers with A*, whose ETAs a tree would change. The cache holds trees for one bucket at a
+time, within NOTUBER_TREE_MB megabytes (counted as labelled nodes, LABEL_BYTES each); T3 drops a node's tree when its
+driver is assigned or leaves. Once the budget is used up, trees stop growing and new nodes are searched as usual until
+trees are dropped (evicting instead would rebuild trees on every dispatch, as each one scores the idle drivers in the
+same order). Set NOTUBER_TREES=0 to always search.
+
+Hotspots: trips concentrate on a few origins and destinations (airports, Midtown). warm() mines a snapped trip table
+for the busiest nodes of each bucket and builds complete forward and reverse trees from them before the simulation
+(stored in the data cache), so any T3 query starting or ending at a hotspot in its bucket is one array read. T4 and
+T5 route with A* and don't use them. Set NOTUBER_HOTSPOTS=N to warm the top N nodes per bucket, at most
+NOTUBER_HOTSPOT_MB megabytes of trees (busiest first). Reverse trees add edge times from the far end, so they can
+differ from a search in the last bits of a float: every time T3 compares or books is rounded by quantize(), whichever
+search or cache answered, so the warm set can't flip a tie between two drivers.
+'''
+
+import datetime as dt
+import hashlib
+import heapq
+import math
+import os
+
+import numpy as np
+
+from . import cache
+from . import classes
+from . import contraction
+from . import fleet
+from .profiling import PROFILER
+
+ENABLED = os.environ.get('NOTUBER_TREES', '1') != '0'
+PLACES = 6 # Decimal places of the minutes quantize() keeps, far above float noise (~1e-13) and far below a second
+RADIUS = 30.0 # Minutes a tree is grown out to (a pickup further than this is unlikely to win)
+TREE_MB = float(os.environ.get('NOTUBER_TREE_MB', '256')) # Memory budget for all trees held
+LABEL_BYTES = 72 # Measured memory per labelled node of a tree (dict entry and float, plus its share of the frontier)
+
+### Warm hotspot trees
+HOTSPOTS = int(os.environ.get('NOTUBER_HOTSPOTS', '0')) # Busiest nodes per bucket, 0 for none
+HOTSPOT_MB = float(os.environ.get('NOTUBER_HOTSPOT_MB', '256')) # Memory budget for their trees
+
+
+def bucket(start_time: dt.datetime) -> tuple:
+    '''
+    (weekend, hour) deciding the edge times of a search starting at start_time (see Edge.travel_time)
+    '''
+
+    return (start_time.weekday() > 4, start_time.hour)
+
+def bucket_time(weekend: bool, hour: int) -> dt.datetime:
+    '''
+    A start time in bucket (weekend, hour)
+    '''
+
+    return dt.datetime(2000, 1, 1 if weekend else 3, hour) # A Saturday or a Monday
+
+def quantize(minutes: float) -> float:
+    '''
+    minutes rounded to PLACES decimals, so a route gets the same minutes from any search or cache that timed it
+    '''
+
+    return round(minutes, PLACES)
+
+def travel_times(caches: list, sources: list, target: classes.Node, start_time: dt.datetime, search) -> list:
+    '''
+    Minutes from every source node to target (-1 where unreachable, quantized), in the order of sources, for picking the
+    closest
+        - caches: TreeCache/HotspotTrees (or None) asked in turn for the sources still unanswered
+        - search: called with the list of sources no cache could answer, returns their times in order
+          (e.g. a scoring.CandidateScorer's travel_times with the target bound)
+        - Returns math.inf for a source a tree puts beyond its radius when another source is within it: it can't be
+          the closest, so it isn't searched
+    '''
+
+    times = [None] * len(sources)
+    radii = {} # <i: radius of the tree that put source i beyond it>
+    for cache in caches:
+        missing = [i for i, time in enumerate(times) if time is None]
+        if cache is None or not missing:
+            continue
+        for i, time in zip(missing, cache.lookup([sources[i] for i in missing], target, start_time)):
+            times[i] = time
+            if time == math.inf:
+                radii[i] = cache.radius
+    for far in (False, True): # Search the unanswered first, then the far ones only if nothing closer turned up
+        if far:
+            closest = min((time for time in times if 0 <= time < math.inf), default = math.inf)
+            missing = [i for i, radius in radii.items() if closest > radius]
+        else:
+            missing = [i for i, time in enumerate(times) if time is None]
+        if missing:
+            for i, time in zip(missing, search([sources[i] for i in missing])):
+                times[i] = time
+    return [quantize(time) for time in times]
+
+class ShortestPathTree:
+    '''
+    Resumable Dijkstra from one node, with edge times at start_time
+        - nodes: Node objects in node.index order
+        - radius: nodes further than this many minutes are labelled but never expanded
+    '''
+
+    def __init__(self, nodes: list, source: classes.Node, start_time: dt.datetime, radius: float = RADIUS) -> None:
+        self.nodes = nodes
+        self.source = source
+        self.start_time = start_time
+        self.radius = radius
+        self.dist = {source.index: 0} # <node.index: minutes>, final once no larger than the frontier's minimum
+        self.pq = [(0, source.index)] # Frontier of (minutes, node.index)
+        self.settled = self.relaxed = self.pushes = 0
+
+    def __len__(self) -> int:
+        return len(self.dist)
+
+    def _grow(self, index: int, limit: float = math.inf, room: float = math.inf) -> bool:
+        '''
+        Settle nodes until node index's label is final or the frontier reaches limit minutes
+            - room: stop once the tree labels this many nodes
+            - Returns False if stopped at the radius or by room first (see beyond)
+        '''
+
+        dist, pq, nodes = self.dist, self.pq, self.nodes
+        settled = relaxed = pushes = 0
+        grown = True
+        while pq and pq[0][0] < min(dist.get(index, math.inf), limit):
+            current_dist, current = pq[0]
+            if current_dist > self.radius or len(dist) >= room:
+                grown = False
+                break
+            heapq.heappop(pq)
+            if current_dist > dist[current]:
+                continue
+
+            settled += 1
+            current_node = nodes[current]
+            relaxed += len(current_node.neighbors)
+            for edge in current_node.neighbors:
+                neighbor = edge.end_node
+                new_dist = current_dist + edge.travel_time(self.start_time)
+                i = neighbor.index
+                if new_dist < dist.get(i, math.inf):
+                    dist[i] = new_dist
+                    heapq.heappush(pq, (new_dist, i))
+                    pushes += 1
+
+        self.settled += settled
+        self.relaxed += relaxed
+        self.pushes += pushes
+        if settled:
+            classes.record_search('tree', None, settled, relaxed, pushes)
+        return grown
+
+    def beyond(self) -> bool:
+        '''
+        True if every node not yet settled is further than the radius
+        '''
+
+        return bool(self.pq) and self.pq[0][0] > self.radius
+
+    def distance(self, index: int, room: float = math.inf) -> float:
+        '''
+        Minutes from the source to node index, growing the tree as far as needed (to at most room labels)
+            - Returns math.inf if the node is further than the radius, None if further than room allows, -1 if the
+              source can't reach it
+        '''
+
+        if not self._grow(index, room = room):
+            return math.inf if self.beyond() else None
+        return self.dist.get(index, -1)
+
+    def travel_time(self, target: classes.Node, room: float = math.inf) -> float:
+        '''
+        Same contract as Node.shortest_path from the source, or math.inf if the target is beyond the radius (None if
+        beyond room)
+        '''
+
+        if self.source.components is not None and not self.source.components.reachable(self.source, target):
+            return -1
+        if target.via is None:
+            return self.distance(target.index, room)
+
+        # Contracted away: best of its chain entries plus the chain prefix, or of the direct path if the source is on
+        # its chain (interior nodes keep their edges), as Node.shortest_path does
+        best = math.inf
+        far = False # Some path is only known to be longer than the radius
+        for entry, prefixes in target.via.items():
+            entry_dist = self.distance(entry.index, room)
+            if entry_dist is None:
+                return None
+            if entry_dist == math.inf:
+                far = True
+            elif entry_dist >= 0:
+                best = min(best, min(entry_dist + sum(edge.travel_time(self.start_time) for edge in prefix) for prefix in prefixes))
+        if not self._grow(target.index, best, room):
+            if not self.beyond():
+                return None
+            far = True
+        best = min(best, self.dist.get(target.index, math.inf))
+        if far and best > self.radius:
+            return math.inf
+        return best if best < math.inf else -1
+
+class TreeCache:
+    '''
+    Shortest-path trees by source node index for the current (weekend, hour) bucket
+        - nodes: Node objects in node.index order (the matcher's NODE_LIST)
+        - radius: see ShortestPathTree
+        - budget_mb: memory for all trees (defaults to TREE_MB); no tree grows, and no new one is made, past it
+    '''
+
+    def __init__(self, nodes: list, radius: float = RADIUS, budget_mb: float = None) -> None:
+        self.nodes = nodes
+        self.radius = radius
+        self.max_labels = int((TREE_MB if budget_mb is None else budget_mb) * 2**20 / LABEL_BYTES)
+        self.labels = 0 # Nodes labelled by all trees held
+        self.trees = {} # <node.index: ShortestPathTree>
+        self.seen = set() # node.index searched from once in this bucket, gets a tree on the next query
+        self.bucket = None
+        self.hits = self.misses = 0 # Queries answered by a tree / left to the usual search
+
+    def __len__(self) -> int:
+        return len(self.trees)
+
+    def clear(self) -> None:
+        self.trees.clear()
+        self.seen.clear()
+        self.labels = 0
+        self.bucket = None
+
+    def drop(self, index: int) -> None:
+        '''
+        Forget the tree from node index (its driver was assigned or left)
+        '''
+
+        tree = self.trees.pop(index, None)
+        if tree is not None:
+            self.labels -= len(tree)
+        self.seen.discard(index)
+
+    def tree(self, source: classes.Node, start_time: dt.datetime) -> ShortestPathTree:
+        '''
+        The tree from source for searches starting at start_time, new if there is none yet in this bucket
+            - Returns None the first time source is queried in a bucket, or if the budget is used up
+        '''
+
+        key = bucket(start_time)
+        if key != self.bucket: # Edge times changed, every tree is stale
+            self.clear()
+            self.bucket = key
+        tree = self.trees.get(source.index)
+        if tree is None:
+            if source.index not in self.seen:
+                self.seen.add(source.index)
+            elif self.labels < self.max_labels:
+                tree = self.trees[source.index] = ShortestPathTree(self.nodes, source, start_time, self.radius)
+                self.labels += len(tree)
+        return tree
+
+    def lookup(self, sources: list, target: classes.Node, start_time: dt.datetime) -> list:
+        '''
+        Minutes from every source node to target (-1 where unreachable), None where no tree can answer, math.inf where
+        the target is beyond the radius
+        '''
+
+        times = []
+        for source in sources:
+            tree = self.tree(source, start_time)
+            if tree is None:
+                times.append(None)
+                continue
+            labels = len(tree)
+            times.append(tree.travel_time(target, self.max_labels - self.labels + labels))
+            self.labels += len(tree) - labels
+        missing = times.count(None)
+        self.hits += len(sources) - missing
+        self.misses += missing
+        if PROFILER.enabled:
+            PROFILER.count('trees.hits', len(sources) - missing)
+            PROFILER.count('trees.misses', missing)
+        return times
+
+def hotspots(table, top_n: int) -> list:
+    '''
+    The top_n most frequent pickup or dropoff nodes of each (weekend, hour) bucket of request times
+        - table: snapped trips.TripTable with its nodes attached
+        - Returns [(trips, weekend, hour, node.index)], busiest first
+    '''
+
+    hours = np.asarray(table.records['time']) // 3600
+    days, hours = np.divmod(hours.astype(np.int64), 24)
+    buckets = ((days + fleet.EPOCH.weekday()) % 7 > 4) * 24 + hours
+    size = len(table.nodes)
+    keys = np.concatenate([buckets[table.node >= 0] * size + table.node[table.node >= 0],
+                           buckets[table.end_node >= 0] * size + table.end_node[table.end_node >= 0]])
+    keys, counts = np.unique(keys, return_counts = True)
+
+    taken = {} # <bucket: nodes taken>
+    spots = []
+    for i in np.lexsort((-counts, keys // size)).tolist(): # By bucket, busiest first within each
+        key_bucket, index = divmod(int(keys[i]), size)
+        if taken.get(key_bucket, 0) < top_n:
+            taken[key_bucket] = taken.get(key_bucket, 0) + 1
+            spots.append((int(counts[i]), key_bucket // 24, key_bucket % 24, index))
+    return sorted(spots, key = lambda spot: -spot[0])
+
+def warm(nodes: list, table, data_dir: str = None, top_n: int = None, budget_mb: float = None) -> 'HotspotTrees':
+    '''
+    Forward and reverse trees of the hotspots of a trip table, as many as fit in budget_mb (from the data cache, or built)
+        - nodes: Node objects in node.index order
+        - top_n/budget_mb: default to HOTSPOTS/HOTSPOT_MB
+    '''
+
+    top_n = HOTSPOTS if top_n is None else top_n
+    budget_mb = HOTSPOT_MB if budget_mb is None else budget_mb
+    tree_bytes = 8 * len(nodes)
+    spots = hotspots(table, top_n)[:int(budget_mb * 2**20) // (2 * tree_bytes)]
+
+    def build():
+        keys = np.array([(weekend, hour, index, reverse) for _, weekend, hour, index in spots for reverse in (0, 1)], dtype = np.int64).reshape(-1, 4)
+        dist = np.full((len(keys), len(nodes)), np.inf)
+        for row, (weekend, hour, index, reverse) in enumerate(keys.tolist()):
+            for node, minutes in nodes[index].isochrone(bucket_time(weekend, hour), math.inf, reverse = bool(reverse)).items():
+                dist[row, node.index] = minutes
+        return {'keys': keys, 'dist': dist}
+
+    sha = hashlib.sha1(cache.graph_digest(data_dir, 'hotspots', len(nodes), contraction.ENABLED).encode())
+    sha.update(np.array(spots, dtype = np.int64).tobytes())
+    arrays = cache.cached_arrays('hotspots', sha.hexdigest(), build, data_dir)
+    return HotspotTrees(arrays['keys'], arrays['dist'])
+
+class HotspotTrees:
+    '''
+    Complete shortest-path trees from (forward) and to (reverse) hotspot nodes, per (weekend, hour) bucket
+        - keys: (weekend, hour, node.index, reverse) of each tree
+        - dist: one row of minutes per key, indexed by node.index (inf where unreachable)
+    '''
+
+    def __init__(self, keys: np.ndarray, dist: np.ndarray) -> None:
+        self.dist = dist
+        self.forward = {} # <(weekend, hour, node.index): minutes from the node>
+        self.reverse = {} # <(weekend, hour, node.index): minutes to the node>
+        for row, (weekend, hour, index, reverse) in enumerate(keys.tolist()):
+            (self.reverse if reverse else self.forward)[(bool(weekend), hour, index)] = dist[row]
+        self.queries = self.hits = 0
+
+    def __len__(self) -> int:
+        return len(self.dist)
+
+    def travel_time(self, source: classes.Node, target: classes.Node, start_time: dt.datetime) -> float:
+        '''
+        Same contract as Node.shortest_path, or None if neither end is a hotspot in start_time's bucket
+        '''
+
+        self.queries += 1
+        weekend, hour = bucket(start_time)
+        tree = self.reverse.get((weekend, hour, target.index))
+        if tree is not None:
+            minutes = tree[source.index]
+        else:
+            tree = self.forward.get((weekend, hour, source.index))
+            if tree is None:
+                if PROFILER.enabled:
+                    PROFILER.count('hotspots.misses')
+                return None
+            minutes = tree[target.index]
+        self.hits += 1
+        if PROFILER.enabled:
+            PROFILER.count('hotspots.hits')
+        return float(minutes) if minutes < math.inf else -1
+
+    def lookup(self, sources: list, target: classes.Node, start_time: dt.datetime) -> list:
+        '''
+        Minutes from every source node to target (-1 where unreachable), None where neither end is a hotspot
+        '''
+
+        return [self.travel_time(source, target, start_time) for source in sources]
+
+    def summary(self) -> str:
+        rate = self.hits / self.queries if self.queries else 0
+        return f'Warm hotspot trees: {len(self)} ({self.dist.nbytes / 2**20:.1f} MB) answered {self.hits} of {self.queries} routing queries ({rate:.1%})'
@@ -0,0 +1,163 @@
+'''
+Columnar passenger request table, memory-mapped from the data cache
+
+passengers.csv is parsed once into a record array (request time in seconds since fleet.EPOCH, origin and destination
+lat/lon: 40 bytes per trip) and stored as <data_dir>/cache/trips-<digest>.npy, keyed by the file's contents. Later
+runs map that file instead of parsing, so only the pages a simulation touches are read. Snapped node indices live in
+two int32 columns next to it; snap() and snap_drivers() cache them too, keyed by the workload, the graph and the
+snapping method, so repeated experiments skip snapping.
+
+The table is a sequence of Passenger objects built on access, so simulation.run and the matchers walk it by index
+as they walked the old list; changes made to those objects (time, node) are not kept.
+'''
+
+import csv
+import datetime as dt
+
+import numpy as np
+
+from . import cache
+from . import classes
+from . import fleet
+from . import loader
+
+RECORD = np.dtype([('time', 'f8'), ('lat', 'f8'), ('lon', 'f8'), ('end_lat', 'f8'), ('end_lon', 'f8')])
+CHUNK = 4096 # Rows converted to Python values at a time while iterating
+
+
+def parse_csv(path: str) -> np.ndarray:
+    '''
+    Read passengers.csv into a RECORD array
+    '''
+
+    with open(path, 'r') as p:
+        _ = p.readline()
+        rows = list(csv.reader(p))
+
+    table = np.empty(len(rows), dtype = RECORD)
+    if not rows:
+        return table
+    timestamps, start_lat, start_lon, end_lat, end_lon = zip(*rows)
+    try: # mm/dd/yyyy hh:mm:ss reordered to ISO, parsed by NumPy in one go
+        iso = np.array([f'{t[6:10]}-{t[0:2]}-{t[3:5]}T{t[11:19]}' for t in timestamps], dtype = 'datetime64[s]')
+        if any(len(t) != 19 for t in timestamps):
+            raise ValueError('timestamps are not zero padded')
+        table['time'] = iso.astype(np.int64)
+    except ValueError:
+        table['time'] = [fleet.seconds(dt.datetime.strptime(t, '%m/%d/%Y %H:%M:%S')) for t in timestamps]
+    table['lat'] = np.array(start_lat, dtype = float)
+    table['lon'] = np.array(start_lon, dtype = float)
+    table['end_lat'] = np.array(end_lat, dtype = float)
+    table['end_lon'] = np.array(end_lon, dtype = float)
+    return table
+
+def load(data_dir: str = None):
+    '''
+    Trip table for data_dir's passengers.csv, parsed on the first run and memory-mapped afterwards
+    '''
+
+    path = loader.data_path('passengers.csv', data_dir)
+    return TripTable(cache.cached_table('trips', cache.file_digest(path), lambda: parse_csv(path), data_dir))
+
+def table(passengers = None, data_dir: str = None) -> 'TripTable':
+    '''
+    Trip table for a matcher: passengers as given (a list of Passenger objects or a TripTable), else data_dir's passengers.csv
+    '''
+
+    if passengers is None:
+        return load(data_dir)
+    return passengers if isinstance(passengers, TripTable) else TripTable.from_passengers(passengers)
+
+def snap_drivers(drivers: list, nearest, nodes: list, data_dir: str = None, *params) -> None:
+    '''
+    Set driver.node for every driver, reusing the cached result for the same driver positions, graph and params
+        - nearest: function Driver -> Node
+        - nodes: Node objects in node.index order
+    '''
+
+    workload = np.array([driver.coords for driver in drivers], dtype = float)
+    build = lambda: {'node': np.array([nearest(driver).index for driver in drivers], dtype = np.int32)}
+    for driver, index in zip(drivers, cache.cached_nodes('drivers', workload, build, data_dir, *params)['node'].tolist()):
+        driver.node = nodes[index]
+
+class TripTable:
+    '''
+    Passenger requests in file (request time) order; trip i is Passenger i + 1
+        - records: RECORD array (may be a read-only memory map)
+        - Slicing gives a view sharing records and node columns
+    '''
+
+    def __init__(self, records: np.ndarray, node = None, end_node = None, nodes: list = None, first: int = 0) -> None:
+        self.records = records
+        self.node = np.full(len(records), -1, dtype = np.int32) if node is None else node # Snapped pickup node.index, -1 if not snapped
+        self.end_node = np.full(len(records), -1, dtype = np.int32) if end_node is None else end_node
+        self.nodes = nodes # <node.index: Node_Object>, set by attach()
+        self.first = first # Row of records[0] in the full table, for passenger ids
+
+    @classmethod
+    def from_passengers(cls, passengers: list) -> 'TripTable':
+        '''
+        Table holding the given Passenger objects (their ids are not kept: trip i becomes Passenger i + 1)
+        '''
+
+        records = np.empty(len(passengers), dtype = RECORD)
+        records['time'] = [fleet.seconds(passenger.time) for passenger in passengers]
+        records['lat'], records['lon'] = [passenger.coords[0] for passenger in passengers], [passenger.coords[1] for passenger in passengers]
+        records['end_lat'], records['end_lon'] = [passenger.end_coords[0] for passenger in passengers], [passenger.end_coords[1] for passenger in passengers]
+        return cls(records)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                raise ValueError('TripTable slices must be contiguous')
+            return TripTable(self.records[start:stop], self.node[start:stop], self.end_node[start:stop], self.nodes, self.first + start)
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError('trip index out of range')
+        return self._passenger(key, self.records[key].tolist(), int(self.node[key]), int(self.end_node[key]))
+
+    def __iter__(self):
+        for start in range(0, len(self), CHUNK):
+            stop = min(start + CHUNK, len(self))
+            rows = zip(self.records[start:stop].tolist(), self.node[start:stop].tolist(), self.end_node[start:stop].tolist())
+            for i, (record, node, end_node) in enumerate(rows, start):
+                yield self._passenger(i, record, node, end_node)
+
+    def _passenger(self, i: int, record: tuple, node: int, end_node: int) -> classes.Passenger:
+        time, lat, lon, end_lat, end_lon = record
+        passenger = classes.Passenger(self.first + i + 1, fleet.EPOCH + dt.timedelta(seconds = time), lat, lon, end_lat, end_lon)
+        if self.nodes is not None:
+            passenger.node = self.nodes[node] if node >= 0 else None
+            passenger.end_node = self.nodes[end_node] if end_node >= 0 else None
+        return passenger
+
+    def attach(self, nodes: list) -> None:
+        '''
+        Resolve node columns against a loaded graph
+            - nodes: Node objects in node.index order
+        '''
+
+        self.nodes = nodes
+
+    def snap(self, snap_passenger, data_dir: str = None, *params) -> None:
+        '''
+        Fill the node columns for every trip, reusing the cached result for the same trips, graph and params
+            - snap_passenger: function setting passenger.node and passenger.end_node (e.g. T3.snap_passenger)
+            - params: what the snapping depends on besides the graph (see cache.cached_nodes)
+        '''
+
+        def build():
+            for i, passenger in enumerate(self):
+                snap_passenger(passenger)
+                self.node[i] = passenger.node.index
+                self.end_node[i] = passenger.end_node.index
+            return {'node': self.node, 'end_node': self.end_node}
+
+        cached = cache.cached_nodes('trips', self.records, build, data_dir, *params)
+        self.node[:] = cached['node']
+        self.end_node[:] = cached['end_node']
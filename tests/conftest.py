@@ -0,0 +1,53 @@
+import datetime as dt
+import random
+
+import pytest
+
+from notuber import benchmark
+from notuber import contraction
+from notuber import generator
+
+SIZE = 24 # Synthetic city of SIZE x SIZE intersections
+WEEKDAY = dt.datetime(2014, 4, 25, 8) # A Friday morning
+WEEKEND = dt.datetime(2014, 4, 26, 23) # A Saturday night
+
+
+def build_city(contract: bool) -> tuple:
+    '''
+    (nodes, node_list, contracted) of the synthetic city, contracted (degree-2 chains) if asked
+    '''
+
+    nodes, edges = benchmark.synthetic_network(SIZE)
+    contracted = [] # Nodes contracted away
+    if contract:
+        contraction.contract(nodes, edges)
+        contracted = [node for node in nodes.values() if node.via is not None]
+    return nodes, sorted(nodes.values(), key = lambda node: node.index), contracted
+
+@pytest.fixture(scope = 'session')
+def city() -> tuple:
+    return build_city(contract = False)
+
+@pytest.fixture(scope = 'session')
+def contracted_city() -> tuple:
+    city = build_city(contract = True)
+    assert city[2], 'the synthetic city has no degree-2 chains to contract'
+    return city
+
+def sample_pairs(node_list: list, count: int, seed: int = 1, targets: list = None) -> list:
+    '''
+    count random (source, target, start time) queries, targets drawn from targets if given
+    '''
+
+    rng = random.Random(seed)
+    return [(rng.choice(node_list), rng.choice(targets or node_list), rng.choice((WEEKDAY, WEEKEND))) for _ in range(count)]
+
+@pytest.fixture(scope = 'session')
+def one_day(tmp_path_factory) -> str:
+    '''
+    Data directory with a generated one-day workload (files in the bundled data format)
+    '''
+
+    out_dir = str(tmp_path_factory.mktemp('one_day'))
+    generator.main([out_dir, '--nodes', '900', '--drivers', '40', '--passengers', '300', '--days', '1', '--seed', '3'])
+    return out_dir
@@ -0,0 +1,96 @@
+'''
+Every way of timing a route (contracted graph, integer engine, shortest-path trees, warm hotspot trees, isochrones)
+against plain Node.shortest_path on the uncontracted graph
+'''
+
+import math
+
+import numpy as np
+import pytest
+
+from notuber import engine
+from notuber import trees
+
+from conftest import WEEKDAY, sample_pairs
+
+ROUNDING = 100 * 0.5 / engine.MS_PER_MINUTE # The engine rounds each edge to the millisecond; no test route has 100 edges
+RADIUS = 50 # Minutes, about the median route in the test city
+
+
+def test_contracted_matches_plain(city, contracted_city):
+    nodes, _, _ = city
+    contracted_nodes, contracted_list, contracted = contracted_city
+    queries = sample_pairs(contracted_list, 200) + sample_pairs(contracted_list, 100, seed = 2, targets = contracted)
+    for source, target, start_time in queries:
+        expected = nodes[source.id].shortest_path(nodes[target.id], start_time)
+        assert source.shortest_path(target, start_time) == pytest.approx(expected, rel = 1e-12)
+
+@pytest.mark.parametrize('contract', [False, True])
+def test_engine_matches_node_searches(city, contracted_city, contract):
+    nodes, node_list, contracted = contracted_city if contract else city
+    fast = engine.Engine(node_list)
+    for source, target, start_time in sample_pairs(node_list, 150) + sample_pairs(node_list, 50, seed = 2, targets = contracted):
+        expected = source.shortest_path(target, start_time)
+        got = fast.shortest_path(source, target, start_time)
+        assert got == pytest.approx(expected, abs = ROUNDING)
+        expected = source.shortest_path_a_star(target, start_time, 20)
+        assert fast.shortest_path_a_star(source, target, start_time, 20) == pytest.approx(expected, abs = ROUNDING)
+
+@pytest.mark.parametrize('contract', [False, True])
+def test_trees_match_shortest_path(city, contracted_city, contract):
+    _, node_list, contracted = contracted_city if contract else city
+    for source, target, start_time in sample_pairs(node_list, 150) + sample_pairs(node_list, 100, seed = 2, targets = contracted):
+        expected = source.shortest_path(target, start_time)
+        assert trees.ShortestPathTree(node_list, source, start_time, radius = math.inf).travel_time(target) == expected
+        got = trees.ShortestPathTree(node_list, source, start_time, radius = RADIUS).travel_time(target)
+        if got == math.inf: # Only known to be further than the radius
+            assert expected > RADIUS or expected == -1
+        else:
+            assert got == expected
+
+def test_tree_cache_picks_the_same_driver(contracted_city):
+    _, node_list, _ = contracted_city
+    cache = trees.TreeCache(node_list, radius = RADIUS)
+    search = lambda start_time, target: lambda sources: [source.shortest_path(target, start_time) for source in sources]
+    drivers = [source for source, _, _ in sample_pairs(node_list, 12, seed = 3)]
+    for _ in range(2): # A node gets its tree on its second query
+        for _, target, start_time in sample_pairs(node_list, 40, seed = 4):
+            expected = [trees.quantize(source.shortest_path(target, start_time)) for source in drivers]
+            got = trees.travel_times([cache], drivers, target, start_time, search(start_time, target))
+            closest = min((time for time in expected if time >= 0), default = None)
+            if closest is not None:
+                assert min(time for time in got if time >= 0) == closest
+                assert got.index(closest) == expected.index(closest)
+            for time, plain in zip(got, expected):
+                assert time == plain or (time == math.inf and closest <= cache.radius)
+    assert cache.hits
+
+def test_hotspot_trees_match_live_searches(city):
+    _, node_list, _ = city
+    spots = [node_list[i] for i in (0, len(node_list) // 2, len(node_list) - 1)]
+    keys = np.array([(0, WEEKDAY.hour, spot.index, reverse) for spot in spots for reverse in (0, 1)], dtype = np.int64)
+    dist = np.full((len(keys), len(node_list)), np.inf)
+    for row, (_, _, index, reverse) in enumerate(keys.tolist()):
+        for node, minutes in node_list[index].isochrone(WEEKDAY, math.inf, reverse = bool(reverse)).items():
+            dist[row, node.index] = minutes
+    hotspots = trees.HotspotTrees(keys, dist)
+
+    for spot in spots:
+        for other, _, _ in sample_pairs(node_list, 60):
+            for source, target in ((spot, other), (other, spot)):
+                expected = trees.quantize(source.shortest_path(target, WEEKDAY))
+                assert trees.quantize(hotspots.travel_time(source, target, WEEKDAY)) == expected
+
+@pytest.mark.parametrize('reverse', [False, True])
+def test_isochrone_matches_shortest_path(contracted_city, reverse):
+    _, node_list, _ = contracted_city
+    for origin, _, start_time in sample_pairs(node_list, 5, seed = 5):
+        reached = origin.isochrone(start_time, RADIUS, reverse = reverse)
+        assert reached[origin] == 0
+        for node in node_list:
+            source, target = (node, origin) if reverse else (origin, node)
+            minutes = source.shortest_path(target, start_time)
+            if node in reached:
+                assert reached[node] == pytest.approx(minutes, rel = 1e-12)
+            else:
+                assert minutes > RADIUS or minutes == -1
@@ -0,0 +1,52 @@
+'''
+Sharded simulation against one process simulating the whole workload
+'''
+
+import datetime as dt
+import random
+
+import numpy as np
+import pytest
+
+from notuber import classes
+from notuber import fleet
+from notuber import load_matcher
+from notuber import sharding
+from notuber import simulation
+
+HOUR = 3600
+
+
+def driver_at(id: int, hours: float) -> classes.Driver:
+    return classes.Driver(id = id, timestamp = fleet.EPOCH + dt.timedelta(hours = hours), lat = 40.7, lon = -74.0)
+
+def test_split_folds_periods_without_drivers():
+    times = np.array([1, 2, 26, 27, 50], dtype = float) * HOUR # Requests on three days
+    drivers = [driver_at(1, 25), driver_at(2, 49)] # Nobody before the first day's requests
+    shards = sharding.split(times, drivers, [0, 24 * HOUR, 48 * HOUR])
+    assert [(start, stop) for _, start, stop, _ in shards] == [(0, 4), (4, 5)]
+    assert [[driver.id for driver in joining] for _, _, _, joining in shards] == [[1], [2]]
+    assert shards[0][0] == 0
+
+def test_split_folds_trailing_requests_into_the_last_shard():
+    times = np.array([1, 26, 50], dtype = float) * HOUR
+    shards = sharding.split(times, [driver_at(1, 0), driver_at(2, 25)], [0, 24 * HOUR, 48 * HOUR])
+    assert [(start, stop) for _, start, stop, _ in shards] == [(0, 1), (1, 3)]
+
+def test_day_boundaries_keep_early_requests_with_their_day():
+    times = np.array([1, 5, 20, 28], dtype = float) * HOUR # 1 am belongs to the day starting at 4 am, as does 4 am the day after
+    assert sharding.day_boundaries(times, hour = 4) == [HOUR, 28 * HOUR]
+
+@pytest.mark.parametrize('matcher_name', ['T1', 'T3'])
+def test_one_day_sharded_matches_unsharded(one_day, matcher_name):
+    matcher = load_matcher(matcher_name)
+    matcher.initialize(one_day)
+    random.seed(sharding.SEED)
+    metrics = simulation.Metrics()
+    simulation.run(matcher, matcher.PASSENGERS, metrics)
+
+    sharded, num_drivers, results = sharding.simulate(matcher_name, one_day, workers = 2)
+    assert num_drivers == len(matcher.DRIVERS)
+    assert sharded.summary(num_drivers) == metrics.summary(num_drivers)
+    assert sharded.passenger_wait_times == metrics.passenger_wait_times
+    assert sharded.unserved == 0